@@ -1,11 +1,12 @@
 import asyncio
-import json
+import orjson
 from typing import List
 import signal
 import sys
 
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import ValidationError
 
@@ -25,7 +26,9 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="HTTP Flow API", 
     version="1.0.0",
-    description="A powerful HTTP traffic interceptor and modifier with real-time rule-based request/response manipulation"
+    description="A powerful HTTP traffic interceptor and modifier with real-time rule-based request/response manipulation",
+    # Serialize REST responses with orjson's C encoder instead of json.dumps
+    default_response_class=ORJSONResponse
 )
 db = DatabaseManager()
 connection_manager = ConnectionManager(logger)
@@ -208,7 +211,7 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             data = await websocket.receive_text()
             # Handle WebSocket messages if needed
-            message = json.loads(data)
+            message = orjson.loads(data)
             
             if message.get('type') == 'ping':
                 await connection_manager.pong(websocket)
@@ -1,10 +1,28 @@
-from typing import Dict, Optional, List, Literal
-from pydantic import BaseModel, field_validator
+import re
+from functools import cached_property, lru_cache
+from typing import Callable, Dict, Optional, List, Literal, Sequence, Tuple, Union
+from dataclasses import dataclass
+from pydantic import BaseModel, field_validator, model_validator
 from mitmproxy import http
-from enum import Enum
+from enum import IntEnum
 
 
-class FlowData(BaseModel):
+# (name, value) header pairs in wire order: bytes as mitmproxy holds them in
+# Headers.fields, or str pairs from callers that build flows themselves
+HeaderFields = Sequence[Tuple[Union[str, bytes], Union[str, bytes]]]
+
+
+@dataclass(slots=True, frozen=True)
+class FlowData:
+    """
+    Snapshot of a single intercepted HTTP flow.
+    Built once per flow on the proxy hot path, so it is a slotted dataclass rather than
+    a Pydantic model: no per-instance __dict__ and no validation on construction.
+    Bodies may be UTF-8 bytes straight from mitmproxy; the encoder accepts either type.
+    Headers are either a dict or a sequence of (name, value) pairs, such as mitmproxy's
+    raw header fields, which the proxy passes through untouched; pairs are encoded in
+    order without a dict in between.
+    """
     id: str
     method: str
     url: str
@@ -13,13 +31,19 @@ class FlowData(BaseModel):
     end_timestamp: float
     request_size: int 
     response_size: int
-    request_headers: Dict[str, str]
-    response_headers: Dict[str, str]
-    request_body: str
-    response_body: str
+    request_headers: Union[Dict[str, str], HeaderFields]
+    response_headers: Union[Dict[str, str], HeaderFields]
+    request_body: Union[str, bytes]
+    response_body: Union[str, bytes]
     is_intercepted: bool = False
 
-class Operator(Enum):
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    """Compiled patterns for ad-hoc Operator.apply calls; filters keep their own"""
+    return re.compile(pattern)
+
+
+class Operator(IntEnum):
     CONTAINS = 0
     EQUALS = 1
     STARTS_WITH = 2
@@ -29,7 +53,7 @@ class Operator(Enum):
     @classmethod
     def from_string(cls, value: str) -> 'Operator':
         """Convert string to Operator enum"""
-        return cls[value.upper()]
+        return _OPERATOR_BY_NAME[value.upper()]
     
     def to_string(self) -> str:
         """Convert Operator enum to string"""
@@ -54,11 +78,67 @@ class Operator(Enum):
         elif self == Operator.ENDS_WITH:
             return target.endswith(value)
         elif self == Operator.REGEX:
-            import re
-            return re.search(value, target) is not None
+            return _compile(value).search(target) is not None
         else:
             raise ValueError(f"Unknown operator: {self}")
 
+
+# Name lookups for from_string, bypassing EnumMeta.__getitem__
+_OPERATOR_BY_NAME = {member.name: member for member in Operator}
+
+
+def _request_body_text(mitm_flow: http.HTTPFlow) -> str:
+    content = mitm_flow.request.content
+    return content.decode('utf-8', errors='ignore') if content else ""
+
+
+def _never_matches(mitm_flow: http.HTTPFlow) -> bool:
+    return False
+
+
+def _build_comparator(operator: Operator, value: str, pattern: Optional[re.Pattern]) -> Callable[[str], bool]:
+    """Bind an operator and its operand into a single-argument test on the field value"""
+    if operator is Operator.CONTAINS:
+        return lambda target: value in target
+    if operator is Operator.EQUALS:
+        return lambda target: value == target
+    if operator is Operator.STARTS_WITH:
+        return lambda target: target.startswith(value)
+    if operator is Operator.ENDS_WITH:
+        return lambda target: target.endswith(value)
+    if operator is Operator.REGEX:
+        search = pattern.search
+        return lambda target: search(target) is not None
+    raise ValueError(f"Unknown operator: {operator}")
+
+
+def _build_matcher(field: str, operator: Operator, value: str,
+                   pattern: Optional[re.Pattern] = None) -> Callable[[http.HTTPFlow], bool]:
+    """
+    Resolve a filter's field and operator once into a flow predicate, so evaluating it
+    per flow is one field read and one comparison with no dispatch on either.
+    """
+    test = _build_comparator(operator, value, pattern)
+    if field == "url":
+        return lambda mitm_flow: test(mitm_flow.request.pretty_url)
+    if field == "method":
+        return lambda mitm_flow: test(mitm_flow.request.method)
+    if field.startswith("header:"):
+        header_name = field[7:]
+
+        def match_header(mitm_flow: http.HTTPFlow) -> bool:
+            header_value = mitm_flow.request.headers.get(header_name, None)
+            return header_value is not None and test(header_value)
+        return match_header
+    if field == "body":
+        return lambda mitm_flow: test(_request_body_text(mitm_flow))
+    return _never_matches
+
+
+# Fields the cached matcher and compiled_pattern are derived from
+_MATCHER_INPUTS = frozenset({'field', 'operator', 'value'})
+
+
 class FilterModel(BaseModel):
     id: Optional[int] = None
     filter_name: str
@@ -73,31 +153,48 @@ class FilterModel(BaseModel):
             raise ValueError('This field is required and cannot be empty')
         return v.strip()
 
-    def evaluate(self, mitm_flow: http.HTTPFlow) -> bool:
-        """
-        Evaluate if a filter matches the given request data
-        Now implemented with actual logic!
-        """        
-        if self.field == "url":
-            field_value = mitm_flow.request.pretty_url
-        elif self.field == "method":
-            field_value = mitm_flow.request.method
-        elif self.field.startswith("header:"):
-            header_name = self.field[7:]
-            headers = mitm_flow.request.headers 
-            if (header_value := headers.get(header_name, None)) is None:
-                return False
-            field_value = header_value
-        elif self.field == "body":
-            content = mitm_flow.request.content if mitm_flow.request.content else b""
-            field_value = content.decode('utf-8', errors='ignore')
-        else:
-            return False
+    @model_validator(mode='after')
+    def compile_matcher(self) -> 'FilterModel':
+        """Build the flow predicate once at creation, rejecting invalid REGEX patterns up front"""
+        try:
+            self.matcher
+        except re.error as e:
+            raise ValueError(f'Invalid regular expression: {e}')
+        return self
+
+    @cached_property
+    def compiled_pattern(self) -> re.Pattern:
+        """Compiled form of value, cached on the instance after first use"""
+        return re.compile(self.value)
+
+    @cached_property
+    def matcher(self) -> Callable[[http.HTTPFlow], bool]:
+        """Flow predicate for this filter, cached on the instance after first use"""
+        pattern = self.compiled_pattern if self.operator is Operator.REGEX else None
+        return _build_matcher(self.field, self.operator, self.value, pattern)
 
-        return self.operator.apply(self.value, field_value)
+    def _clear_matcher(self) -> None:
+        """Drop the cached predicate so it is rebuilt from the current field values"""
+        self.__dict__.pop('matcher', None)
+        self.__dict__.pop('compiled_pattern', None)
 
+    def __setattr__(self, name: str, value) -> None:
+        super().__setattr__(name, value)
+        if name in _MATCHER_INPUTS:
+            self._clear_matcher()
 
-class RuleAction(Enum):
+    def model_copy(self, *, update: Optional[Dict[str, object]] = None, deep: bool = False) -> 'FilterModel':
+        copied = super().model_copy(update=update, deep=deep)
+        if update and not _MATCHER_INPUTS.isdisjoint(update):
+            copied._clear_matcher()
+        return copied
+
+    def evaluate(self, mitm_flow: http.HTTPFlow) -> bool:
+        """Evaluate if a filter matches the given request data"""
+        return self.matcher(mitm_flow)
+
+
+class RuleAction(IntEnum):
     ADD_HEADER = 0
     MODIFY_HEADER = 1
     DELETE_HEADER = 2
@@ -108,7 +205,7 @@ class RuleAction(Enum):
     @classmethod
     def from_string(cls, value: str) -> 'RuleAction':
         """Convert string to RuleAction enum"""
-        return cls[value.upper()]
+        return _RULE_ACTION_BY_NAME[value.upper()]
     
     def to_string(self) -> str:
         """Convert RuleAction enum to string"""
@@ -124,6 +221,9 @@ class RuleAction(Enum):
         return self.value
 
 
+_RULE_ACTION_BY_NAME = {member.name: member for member in RuleAction}
+
+
 class RuleModel(BaseModel):
     id: Optional[int] = None
     rule_name: str
@@ -141,7 +241,35 @@ class RuleModel(BaseModel):
         return v.strip()
 
 
-class OperationType(Enum):
+@dataclass(slots=True, frozen=True)
+class CompiledRule:
+    """
+    Immutable, pre-validated view of an enabled RuleModel used on the interception hot path.
+    Built once when rules are published to the cache so per-request matching never
+    goes through Pydantic validation. Its filter is matched by filter_id against the
+    cache's filter index.
+    """
+    id: Optional[int]
+    rule_name: str
+    filter_id: int
+    action: RuleAction
+    target_key: str
+    target_value: str
+
+    @classmethod
+    def from_rule(cls, rule: RuleModel) -> 'CompiledRule':
+        """Compile a validated RuleModel"""
+        return cls(
+            id=rule.id,
+            rule_name=rule.rule_name,
+            filter_id=rule.filter_id,
+            action=rule.action,
+            target_key=rule.target_key,
+            target_value=rule.target_value,
+        )
+
+
+class OperationType(IntEnum):
     FULL_SYNC = 0
     ADD = 1
     UPDATE = 2
@@ -150,7 +278,7 @@ class OperationType(Enum):
     @classmethod
     def from_string(cls, value: str) -> 'OperationType':
         """Convert string to OperationType enum"""
-        return cls[value.upper()]
+        return _OPERATION_TYPE_BY_NAME[value.upper()]
     
     def to_string(self) -> str:
         """Convert OperationType enum to string"""
@@ -166,6 +294,9 @@ class OperationType(Enum):
         return self.value
 
 
+_OPERATION_TYPE_BY_NAME = {member.name: member for member in OperationType}
+
+
 class SyncMessage(BaseModel):
     operation: OperationType
     rules_list: List[RuleModel]
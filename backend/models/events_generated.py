@@ -10,6 +10,7 @@ class WebSocketMessageType(object):
     NONE = 0
     ServerEvent = 1
     FlowData = 2
+    FlowDataBatch = 3
 
 
 class HeaderPair(object):
@@ -300,6 +301,62 @@ def ServerEventEnd(builder):
 
 
 
+class FlowDataBatch(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def GetRootAs(cls, buf, offset=0):
+        n = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, offset)
+        x = FlowDataBatch()
+        x.Init(buf, n + offset)
+        return x
+
+    @classmethod
+    def GetRootAsFlowDataBatch(cls, buf, offset=0):
+        """This method is deprecated. Please switch to GetRootAs."""
+        return cls.GetRootAs(buf, offset)
+    # FlowDataBatch
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # FlowDataBatch
+    def Items(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            x = self._tab.Vector(o)
+            x += flatbuffers.number_types.UOffsetTFlags.py_type(j) * 4
+            x = self._tab.Indirect(x)
+            obj = FlowData()
+            obj.Init(self._tab.Bytes, x)
+            return obj
+        return None
+
+    # FlowDataBatch
+    def ItemsLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # FlowDataBatch
+    def ItemsIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        return o == 0
+
+def FlowDataBatchStart(builder):
+    builder.StartObject(1)
+
+def FlowDataBatchAddItems(builder, items):
+    builder.PrependUOffsetTRelativeSlot(0, flatbuffers.number_types.UOffsetTFlags.py_type(items), 0)
+
+def FlowDataBatchStartItemsVector(builder, numElems):
+    return builder.StartVector(4, numElems, 4)
+
+def FlowDataBatchEnd(builder):
+    return builder.EndObject()
+
+
+
 class WebSocketMessage(object):
     __slots__ = ['_tab']
 
@@ -6,8 +6,11 @@ This module provides clean utilities for converting between Python models
 and FlatBuffer objects, supporting both serialization and deserialization.
 """
 import flatbuffers
+import struct
 import time
-from typing import Dict, Optional, List, Any
+from functools import lru_cache
+from collections import deque
+from typing import Dict, Optional, List, Tuple, Union, Any
 from abc import ABC, abstractmethod
 
 # Import the generated FlatBuffer classes
@@ -40,6 +43,7 @@ from backend.models.events_generated import (
     FlowDataAddRequestSize, FlowDataAddResponseSize, FlowDataAddRequestHeaders,
     FlowDataAddResponseHeaders, FlowDataAddRequestBody, FlowDataAddResponseBody,
     FlowDataAddIsIntercepted, FlowDataStartRequestHeadersVector, FlowDataStartResponseHeadersVector,
+    FlowDataBatchStart, FlowDataBatchEnd, FlowDataBatchAddItems, FlowDataBatchStartItemsVector,
     ServerEventStart, ServerEventEnd, ServerEventAddStatus, ServerEventAddPort,
     WebSocketMessageStart, WebSocketMessageEnd, WebSocketMessageAddType,
     WebSocketMessageAddDataType, WebSocketMessageAddData
@@ -49,10 +53,14 @@ from backend.models.events_generated import (
 from backend.models.base_models import (
     FlowData as PyFlowData, FilterModel as PyFilterModel, 
     RuleModel as PyRuleModel, SyncMessage as PySyncMessage,
-    OperationType as PyOperationType, Operator as PyOperator, RuleAction as PyRuleAction
+    OperationType as PyOperationType, Operator as PyOperator, RuleAction as PyRuleAction,
+    HeaderFields
 )
 
 # ============= ENUM MAPPINGS =============
+# Built once at import and keyed by enum member, so encoding an enum is a single dict
+# probe. The Python -> FlatBuffer maps cover every member; models validate their enum
+# fields, so the builders index them directly.
 
 PYTHON_TO_FB_OPERATOR = {
     PyOperator.CONTAINS: Operator.CONTAINS,
@@ -84,324 +92,757 @@ PYTHON_TO_FB_OPERATION = {
 
 FB_TO_PYTHON_OPERATION = {v: k for k, v in PYTHON_TO_FB_OPERATION.items()}
 
-# ============= SERIALIZATION UTILITIES =============
+# ============= BUILDER POOLING =============
 
-class FlatBufferSerializer:
-    """Serializes Python models to FlatBuffer bytes"""
-    
-    def __init__(self):
-        self.builder = flatbuffers.Builder()
-    
-    def _create_header_pair(self, key: str, value: str) -> int:
-        """Create a HeaderPair FlatBuffer object"""
-        key_fb = self.builder.CreateString(key)
-        value_fb = self.builder.CreateString(value)
-        
-        HeaderPairStart(self.builder)
-        HeaderPairAddKey(self.builder, key_fb)
-        HeaderPairAddValue(self.builder, value_fb)
-        return HeaderPairEnd(self.builder)
-    
-    def _create_headers_vector(self, headers: Dict[str, str]) -> Optional[int]:
-        """Create a vector of HeaderPair objects"""
-        if not headers:
+# Builders that grew past this while encoding a large flow are not kept for reuse
+MAX_POOLED_BUILDER_SIZE = 1024 * 1024
+
+
+def _reset_builder(builder: flatbuffers.Builder, size_hint: int = 0) -> None:
+    """
+    Rewind a Builder so its existing buffer can encode a new message.
+    If size_hint exceeds the current buffer, it is replaced once up front instead of
+    being doubled (and copied) repeatedly while encoding.
+    """
+    if size_hint > len(builder.Bytes):
+        builder.Bytes = bytearray(size_hint)
+    builder.head = len(builder.Bytes)
+    builder.current_vtable = None
+    builder.vtables = {}
+    builder.nested = False
+    builder.finished = False
+    builder.minalign = 1
+    builder.objectEnd = None
+    builder.sharedStrings = {}
+
+# ============= STRING ENCODING =============
+
+_pack_uoffset = struct.Struct('<I').pack_into
+
+
+def _create_string(builder: flatbuffers.Builder, s) -> int:
+    """
+    Write a str or bytes as a FlatBuffers string and return its offset; byte-for-byte
+    the same as builder.CreateString. Skips CreateString's per-call nesting checks,
+    number validation and EndVector bookkeeping, roughly halving the cost per string.
+    """
+    data = s.encode('utf-8') if isinstance(s, str) else s
+    size = len(data)
+    # Align so the uint32 length prefix lands on a 4-byte boundary after the data and NUL
+    builder.Prep(4, size + 1)
+    buf = builder.Bytes
+    head = builder.head - size - 1
+    buf[head:head + size] = data
+    buf[head + size] = 0  # a reused buffer may hold stale bytes here
+    head -= 4
+    _pack_uoffset(buf, head, size)
+    builder.head = head
+    return len(buf) - head
+
+def _end_offset_vector(builder: flatbuffers.Builder, offsets: List[int]) -> int:
+    """
+    Fill a vector of table offsets just opened with a generated Start*Vector call and
+    end it. Writes every relative offset with one struct.pack_into instead of a
+    PrependUOffsetTRelative call per element; the bytes are identical.
+    """
+    count = len(offsets)
+    buf = builder.Bytes
+    end = len(buf)
+    # Start*Vector already aligned the head and reserved 4 bytes per element. Element i
+    # sits at head + 4*i and stores the distance forward to its table at end - offset.
+    head = builder.head - 4 * count
+    struct.pack_into(f'<{count}I', buf, head,
+                     *[end - offset - head - 4 * i for i, offset in enumerate(offsets)])
+    builder.head = head
+    return builder.EndVector()
+
+# ============= TABLE SLOTS =============
+# Replacements for the Builder.Prepend*Slot calls behind the generated *Add* functions.
+# Each is one Python call with a struct pack instead of Prepend/Prep/Pad/Place/Slot
+# and their per-call checks, and writes the same bytes.
+
+_pack_uint16 = struct.Struct('<H').pack_into
+_pack_uint32 = struct.Struct('<I').pack_into
+_pack_float64 = struct.Struct('<d').pack_into
+_pack_bool = struct.Struct('<?').pack_into
+
+
+def _prepend_scalar_slot(builder: flatbuffers.Builder, slot: int, pack, size: int, value) -> None:
+    """
+    Prepend a scalar of size bytes into vtable slot of the open table. The caller
+    skips schema defaults, as the generated functions do, and must have reserved room.
+    """
+    if size > builder.minalign:
+        builder.minalign = size
+    buf = builder.Bytes
+    end = len(buf)
+    head = builder.head
+    # Zero padding up to the scalar's alignment; a reused buffer may hold stale bytes
+    pad = (head - end) & (size - 1)
+    if pad:
+        head -= pad
+        buf[head:head + pad] = bytes(pad)
+    head -= size
+    try:
+        pack(buf, head, value)
+    except struct.error as e:
+        # Builder.Prepend* raises TypeError for out-of-range numbers; keep that contract
+        raise TypeError(f"bad number {value!r} for slot {slot}: {e}") from e
+    builder.head = head
+    builder.current_vtable[slot] = end - head
+
+def _prepend_offset_slot(builder: flatbuffers.Builder, slot: int, offset: int) -> None:
+    """Prepend a reference to an earlier object into vtable slot of the open table"""
+    if builder.minalign < 4:
+        builder.minalign = 4
+    buf = builder.Bytes
+    end = len(buf)
+    head = builder.head
+    pad = (head - end) & 3
+    if pad:
+        head -= pad
+        buf[head:head + pad] = bytes(pad)
+    head -= 4
+    _pack_uoffset(buf, head, end - head - offset)
+    builder.head = head
+    builder.current_vtable[slot] = end - head
+
+# Upper bound of a FlowData table body: nine offsets, two doubles, two uint32s, a uint16
+# and a bool, plus alignment padding
+_FLOW_DATA_TABLE_MAX_SIZE = 96
+
+# vtable key of a HeaderPair with both fields set: value at +4 and key at +8 in the table
+_HEADER_PAIR_VTABLE_KEY = (4, 8)
+_pack_header_pair = struct.Struct('<iII').pack_into
+
+
+def _write_header_pair(builder: flatbuffers.Builder, key_fb: int, value_fb: int) -> int:
+    """
+    Write a HeaderPair table and return its offset; byte-for-byte the same as the
+    generated HeaderPairStart/AddKey/AddValue/End calls. Once the message holds the
+    HeaderPair vtable, every further pair is one pack_into instead of a StartObject,
+    two slot writes and a vtable lookup through EndObject.
+    """
+    vtable = builder.vtables.get(_HEADER_PAIR_VTABLE_KEY)
+    if vtable is None:
+        HeaderPairStart(builder)
+        HeaderPairAddKey(builder, key_fb)
+        HeaderPairAddValue(builder, value_fb)
+        return HeaderPairEnd(builder)
+    # soffset to the shared vtable, then the value and key offsets, as EndObject lays them out
+    builder.Prep(4, 12)
+    head = builder.head - 12
+    object_offset = len(builder.Bytes) - head
+    _pack_header_pair(builder.Bytes, head, vtable - object_offset,
+                      object_offset - 4 - value_fb, object_offset - 8 - key_fb)
+    builder.head = head
+    return object_offset
+
+def _utf8_len(s) -> int:
+    """Encoded length of a str or bytes; str.isascii() is a flag check, so ASCII text is not encoded"""
+    if isinstance(s, bytes) or s.isascii():
+        return len(s)
+    return len(s.encode('utf-8'))
+
+def estimate_flow_data_size(flow_data: PyFlowData) -> int:
+    """Rough upper bound of the encoded size of a FlowData message, in bytes"""
+    size = 256 + len(flow_data.id) + len(flow_data.method) + _utf8_len(flow_data.url)
+    size += _utf8_len(flow_data.request_body or "") + _utf8_len(flow_data.response_body or "")
+    for headers in (flow_data.request_headers, flow_data.response_headers):
+        # Two length-prefixed strings plus the HeaderPair table and vector slot
+        pairs = headers.items() if isinstance(headers, dict) else headers
+        size += sum(_utf8_len(key) + _utf8_len(value) + 32 for key, value in pairs)
+    return size
+
+def estimate_flow_data_batch_size(flows: List[PyFlowData]) -> int:
+    """Rough upper bound of the encoded size of a FlowDataBatch message, in bytes"""
+    return 64 + sum(estimate_flow_data_size(flow_data) for flow_data in flows)
+
+def estimate_filter_size(filter_model: PyFilterModel) -> int:
+    """Rough upper bound of the encoded size of a FilterModel table, in bytes"""
+    # Three length-prefixed strings plus the table, its vtable and a vector slot
+    return 64 + _utf8_len(filter_model.filter_name) + _utf8_len(filter_model.field) + _utf8_len(filter_model.value)
+
+def estimate_rule_size(rule_model: PyRuleModel) -> int:
+    """Rough upper bound of the encoded size of a RuleModel table, in bytes"""
+    return 80 + _utf8_len(rule_model.rule_name) + _utf8_len(rule_model.target_key) + _utf8_len(rule_model.target_value)
+
+def estimate_sync_message_size(sync_message: PySyncMessage) -> int:
+    """Rough upper bound of the encoded size of a SyncMessage, in bytes"""
+    return (
+        64
+        + sum(estimate_rule_size(rule) for rule in sync_message.rules_list)
+        + sum(estimate_filter_size(filter_model) for filter_model in sync_message.filters_data)
+    )
+
+# ============= BUILDERS =============
+
+class FlatBufferBuilder(ABC):
+    """
+    Writes one FlatBuffer object into a Builder and returns its offset.
+    Builders can share an external flatbuffers.Builder so nested objects and the
+    enclosing message are encoded into the same buffer.
+    Builders are created per message, so every subclass declares __slots__ for its
+    own fields and instances carry no __dict__.
+    """
+
+    __slots__ = ('builder',)
+
+    def __init__(self, builder: Optional[flatbuffers.Builder] = None):
+        self.builder = builder if builder is not None else flatbuffers.Builder()
+
+    @abstractmethod
+    def build(self) -> Optional[int]:
+        """Write the object into the builder and return its offset"""
+
+    def get_bytes(self) -> bytes:
+        """Build the object as the root of the buffer and return the finished bytes"""
+        offset = self.build()
+        self.builder.Finish(offset)
+        # Builder.Output() slices a bytearray copy first; copy straight out of a view instead
+        return bytes(memoryview(self.builder.Bytes)[self.builder.Head():])
+
+
+class HeadersVectorBuilder(FlatBufferBuilder):
+    """Builds a vector of HeaderPair tables; returns None for empty headers"""
+
+    __slots__ = ('headers',)
+
+    # Header names come from a small vocabulary, so their UTF-8 encodings are cached.
+    # Values are high-cardinality and always encoded per call.
+    _NAME_CACHE: Dict[str, bytes] = {}
+    _NAME_CACHE_MAX_SIZE = 1024
+
+    @classmethod
+    def _encode_name(cls, name: str) -> bytes:
+        name_bytes = cls._NAME_CACHE.get(name)
+        if name_bytes is None:
+            name_bytes = name.encode('utf-8')
+            if len(cls._NAME_CACHE) < cls._NAME_CACHE_MAX_SIZE:
+                cls._NAME_CACHE[name] = name_bytes
+        return name_bytes
+
+    def __init__(self, headers: Union[Dict[str, str], HeaderFields], builder: Optional[flatbuffers.Builder] = None):
+        super().__init__(builder)
+        self.headers = headers
+
+    @classmethod
+    def _encode_headers(cls, headers) -> HeaderFields:
+        """
+        UTF-8 pairs for a header dict. Pair sequences pass through as they are, since
+        _create_string writes str and bytes alike.
+        """
+        if not isinstance(headers, dict):
+            return headers
+        encode_name = cls._encode_name
+        return [(encode_name(key), value.encode('utf-8')) for key, value in headers.items()]
+
+    def build(self) -> Optional[int]:
+        if not self.headers:
             return None
-        
-        # Create all HeaderPair objects
+        return self._emit_vector(self.builder, self._encode_headers(self.headers))
+
+    @classmethod
+    def build_pair(cls, request_headers, response_headers,
+                   builder: flatbuffers.Builder) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Build the request and response header vectors of one flow in a single pass.
+        Both sides are encoded together, then each is emitted as its own vector,
+        request first, so the output matches two separate build() calls.
+        """
+        request_encoded = cls._encode_headers(request_headers)
+        response_encoded = cls._encode_headers(response_headers)
+        emit = cls._emit_vector
+        return (
+            emit(builder, request_encoded) if request_encoded else None,
+            emit(builder, response_encoded) if response_encoded else None,
+        )
+
+    @staticmethod
+    def _emit_vector(builder: flatbuffers.Builder, encoded: HeaderFields) -> int:
+        # Emit the pre-encoded pairs with locally bound functions to keep attribute
+        # lookups out of the per-header loop. Header names repeat across the request and
+        # response of a flow (Content-Type, Content-Length, ...), so each name is written
+        # once per message through the builder's shared string table.
+        create_string = _create_string
+        write_pair = _write_header_pair
+        shared = builder.sharedStrings
+
         header_offsets = []
-        for key, value in headers.items():
-            header_offset = self._create_header_pair(key, value)
-            header_offsets.append(header_offset)
-        
-        # Create vector (in reverse order)
-        FlowDataStartRequestHeadersVector(self.builder, len(header_offsets))
-        for offset in reversed(header_offsets):
-            self.builder.PrependUOffsetTRelative(offset)
-        return self.builder.EndVector(len(header_offsets))
-    
-    def serialize_flow_data(self, flow_data: PyFlowData) -> bytes:
-        """Serialize FlowData to FlatBuffer bytes"""
-        self.builder = flatbuffers.Builder()
-        
-        # Create strings
-        id_fb = self.builder.CreateString(flow_data.id)
-        method_fb = self.builder.CreateString(flow_data.method)
-        url_fb = self.builder.CreateString(flow_data.url)
-        request_body_fb = self.builder.CreateString(flow_data.request_body or "")
-        response_body_fb = self.builder.CreateString(flow_data.response_body or "")
-        
+        append = header_offsets.append
+        for key_bytes, value_bytes in encoded:
+            key_fb = shared.get(key_bytes)
+            if key_fb is None:
+                key_fb = shared[key_bytes] = create_string(builder, key_bytes)
+            append(write_pair(builder, key_fb, create_string(builder, value_bytes)))
+
+        FlowDataStartRequestHeadersVector(builder, len(header_offsets))
+        return _end_offset_vector(builder, header_offsets)
+
+
+class FlowDataBuilder(FlatBufferBuilder):
+    """Builds a FlowData table"""
+
+    __slots__ = ('flow_data',)
+
+    def __init__(self, flow_data: PyFlowData, builder: Optional[flatbuffers.Builder] = None):
+        if builder is None:
+            builder = flatbuffers.Builder(estimate_flow_data_size(flow_data))
+        super().__init__(builder)
+        self.flow_data = flow_data
+
+    def build(self) -> int:
+        return self.write(self.builder, self.flow_data)
+
+    @staticmethod
+    def write(builder: flatbuffers.Builder, flow_data: PyFlowData) -> int:
+        """Write one FlowData table without going through a builder object"""
+        create_string = _create_string
+
+        # Create strings. Methods come from a handful of verbs, so like header names
+        # they are written once per message through the shared string table; flows in
+        # a FlowDataBatch then all point at the same "GET".
+        id_fb = create_string(builder, flow_data.id)
+        shared = builder.sharedStrings
+        method_fb = shared.get(flow_data.method)
+        if method_fb is None:
+            method_fb = shared[flow_data.method] = create_string(builder, flow_data.method)
+        url_fb = create_string(builder, flow_data.url)
+        request_body_fb = create_string(builder, flow_data.request_body or "")
+        response_body_fb = create_string(builder, flow_data.response_body or "")
+
         # Create header vectors
-        request_headers_fb = self._create_headers_vector(flow_data.request_headers)
-        response_headers_fb = self._create_headers_vector(flow_data.response_headers)
-        
-        # Create FlowData
-        FlowDataStart(self.builder)
-        FlowDataAddId(self.builder, id_fb)
-        FlowDataAddMethod(self.builder, method_fb)
-        FlowDataAddUrl(self.builder, url_fb)
-        FlowDataAddStatus(self.builder, flow_data.status)
-        FlowDataAddStartTimestamp(self.builder, flow_data.start_timestamp)
-        FlowDataAddEndTimestamp(self.builder, flow_data.end_timestamp)
-        FlowDataAddRequestSize(self.builder, flow_data.request_size)
-        FlowDataAddResponseSize(self.builder, flow_data.response_size)
-        
+        request_headers_fb, response_headers_fb = HeadersVectorBuilder.build_pair(
+            flow_data.request_headers, flow_data.response_headers, builder
+        )
+
+        # Create FlowData. Scalars left at their schema default (0, 0.0, False) are
+        # omitted, as the generated FlowDataAdd* functions do, so they cost no table
+        # space. Slot numbers follow the field order in schema/common.fbs.
+        builder.Prep(1, _FLOW_DATA_TABLE_MAX_SIZE)  # grow once; size 1 adds no padding
+        FlowDataStart(builder)
+        offset_slot, scalar_slot = _prepend_offset_slot, _prepend_scalar_slot
+        offset_slot(builder, 0, id_fb)
+        offset_slot(builder, 1, method_fb)
+        offset_slot(builder, 2, url_fb)
+        if flow_data.status:
+            scalar_slot(builder, 3, _pack_uint16, 2, flow_data.status)
+        if flow_data.start_timestamp:
+            scalar_slot(builder, 4, _pack_float64, 8, flow_data.start_timestamp)
+        if flow_data.end_timestamp:
+            scalar_slot(builder, 5, _pack_float64, 8, flow_data.end_timestamp)
+        if flow_data.request_size:
+            scalar_slot(builder, 6, _pack_uint32, 4, flow_data.request_size)
+        if flow_data.response_size:
+            scalar_slot(builder, 7, _pack_uint32, 4, flow_data.response_size)
+
         if request_headers_fb:
-            FlowDataAddRequestHeaders(self.builder, request_headers_fb)
+            offset_slot(builder, 8, request_headers_fb)
         if response_headers_fb:
-            FlowDataAddResponseHeaders(self.builder, response_headers_fb)
-        
-        FlowDataAddRequestBody(self.builder, request_body_fb)
-        FlowDataAddResponseBody(self.builder, response_body_fb)
-        FlowDataAddIsIntercepted(self.builder, flow_data.is_intercepted)
-        
-        flow_offset = FlowDataEnd(self.builder)
-        self.builder.Finish(flow_offset)
-        return bytes(self.builder.Output())
-    
-    def serialize_filter_model(self, filter_model: PyFilterModel) -> bytes:
-        """Serialize FilterModel to FlatBuffer bytes"""
-        self.builder = flatbuffers.Builder()
-        
+            offset_slot(builder, 9, response_headers_fb)
+
+        offset_slot(builder, 10, request_body_fb)
+        offset_slot(builder, 11, response_body_fb)
+        if flow_data.is_intercepted:
+            scalar_slot(builder, 12, _pack_bool, 1, True)
+
+        return FlowDataEnd(builder)
+
+
+class FlowDataBatchBuilder(FlatBufferBuilder):
+    """Builds a FlowDataBatch table holding several FlowData tables"""
+
+    __slots__ = ('flows',)
+
+    def __init__(self, flows: List[PyFlowData], builder: Optional[flatbuffers.Builder] = None):
+        if builder is None:
+            builder = flatbuffers.Builder(estimate_flow_data_batch_size(flows))
+        super().__init__(builder)
+        self.flows = flows
+
+    def build(self) -> int:
+        return self.write(self.builder, self.flows)
+
+    @staticmethod
+    def write(builder: flatbuffers.Builder, flows: List[PyFlowData]) -> int:
+        """
+        Write every flow into the same buffer, then the vector and table around them.
+        Vtables and shared header names are reused across all flows in the batch.
+        """
+        write_flow = FlowDataBuilder.write
+        flow_offsets = [write_flow(builder, flow_data) for flow_data in flows]
+
+        FlowDataBatchStartItemsVector(builder, len(flow_offsets))
+        items_fb = _end_offset_vector(builder, flow_offsets)
+
+        FlowDataBatchStart(builder)
+        FlowDataBatchAddItems(builder, items_fb)
+        return FlowDataBatchEnd(builder)
+
+
+class FilterModelBuilder(FlatBufferBuilder):
+    """Builds a FilterModel table"""
+
+    __slots__ = ('filter_model',)
+
+    def __init__(self, filter_model: PyFilterModel, builder: Optional[flatbuffers.Builder] = None):
+        if builder is None:
+            builder = flatbuffers.Builder(estimate_filter_size(filter_model))
+        super().__init__(builder)
+        self.filter_model = filter_model
+
+    def build(self) -> int:
+        return self.write(self.builder, self.filter_model)
+
+    @staticmethod
+    def write(builder: flatbuffers.Builder, filter_model: PyFilterModel) -> int:
+        """Write one FilterModel table; lets vector builders skip a builder object per filter"""
         # Create strings
-        filter_name_fb = self.builder.CreateString(filter_model.filter_name)
-        field_fb = self.builder.CreateString(filter_model.field)
-        value_fb = self.builder.CreateString(filter_model.value)
-        
+        filter_name_fb = _create_string(builder, filter_model.filter_name)
+        field_fb = _create_string(builder, filter_model.field)
+        value_fb = _create_string(builder, filter_model.value)
+
         # Convert enum
-        operator_fb = PYTHON_TO_FB_OPERATOR.get(filter_model.operator, Operator.CONTAINS)
-        
-        FilterModelStart(self.builder)
+        operator_fb = PYTHON_TO_FB_OPERATOR[filter_model.operator]
+
+        FilterModelStart(builder)
         if filter_model.id is not None:
-            FilterModelAddId(self.builder, filter_model.id)
-        FilterModelAddFilterName(self.builder, filter_name_fb)
-        FilterModelAddField(self.builder, field_fb)
-        FilterModelAddOperator(self.builder, operator_fb)
-        FilterModelAddValue(self.builder, value_fb)
-        
-        filter_offset = FilterModelEnd(self.builder)
-        self.builder.Finish(filter_offset)
-        return bytes(self.builder.Output())
-    
-    def serialize_rule_model(self, rule_model: PyRuleModel) -> bytes:
-        """Serialize RuleModel to FlatBuffer bytes"""
-        self.builder = flatbuffers.Builder()
-        
+            FilterModelAddId(builder, filter_model.id)
+        FilterModelAddFilterName(builder, filter_name_fb)
+        FilterModelAddField(builder, field_fb)
+        FilterModelAddOperator(builder, operator_fb)
+        FilterModelAddValue(builder, value_fb)
+
+        return FilterModelEnd(builder)
+
+
+class RuleModelBuilder(FlatBufferBuilder):
+    """Builds a RuleModel table"""
+
+    __slots__ = ('rule_model',)
+
+    def __init__(self, rule_model: PyRuleModel, builder: Optional[flatbuffers.Builder] = None):
+        if builder is None:
+            builder = flatbuffers.Builder(estimate_rule_size(rule_model))
+        super().__init__(builder)
+        self.rule_model = rule_model
+
+    def build(self) -> int:
+        return self.write(self.builder, self.rule_model)
+
+    @staticmethod
+    def write(builder: flatbuffers.Builder, rule_model: PyRuleModel) -> int:
+        """Write one RuleModel table; lets vector builders skip a builder object per rule"""
         # Create strings
-        rule_name_fb = self.builder.CreateString(rule_model.rule_name)
-        target_key_fb = self.builder.CreateString(rule_model.target_key)
-        target_value_fb = self.builder.CreateString(rule_model.target_value)
-        
+        rule_name_fb = _create_string(builder, rule_model.rule_name)
+        target_key_fb = _create_string(builder, rule_model.target_key)
+        target_value_fb = _create_string(builder, rule_model.target_value)
+
         # Convert enum
-        action_fb = PYTHON_TO_FB_ACTION.get(rule_model.action, RuleAction.ADD_HEADER)
-        
-        RuleModelStart(self.builder)
+        action_fb = PYTHON_TO_FB_ACTION[rule_model.action]
+
+        RuleModelStart(builder)
         if rule_model.id is not None:
-            RuleModelAddId(self.builder, rule_model.id)
-        RuleModelAddRuleName(self.builder, rule_name_fb)
-        RuleModelAddFilterId(self.builder, rule_model.filter_id)
-        RuleModelAddAction(self.builder, action_fb)
-        RuleModelAddTargetKey(self.builder, target_key_fb)
-        RuleModelAddTargetValue(self.builder, target_value_fb)
-        RuleModelAddEnabled(self.builder, rule_model.enabled)
-        
-        rule_offset = RuleModelEnd(self.builder)
-        self.builder.Finish(rule_offset)
-        return bytes(self.builder.Output())
-    
-    def _create_rules_vector(self, rules: List[PyRuleModel]) -> Optional[int]:
-        """Create a vector of RuleModel objects"""
+            RuleModelAddId(builder, rule_model.id)
+        RuleModelAddRuleName(builder, rule_name_fb)
+        RuleModelAddFilterId(builder, rule_model.filter_id)
+        RuleModelAddAction(builder, action_fb)
+        RuleModelAddTargetKey(builder, target_key_fb)
+        RuleModelAddTargetValue(builder, target_value_fb)
+        RuleModelAddEnabled(builder, rule_model.enabled)
+
+        return RuleModelEnd(builder)
+
+
+class RulesVectorBuilder(FlatBufferBuilder):
+    """Builds the SyncMessage vector of RuleModel tables; returns None for no rules"""
+
+    __slots__ = ('rules',)
+
+    def __init__(self, rules: List[PyRuleModel], builder: Optional[flatbuffers.Builder] = None):
+        super().__init__(builder)
+        self.rules = rules
+
+    def build(self) -> Optional[int]:
+        return self.write(self.builder, self.rules)
+
+    @staticmethod
+    def write(builder: flatbuffers.Builder, rules: List[PyRuleModel]) -> Optional[int]:
+        """Write the rule tables and their vector into builder, allocating nothing else"""
         if not rules:
             return None
-        
-        # Create all RuleModel objects
-        rule_offsets = []
-        for rule in rules:
-            # Create strings
-            rule_name_fb = self.builder.CreateString(rule.rule_name)
-            target_key_fb = self.builder.CreateString(rule.target_key)
-            target_value_fb = self.builder.CreateString(rule.target_value)
-            
-            # Convert enum
-            action_fb = PYTHON_TO_FB_ACTION.get(rule.action, RuleAction.ADD_HEADER)
-            
-            RuleModelStart(self.builder)
-            if rule.id is not None:
-                RuleModelAddId(self.builder, rule.id)
-            RuleModelAddRuleName(self.builder, rule_name_fb)
-            RuleModelAddFilterId(self.builder, rule.filter_id)
-            RuleModelAddAction(self.builder, action_fb)
-            RuleModelAddTargetKey(self.builder, target_key_fb)
-            RuleModelAddTargetValue(self.builder, target_value_fb)
-            RuleModelAddEnabled(self.builder, rule.enabled)
-            
-            rule_offset = RuleModelEnd(self.builder)
-            rule_offsets.append(rule_offset)
-        
-        # Create vector (in reverse order)
-        SyncMessageStartRulesListVector(self.builder, len(rule_offsets))
-        for offset in reversed(rule_offsets):
-            self.builder.PrependUOffsetTRelative(offset)
-        return self.builder.EndVector(len(rule_offsets))
-    
-    def _create_filters_vector(self, filters: List[PyFilterModel]) -> Optional[int]:
-        """Create a vector of FilterModel objects"""
+
+        write = RuleModelBuilder.write
+        rule_offsets = [write(builder, rule) for rule in rules]
+
+        SyncMessageStartRulesListVector(builder, len(rule_offsets))
+        return _end_offset_vector(builder, rule_offsets)
+
+
+class FiltersVectorBuilder(FlatBufferBuilder):
+    """Builds the SyncMessage vector of FilterModel tables; returns None for no filters"""
+
+    __slots__ = ('filters',)
+
+    def __init__(self, filters: List[PyFilterModel], builder: Optional[flatbuffers.Builder] = None):
+        super().__init__(builder)
+        self.filters = filters
+
+    def build(self) -> Optional[int]:
+        return self.write(self.builder, self.filters)
+
+    @staticmethod
+    def write(builder: flatbuffers.Builder, filters: List[PyFilterModel]) -> Optional[int]:
+        """Write the filter tables and their vector into builder, allocating nothing else"""
         if not filters:
             return None
-        
-        # Create all FilterModel objects
-        filter_offsets = []
-        for filter_model in filters:
-            # Create strings
-            filter_name_fb = self.builder.CreateString(filter_model.filter_name)
-            field_fb = self.builder.CreateString(filter_model.field)
-            value_fb = self.builder.CreateString(filter_model.value)
-            
-            # Convert enum
-            operator_fb = PYTHON_TO_FB_OPERATOR.get(filter_model.operator, Operator.CONTAINS)
-            
-            FilterModelStart(self.builder)
-            if filter_model.id is not None:
-                FilterModelAddId(self.builder, filter_model.id)
-            FilterModelAddFilterName(self.builder, filter_name_fb)
-            FilterModelAddField(self.builder, field_fb)
-            FilterModelAddOperator(self.builder, operator_fb)
-            FilterModelAddValue(self.builder, value_fb)
-            
-            filter_offset = FilterModelEnd(self.builder)
-            filter_offsets.append(filter_offset)
-        
-        # Create vector (in reverse order)
-        SyncMessageStartFiltersDataVector(self.builder, len(filter_offsets))
-        for offset in reversed(filter_offsets):
-            self.builder.PrependUOffsetTRelative(offset)
-        return self.builder.EndVector(len(filter_offsets))
-    
-    def serialize_sync_message(self, sync_message: PySyncMessage) -> bytes:
-        """Serialize SyncMessage to FlatBuffer bytes"""
-        self.builder = flatbuffers.Builder()
-        
+
+        write = FilterModelBuilder.write
+        filter_offsets = [write(builder, filter_model) for filter_model in filters]
+
+        SyncMessageStartFiltersDataVector(builder, len(filter_offsets))
+        return _end_offset_vector(builder, filter_offsets)
+
+
+class SyncMessageBuilder(FlatBufferBuilder):
+    """
+    Builds a SyncMessage table stamped with the current time, or with timestamp when
+    given so several messages sent together can share one capture time.
+    """
+
+    __slots__ = ('sync_message', 'timestamp')
+
+    def __init__(self, sync_message: PySyncMessage, builder: Optional[flatbuffers.Builder] = None,
+                 timestamp: Optional[float] = None):
+        if builder is None:
+            builder = flatbuffers.Builder(estimate_sync_message_size(sync_message))
+        super().__init__(builder)
+        self.sync_message = sync_message
+        self.timestamp = timestamp
+
+    def build(self) -> int:
         # Convert enum
-        operation_fb = PYTHON_TO_FB_OPERATION.get(sync_message.operation, OperationType.FULL_SYNC)
-        
-        # Create vectors
-        rules_vector_fb = self._create_rules_vector(sync_message.rules_list)
-        filters_vector_fb = self._create_filters_vector(sync_message.filters_data)
-        
+        operation_fb = PYTHON_TO_FB_OPERATION[self.sync_message.operation]
+
+        # Create vectors. Nested tables go straight into this message's buffer through
+        # the static writers, so a sync costs one Builder however many rules it carries.
+        rules_vector_fb = RulesVectorBuilder.write(self.builder, self.sync_message.rules_list)
+        filters_vector_fb = FiltersVectorBuilder.write(self.builder, self.sync_message.filters_data)
+
         SyncMessageStart(self.builder)
         SyncMessageAddOperation(self.builder, operation_fb)
         if rules_vector_fb:
             SyncMessageAddRulesList(self.builder, rules_vector_fb)
         if filters_vector_fb:
             SyncMessageAddFiltersData(self.builder, filters_vector_fb)
-        SyncMessageAddTimestamp(self.builder, time.time())
-        
-        sync_offset = SyncMessageEnd(self.builder)
-        self.builder.Finish(sync_offset)
-        return bytes(self.builder.Output())
+        SyncMessageAddTimestamp(self.builder, time.time() if self.timestamp is None else self.timestamp)
+
+        return SyncMessageEnd(self.builder)
+
+
+class ServerEventBuilder(FlatBufferBuilder):
+    """Builds a ServerEvent table"""
+
+    __slots__ = ('status', 'port')
+
+    def __init__(self, status: str, port: int, builder: Optional[flatbuffers.Builder] = None):
+        super().__init__(builder)
+        self.status = status
+        self.port = port
+
+    def build(self) -> int:
+        return self.write(self.builder, self.status, self.port)
+
+    @staticmethod
+    def write(builder: flatbuffers.Builder, status: str, port: int) -> int:
+        """Write one ServerEvent table without going through a builder object"""
+        status_fb = _create_string(builder, status)
+
+        ServerEventStart(builder)
+        ServerEventAddStatus(builder, status_fb)
+        ServerEventAddPort(builder, port)
+        return ServerEventEnd(builder)
+
+
+class WebSocketMessageBuilder(FlatBufferBuilder):
+    """
+    Builds a WebSocketMessage wrapping a union payload.
+    The payload is either a builder writing into the same buffer, or an
+    offset that has already been written into it.
+    """
+
+    __slots__ = ('message_type', 'data_type', 'data')
+
+    def __init__(self, message_type: str, data_type: int, data: Any,
+                 builder: Optional[flatbuffers.Builder] = None):
+        super().__init__(builder)
+        self.message_type = message_type
+        self.data_type = data_type
+        self.data = data
+
+    def build(self) -> int:
+        data_offset = self.data.build() if isinstance(self.data, FlatBufferBuilder) else self.data
+        return self.write(self.builder, self.message_type, self.data_type, data_offset)
+
+    @staticmethod
+    def write(builder: flatbuffers.Builder, message_type: str, data_type: int, data_offset: int) -> int:
+        """Write the WebSocketMessage wrapper around a payload already in the buffer"""
+        type_fb = _create_string(builder, message_type)
+
+        WebSocketMessageStart(builder)
+        WebSocketMessageAddType(builder, type_fb)
+        WebSocketMessageAddDataType(builder, data_type)
+        WebSocketMessageAddData(builder, data_offset)
+        return WebSocketMessageEnd(builder)
+
+
+# ============= SERIALIZATION UTILITIES =============
+
+class FlatBufferSerializer:
+    """Serializes Python models to FlatBuffer bytes, reusing one Builder across calls"""
+    
+    def __init__(self, builder: Optional[flatbuffers.Builder] = None):
+        self.builder = builder if builder is not None else flatbuffers.Builder()
+
+    def _finish(self, object_builder: FlatBufferBuilder, size_hint: int = 0) -> bytes:
+        """Rewind the shared builder, then encode object_builder as the buffer root"""
+        _reset_builder(self.builder, size_hint)
+        return object_builder.get_bytes()
+    
+    def serialize_flow_data(self, flow_data: PyFlowData) -> bytes:
+        """Serialize FlowData to FlatBuffer bytes"""
+        return self._finish(FlowDataBuilder(flow_data, self.builder), estimate_flow_data_size(flow_data))
+    
+    def serialize_filter_model(self, filter_model: PyFilterModel) -> bytes:
+        """Serialize FilterModel to FlatBuffer bytes"""
+        return self._finish(FilterModelBuilder(filter_model, self.builder), estimate_filter_size(filter_model))
+    
+    def serialize_rule_model(self, rule_model: PyRuleModel) -> bytes:
+        """Serialize RuleModel to FlatBuffer bytes"""
+        return self._finish(RuleModelBuilder(rule_model, self.builder), estimate_rule_size(rule_model))
+    
+    def serialize_sync_message(self, sync_message: PySyncMessage, timestamp: Optional[float] = None) -> bytes:
+        """Serialize SyncMessage to FlatBuffer bytes"""
+        return self._finish(
+            SyncMessageBuilder(sync_message, self.builder, timestamp), estimate_sync_message_size(sync_message)
+        )
     
     def serialize_server_event(self, status: str, port: int) -> bytes:
         """Serialize ServerEvent to FlatBuffer bytes"""
-        self.builder = flatbuffers.Builder()
-        
-        # Create string
-        status_fb = self.builder.CreateString(status)
-        
-        ServerEventStart(self.builder)
-        ServerEventAddStatus(self.builder, status_fb)
-        ServerEventAddPort(self.builder, port)
-        
-        server_event_offset = ServerEventEnd(self.builder)
-        self.builder.Finish(server_event_offset)
-        return bytes(self.builder.Output())
+        return self._finish(ServerEventBuilder(status, port, self.builder))
     
     def serialize_websocket_message(self, message_type: str, data_type: int, data_offset: int) -> bytes:
         """Serialize WebSocketMessage to FlatBuffer bytes"""
-        self.builder = flatbuffers.Builder()
-        
-        # Create string
-        type_fb = self.builder.CreateString(message_type)
-        
-        WebSocketMessageStart(self.builder)
-        WebSocketMessageAddType(self.builder, type_fb)
-        WebSocketMessageAddDataType(self.builder, data_type)
-        WebSocketMessageAddData(self.builder, data_offset)
-        
-        ws_message_offset = WebSocketMessageEnd(self.builder)
-        self.builder.Finish(ws_message_offset)
-        return bytes(self.builder.Output())
+        return self._finish(WebSocketMessageBuilder(message_type, data_type, data_offset, self.builder))
     
     def create_server_event_message(self, status: str, port: int) -> bytes:
         """Create a complete WebSocket message containing ServerEvent"""
-        self.builder = flatbuffers.Builder()
-        
-        # Create ServerEvent first
-        status_fb = self.builder.CreateString(status)
-        
-        ServerEventStart(self.builder)
-        ServerEventAddStatus(self.builder, status_fb)
-        ServerEventAddPort(self.builder, port)
-        server_event_offset = ServerEventEnd(self.builder)
-        
-        # Create WebSocketMessage
-        type_fb = self.builder.CreateString("server_event")
-        
-        WebSocketMessageStart(self.builder)
-        WebSocketMessageAddType(self.builder, type_fb)
-        WebSocketMessageAddDataType(self.builder, WebSocketMessageType.ServerEvent)
-        WebSocketMessageAddData(self.builder, server_event_offset)
-        
-        ws_message_offset = WebSocketMessageEnd(self.builder)
-        self.builder.Finish(ws_message_offset)
-        return bytes(self.builder.Output())
-    
-    def create_flow_data_message(self, flow_data: PyFlowData) -> bytes:
+        builder = self.builder
+        _reset_builder(builder)
+        builder.Finish(WebSocketMessageBuilder.write(
+            builder, "server_event", WebSocketMessageType.ServerEvent,
+            ServerEventBuilder.write(builder, status, port)
+        ))
+        return bytes(memoryview(builder.Bytes)[builder.Head():])
+
+    def create_flow_data_message(self, flow_data: PyFlowData, initial_size: Optional[int] = None) -> bytes:
         """Create a complete WebSocket message containing FlowData"""
-        self.builder = flatbuffers.Builder()
-        
-        # Create FlowData first
-        id_fb = self.builder.CreateString(flow_data.id)
-        method_fb = self.builder.CreateString(flow_data.method)
-        url_fb = self.builder.CreateString(flow_data.url)
-        request_body_fb = self.builder.CreateString(flow_data.request_body or "")
-        response_body_fb = self.builder.CreateString(flow_data.response_body or "")
-        
-        # Create header vectors
-        request_headers_fb = self._create_headers_vector(flow_data.request_headers)
-        response_headers_fb = self._create_headers_vector(flow_data.response_headers)
-        
-        # Create FlowData
-        FlowDataStart(self.builder)
-        FlowDataAddId(self.builder, id_fb)
-        FlowDataAddMethod(self.builder, method_fb)
-        FlowDataAddUrl(self.builder, url_fb)
-        FlowDataAddStatus(self.builder, flow_data.status)
-        FlowDataAddStartTimestamp(self.builder, flow_data.start_timestamp)
-        FlowDataAddEndTimestamp(self.builder, flow_data.end_timestamp)
-        FlowDataAddRequestSize(self.builder, flow_data.request_size)
-        FlowDataAddResponseSize(self.builder, flow_data.response_size)
-        
-        if request_headers_fb:
-            FlowDataAddRequestHeaders(self.builder, request_headers_fb)
-        if response_headers_fb:
-            FlowDataAddResponseHeaders(self.builder, response_headers_fb)
-        
-        FlowDataAddRequestBody(self.builder, request_body_fb)
-        FlowDataAddResponseBody(self.builder, response_body_fb)
-        FlowDataAddIsIntercepted(self.builder, flow_data.is_intercepted)
-        
-        flow_data_offset = FlowDataEnd(self.builder)
-        
-        # Create WebSocketMessage
-        type_fb = self.builder.CreateString("flow_event")
-        
-        WebSocketMessageStart(self.builder)
-        WebSocketMessageAddType(self.builder, type_fb)
-        WebSocketMessageAddDataType(self.builder, WebSocketMessageType.FlowData)
-        WebSocketMessageAddData(self.builder, flow_data_offset)
-        
-        ws_message_offset = WebSocketMessageEnd(self.builder)
-        self.builder.Finish(ws_message_offset)
-        return bytes(self.builder.Output())
+        if initial_size is None:
+            initial_size = estimate_flow_data_size(flow_data)
+        builder = self.builder
+        _reset_builder(builder, initial_size)
+        builder.Finish(WebSocketMessageBuilder.write(
+            builder, "flow_event", WebSocketMessageType.FlowData,
+            FlowDataBuilder.write(builder, flow_data)
+        ))
+        return bytes(memoryview(builder.Bytes)[builder.Head():])
+
+    def create_flow_data_batch_message(self, flows: List[PyFlowData]) -> bytes:
+        """Create one WebSocket message containing all of flows as a FlowDataBatch"""
+        builder = self.builder
+        _reset_builder(builder, estimate_flow_data_batch_size(flows))
+        builder.Finish(WebSocketMessageBuilder.write(
+            builder, "flow_batch_event", WebSocketMessageType.FlowDataBatch,
+            FlowDataBatchBuilder.write(builder, flows)
+        ))
+        return bytes(memoryview(builder.Bytes)[builder.Head():])
+
+
+class MessageFactory:
+    """
+    Builds outbound FlatBuffer messages using a bounded pool of serializers.
+    Each serializer keeps its Builder buffer between messages, so steady-state
+    encoding does not allocate a fresh bytearray per flow.
+    """
+
+    _pool: deque = deque(maxlen=64)
+
+    @classmethod
+    def _acquire(cls) -> FlatBufferSerializer:
+        """Take a pooled serializer, or create one if the pool is empty"""
+        try:
+            return cls._pool.pop()
+        except IndexError:
+            return FlatBufferSerializer()
+
+    @classmethod
+    def recycle(cls, serializer: FlatBufferSerializer) -> None:
+        """Return a serializer to the pool once its output has been copied out"""
+        if len(serializer.builder.Bytes) <= MAX_POOLED_BUILDER_SIZE:
+            cls._pool.append(serializer)
+
+    @classmethod
+    def _build(cls, method_name: str, *args) -> Any:
+        serializer = cls._acquire()
+        try:
+            return getattr(serializer, method_name)(*args)
+        finally:
+            cls.recycle(serializer)
+
+    @classmethod
+    def create_flow_data_message(cls, flow_data: PyFlowData, initial_size: Optional[int] = None) -> bytes:
+        """
+        Create a complete WebSocket message containing FlowData.
+        The builder is sized from initial_size, or from an estimate of the flow's encoded size.
+        """
+        return cls._build('create_flow_data_message', flow_data, initial_size)
+
+    @classmethod
+    def create_flow_data_batch_message(cls, flows: List[PyFlowData]) -> bytes:
+        """
+        Create a single WebSocket message carrying all of flows, so the message framing
+        and the send are paid once per batch rather than once per flow.
+        """
+        return cls._build('create_flow_data_batch_message', flows)
+
+    @classmethod
+    def create_filter_message(cls, filter_model: PyFilterModel) -> bytes:
+        """Serialize a FilterModel"""
+        return cls._build('serialize_filter_model', filter_model)
+
+    @classmethod
+    def create_rule_message(cls, rule_model: PyRuleModel) -> bytes:
+        """Serialize a RuleModel"""
+        return cls._build('serialize_rule_model', rule_model)
+
+    @classmethod
+    def create_sync_message(cls, sync_message: PySyncMessage, timestamp: Optional[float] = None) -> bytes:
+        """Serialize a SyncMessage, stamped with timestamp if given or the current time"""
+        return cls._build('serialize_sync_message', sync_message, timestamp)
+
+    @classmethod
+    def create_full_sync_message(cls, rules: List[PyRuleModel], filters: List[PyFilterModel]) -> bytes:
+        """Create a full sync message with all rules and filters"""
+        return cls.create_sync_message(PySyncMessage(
+            operation=PyOperationType.FULL_SYNC,
+            rules_list=rules,
+            filters_data=filters
+        ))
+
+    @classmethod
+    def create_server_event_message(cls, status: str, port: int) -> bytes:
+        """Create a complete WebSocket message containing ServerEvent"""
+        return cls._build('create_server_event_message', status, port)
 
 
 # ============= DESERIALIZATION UTILITIES =============
@@ -630,19 +1071,19 @@ class FlatBufferDeserializer:
 # Serialization shortcuts
 def serialize_flow_data(flow_data: PyFlowData) -> bytes:
     """Serialize FlowData to bytes"""
-    return FlatBufferSerializer().serialize_flow_data(flow_data)
+    return MessageFactory._build('serialize_flow_data', flow_data)
 
 def serialize_filter_model(filter_model: PyFilterModel) -> bytes:
     """Serialize FilterModel to bytes"""
-    return FlatBufferSerializer().serialize_filter_model(filter_model)
+    return MessageFactory.create_filter_message(filter_model)
 
 def serialize_rule_model(rule_model: PyRuleModel) -> bytes:
     """Serialize RuleModel to bytes"""
-    return FlatBufferSerializer().serialize_rule_model(rule_model)
+    return MessageFactory.create_rule_message(rule_model)
 
 def serialize_sync_message(sync_message: PySyncMessage) -> bytes:
     """Serialize SyncMessage to bytes"""
-    return FlatBufferSerializer().serialize_sync_message(sync_message)
+    return MessageFactory.create_sync_message(sync_message)
 
 def create_full_sync_message(rules: List[PyRuleModel], filters: List[PyFilterModel]) -> bytes:
     """Create a full sync message with all rules and filters"""
@@ -673,15 +1114,24 @@ def deserialize_sync_message(buffer: bytes) -> PySyncMessage:
 # WebSocket message utilities
 def serialize_server_event(status: str, port: int) -> bytes:
     """Serialize ServerEvent to bytes"""
-    return FlatBufferSerializer().serialize_server_event(status, port)
+    return MessageFactory._build('serialize_server_event', status, port)
 
 def create_server_event_message(status: str, port: int) -> bytes:
     """Create a complete WebSocket message containing ServerEvent"""
-    return FlatBufferSerializer().create_server_event_message(status, port)
+    return _server_event_bytes(status, port)
+
+@lru_cache(maxsize=32)
+def _server_event_bytes(status: str, port: int) -> bytes:
+    """Server events carry no timestamp, so each (status, port) pair is encoded once and reused"""
+    return MessageFactory.create_server_event_message(status, port)
 
 def create_flow_data_message(flow_data: PyFlowData) -> bytes:
     """Create a complete WebSocket message containing FlowData"""
-    return FlatBufferSerializer().create_flow_data_message(flow_data)
+    return MessageFactory.create_flow_data_message(flow_data)
+
+def create_flow_message(flow_data: PyFlowData) -> bytes:
+    """Create a complete WebSocket message containing FlowData"""
+    return MessageFactory.create_flow_data_message(flow_data)
 
 def deserialize_server_event(buffer: bytes) -> dict:
     """Deserialize bytes to ServerEvent dict"""
@@ -694,11 +1144,11 @@ def deserialize_websocket_message(buffer: bytes) -> dict:
 # Server event convenience functions
 def create_server_started_message(port: int) -> bytes:
     """Create a server started WebSocket message"""
-    return create_server_event_message("started", port)
+    return _server_event_bytes("started", port)
 
 def create_server_stopped_message(port: int) -> bytes:
     """Create a server stopped WebSocket message"""
-    return create_server_event_message("stopped", port)
+    return _server_event_bytes("stopped", port)
 
 # Round-trip utilities
 def round_trip_flow_data(flow_data: PyFlowData) -> PyFlowData:
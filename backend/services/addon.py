@@ -1,10 +1,12 @@
 import logging
+import operator
+from collections import deque
 from pathlib import Path
 from mitmproxy import http
-from typing import Any
+from typing import Any, Union
 import re
-from backend.models.flat_utils import create_flow_data_message
 from backend.models.base_models import (
+    CompiledRule,
     FlowData,
     RuleAction,
     RuleModel
@@ -13,9 +15,60 @@ from backend.services.storage import CacheStore
 
 logger = logging.getLogger(__name__)
 
+# Fetch every flow field needed by get_flow_data in a single C-level call. Headers are
+# taken as their raw (name, value) byte fields and forwarded without building a dict.
+_REQ_FIELDS = operator.attrgetter(
+    'id', 'request.method', 'request.pretty_url', 'request.headers.fields',
+    'request.content', 'request.timestamp_start'
+)
+_RESP_FIELDS = operator.attrgetter('status_code', 'headers.fields', 'content', 'timestamp_end')
+
+# Non-text/* media types whose bodies are worth decoding for display; structured
+# syntax suffixes (application/ld+json, image/svg+xml, ...) are matched separately
+_TEXT_TYPES = frozenset({
+    'application/json', 'application/xml', 'application/javascript',
+    'application/x-www-form-urlencoded', 'application/graphql'
+})
+_TEXT_SUFFIXES = ('+json', '+xml')
+
+
+# Charsets whose bytes are already valid UTF-8 and can be forwarded without decoding
+_UTF8_CHARSETS = ('', 'utf-8', 'utf8', 'us-ascii', 'ascii')
+
+
+def _body_for_display(message, content: Union[bytes, None]) -> Union[bytes, str]:
+    """
+    Body to forward for display: empty for binary Content-Types, the raw bytes for
+    valid UTF-8 text (FlatBuffers takes them as-is, so there is no decode/encode round
+    trip), and decoded text only for other charsets, invalid UTF-8 or an unknown
+    Content-Type.
+    """
+    headers = message.headers
+    content_type = headers.get('content-type')
+    if not content_type:
+        return message.text or ""
+    content_type = content_type.lower()
+    media_type = content_type.split(';', 1)[0].strip()
+    if not (media_type.startswith('text/') or media_type in _TEXT_TYPES
+            or media_type.endswith(_TEXT_SUFFIXES)):
+        return b""
+    charset = content_type.partition('charset=')[2].split(';', 1)[0].strip().strip('"')
+    if charset not in _UTF8_CHARSETS:
+        return message.text or ""
+    if not content or content.isascii():
+        return content or b""
+    try:
+        content.decode('utf-8')
+    except UnicodeDecodeError:
+        # Mislabelled body: decode leniently so the FlatBuffers string stays valid UTF-8
+        return message.get_text(strict=False) or ""
+    return content
+
 class HTTPInterceptorAddon:
     def __init__(self, flow_queue: Any, stop_event: Any):
         self.flow_queue = flow_queue  # Send flow data to main process
+        # In-process deques are appended to directly, skipping queue put() overhead
+        self._enqueue = flow_queue.append if isinstance(flow_queue, deque) else flow_queue.put
         self.stop_event = stop_event
         self.dump_master = None  # Will be set by the process function
         
@@ -74,7 +127,21 @@ class HTTPInterceptorAddon:
         return False
 
 
-    def _apply_request_rule(self, mitm_flow: http.HTTPFlow, rule: RuleModel) -> bool:
+    def _entry_status(self, mitm_flow: http.HTTPFlow) -> int:
+        """
+        Shared entry check for the request and response hooks.
+        Returns 0 to continue, 1 for an excluded URL, 2 or 3 when stopping
+        (the dump master is shut down before returning).
+        """
+        status = (self.stop_event.is_set() << 1) | self.should_exclude_request(
+            mitm_flow.request.pretty_url, mitm_flow.request.headers
+        )
+        if status > 1 and self.dump_master:
+            # Check for stop signal - important for clean shutdown
+            self.dump_master.shutdown()
+        return status
+
+    def _apply_request_rule(self, mitm_flow: http.HTTPFlow, rule: Union[RuleModel, CompiledRule]) -> bool:
         """
         Apply a rule to the request phase
         Returns True if rule was applied successfully
@@ -147,7 +214,7 @@ class HTTPInterceptorAddon:
             logger.error(f"Failed to apply request rule {rule.rule_name}: {e}")
             return False
 
-    def _apply_response_rule(self, mitm_flow: http.HTTPFlow, rule: RuleModel) -> bool:
+    def _apply_response_rule(self, mitm_flow: http.HTTPFlow, rule: Union[RuleModel, CompiledRule]) -> bool:
         """
         Apply a rule to the response phase
         Returns True if rule was applied successfully
@@ -203,31 +270,18 @@ class HTTPInterceptorAddon:
             return False
 
     def _send_message(self, message: FlowData) -> None:
-        """Send structured message to queue"""
+        """Queue a flow for the forwarder, which encodes each drained batch as one message"""
         try:
-            # Create complete WebSocket message with FlowData
-            binary_message = create_flow_data_message(message)
-            self.flow_queue.put(binary_message)
+            self._enqueue(message)
         except Exception as e:
             logger.error(f"Error sending message: {e}")
 
     def request(self, mitm_flow: http.HTTPFlow) -> None:
         """Handle request phase with rule processing"""
-        # Check for stop signal - important for clean shutdown
-        if self.stop_event.is_set():
-            if self.dump_master:
-                self.dump_master.shutdown()
-            return
-        
-        if self.should_exclude_request(mitm_flow.request.pretty_url, dict(mitm_flow.request.headers)):
+        if self._entry_status(mitm_flow):
             return
         
-        def predicate(rule: RuleModel) -> bool:
-            if filter := self.cache_store.get_filter_by_id(rule.filter_id):
-                return filter.evaluate(mitm_flow)
-            return False
-        
-        matching_rule = next(filter(predicate, self.cache_store.get_active_rules()), None)
+        matching_rule = self.cache_store.match_rule(mitm_flow)
         if not matching_rule:
             # Mark flow as not intercepted in request phase
             mitm_flow.intercepted_in_request = False
@@ -243,25 +297,12 @@ class HTTPInterceptorAddon:
 
     def response(self, mitm_flow: http.HTTPFlow) -> None:
         """Handle response phase with rule processing"""
-        # Check for stop signal
-        if self.stop_event.is_set():
-            if self.dump_master:
-                self.dump_master.shutdown()
+        if self._entry_status(mitm_flow):
             return
         
-        print("response:", mitm_flow.request.pretty_url)
-        request_headers = dict(mitm_flow.request.headers) if mitm_flow.request else {}
-        if self.should_exclude_request(mitm_flow.request.pretty_url, request_headers):
-            return
-        
-        def predicate(rule: RuleModel) -> bool:
-            if filter := self.cache_store.get_filter_by_id(rule.filter_id):
-                return filter.evaluate(mitm_flow)
-            return False
-        
         # Check if rule was applied in response phase
         rule_applied_in_response = False
-        matching_rule = next(filter(predicate, self.cache_store.get_active_rules()), None)
+        matching_rule = self.cache_store.match_rule(mitm_flow)
         if matching_rule:
             rule_applied_in_response = self._apply_response_rule(mitm_flow, matching_rule)
         
@@ -274,18 +315,28 @@ class HTTPInterceptorAddon:
          
     def get_flow_data(self, mitm_flow: http.HTTPFlow, is_intercepted: bool = False) -> FlowData:
         """Convert mitmproxy flow to FlowData model"""
+        flow_id, method, url, req_headers, req_content, start_ts = _REQ_FIELDS(mitm_flow)
+        response = mitm_flow.response
+        if response is not None:
+            status, resp_headers, resp_content, end_ts = _RESP_FIELDS(response)
+            response_body = _body_for_display(response, resp_content)
+        else:
+            # No response yet (e.g. connection failure); use neutral defaults
+            status, resp_headers, resp_content, end_ts = 0, (), None, 0.0
+            response_body = b""
+
         return FlowData(
-            id=mitm_flow.id,
-            method=mitm_flow.request.method,
-            url=mitm_flow.request.pretty_url,
-            status=mitm_flow.response.status_code if mitm_flow.response else None,
-            start_timestamp=mitm_flow.request.timestamp_start,
-            end_timestamp=mitm_flow.response.timestamp_end if mitm_flow.response else None,
-            request_size=len(mitm_flow.request.content) if mitm_flow.request and mitm_flow.request.content else 0,
-            response_size=len(mitm_flow.response.content) if mitm_flow.response and mitm_flow.response.content else 0,
-            request_headers=dict(mitm_flow.request.headers) if mitm_flow.request else {},
-            response_headers=dict(mitm_flow.response.headers) if mitm_flow.response else {},
-            request_body=mitm_flow.request.text or "",
-            response_body=mitm_flow.response.text or "",
+            id=flow_id,
+            method=method,
+            url=url,
+            status=status,
+            start_timestamp=start_ts,
+            end_timestamp=end_ts,
+            request_size=len(req_content) if req_content else 0,
+            response_size=len(resp_content) if resp_content else 0,
+            request_headers=req_headers,
+            response_headers=resp_headers,
+            request_body=_body_for_display(mitm_flow.request, req_content),
+            response_body=response_body,
             is_intercepted=is_intercepted
         )
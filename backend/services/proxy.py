@@ -2,6 +2,7 @@ from typing import Optional, Any
 import asyncio
 import socket
 import queue
+from collections import deque
 from multiprocessing import Process, SimpleQueue, Event
 from mitmproxy import options
 from mitmproxy.tools.dump import DumpMaster
@@ -10,6 +11,7 @@ from backend.services.addon import HTTPInterceptorAddon
 from backend.services.ws import ConnectionManager
 from backend.services.storage import CacheStore 
 from backend.models.flat_utils import (
+    MessageFactory,
     serialize_sync_message,
     create_full_sync_message,
     deserialize_websocket_message
@@ -23,6 +25,7 @@ from backend.models.base_models import (
 
 logger = logging.getLogger(__name__)
 sentinel = object()  # Sentinel value for stopping message handler
+FLOW_FLUSH_INTERVAL = 0.05  # Seconds between flow batch hand-offs to the main process
 
 def run_mitmproxy_process(proxy_port: int, flow_queue: SimpleQueue, rule_queue: SimpleQueue, stop_event: Any):
     """Run mitmproxy in a separate process with two-queue system"""
@@ -50,18 +53,39 @@ def run_mitmproxy_process(proxy_port: int, flow_queue: SimpleQueue, rule_queue:
         
         logger.info("Rule update handler stopped")
 
+    async def _forward_flows(outbox: deque):
+        """Drain the addon's outbox and hand each batch to the main process as one FlowDataBatch message"""
+        while True:
+            stopping = stop_event.is_set()
+            if outbox:
+                # Addon hooks and this task share the event loop thread, so no lock is needed
+                batch = [outbox.popleft() for _ in range(len(outbox))]
+                try:
+                    flow_queue.put(MessageFactory.create_flow_data_batch_message(batch))
+                except Exception as e:
+                    logger.error(f"Error forwarding flow batch: {e}")
+            if stopping:
+                break
+            await asyncio.sleep(FLOW_FLUSH_INTERVAL)
+
+        logger.info("Flow forwarder stopped")
+
     async def _run_async():
         try:            
             # Start the rule update handler as a background task
             rule_handler_task = asyncio.create_task(
                 _handle_rule_updates()
             )
+
+            # Addon appends FlowData here; the forwarder encodes and ships them in batches
+            outbox = deque()
+            forwarder_task = asyncio.create_task(_forward_flows(outbox))
             
             # Create mitmproxy options
             opts = options.Options(listen_port=proxy_port)
             
             # Create dump master with addon
-            addon_instance = HTTPInterceptorAddon(flow_queue, stop_event)
+            addon_instance = HTTPInterceptorAddon(outbox, stop_event)
             dump_master = DumpMaster(opts, with_termlog=False, with_dumper=False)
             dump_master.addons.add(addon_instance)
             
@@ -79,6 +103,12 @@ def run_mitmproxy_process(proxy_port: int, flow_queue: SimpleQueue, rule_queue:
                     await rule_handler_task
                 except asyncio.CancelledError:
                     logger.info("Rule handler task cancelled")
+
+                # Let the forwarder flush whatever is still queued, then stop
+                try:
+                    await asyncio.wait_for(forwarder_task, timeout=1)
+                except asyncio.TimeoutError:
+                    logger.warning("Flow forwarder did not stop in time")
                 
                 # Ensure proper shutdown
                 if hasattr(dump_master, 'shutdown'):
@@ -151,6 +181,7 @@ class ProxyManager:
                     binary_message = self.flow_queue.get()
                     if binary_message == sentinel:  # Sentinel value to stop
                         return
+                    # Each message is a FlowDataBatch covering one forwarder flush
                     await self.connection_manager.broadcast(binary_message)
                 else:
                     # No messages available, yield control back to event loop
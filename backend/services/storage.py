@@ -1,14 +1,108 @@
 # Database manager
 import logging
+import queue
 import sqlite3
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Dict, NamedTuple, Optional, Set, Tuple
 import threading
 
-from backend.models.base_models import FilterModel, RuleModel, Operator, RuleAction, OperationType
+import ahocorasick
+from mitmproxy import http
+
+from backend.models.base_models import FilterModel, RuleModel, CompiledRule, Operator, RuleAction, OperationType
 from backend.models.flat_utils import deserialize_sync_message
 
 logger = logging.getLogger(__name__)
 
+# Every statement DatabaseManager runs, passed to execute() verbatim so each one is compiled
+# once per connection and then served from sqlite3's statement cache
+_STMTS = {
+    "get_filters": "SELECT * FROM filters ORDER BY created_at DESC",
+    "get_filter_by_id": "SELECT * FROM filters WHERE id = ?",
+    "create_filter": "INSERT INTO filters (filter_name, field, operator, value) VALUES (?, ?, ?, ?)",
+    "update_filter": "UPDATE filters SET filter_name=?, field=?, operator=?, value=? WHERE id=?",
+    "delete_filter": "DELETE FROM filters WHERE id=?",
+    "filter_name_exists": "SELECT 1 FROM filters WHERE filter_name = ?",
+    "filter_name_exists_excluding": "SELECT 1 FROM filters WHERE filter_name = ? AND id != ?",
+    "get_rules": "SELECT * FROM rules ORDER BY created_at DESC",
+    "get_rule_by_id": "SELECT * FROM rules WHERE id = ?",
+    "create_rule": (
+        "INSERT INTO rules (rule_name, filter_id, action, target_key, target_value, enabled) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    ),
+    "update_rule": (
+        "UPDATE rules SET rule_name=?, filter_id=?, action=?, target_key=?, target_value=?, enabled=? "
+        "WHERE id=?"
+    ),
+    "delete_rule": "DELETE FROM rules WHERE id=?",
+    "rule_name_exists": "SELECT 1 FROM rules WHERE rule_name = ?",
+    "rule_name_exists_excluding": "SELECT 1 FROM rules WHERE rule_name = ? AND id != ?",
+}
+STATEMENT_CACHE_SIZE = 128
+READ_POOL_SIZE = 4
+
+# Applied to every connection
+_CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+)
+# Applied to the writer only. WAL lets readers run alongside the writer, and with
+# synchronous=NORMAL a commit no longer waits on an fsync (the WAL is synced at checkpoints)
+_WRITER_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA wal_autocheckpoint = 1000",
+)
+
+
+def _filter_params(filter_data: FilterModel) -> tuple:
+    return (
+        filter_data.filter_name,
+        filter_data.field,
+        filter_data.operator.to_int(),  # Convert enum to integer
+        filter_data.value,
+    )
+
+
+def _rule_params(rule_data: RuleModel) -> tuple:
+    return (
+        rule_data.rule_name,
+        rule_data.filter_id,
+        rule_data.action.to_int(),  # Convert enum to integer
+        rule_data.target_key,
+        rule_data.target_value,
+        rule_data.enabled,
+    )
+
+
+# Rows were validated on the way in, so they are rebuilt with model_construct, which
+# skips Pydantic validation entirely
+def _row_to_filter(row: sqlite3.Row) -> FilterModel:
+    return FilterModel.model_construct(
+        id=row['id'],
+        filter_name=row['filter_name'],
+        field=row['field'],
+        operator=Operator(row['operator']),
+        value=row['value'],
+    )
+
+
+def _row_to_rule(row: sqlite3.Row) -> RuleModel:
+    return RuleModel.model_construct(
+        id=row['id'],
+        rule_name=row['rule_name'],
+        filter_id=row['filter_id'],
+        action=RuleAction(row['action']),
+        target_key=row['target_key'],
+        target_value=row['target_value'],
+        enabled=bool(row['enabled']),  # stored as 0/1
+    )
+
+
 class DatabaseManager:
     _instance = None
 
@@ -22,338 +116,320 @@ class DatabaseManager:
         if self._initialized:
             return
         self.db_path = db_path
+        # Long-lived connections keep their compiled statements between calls: one writer,
+        # serialized by a lock, and a pool of read-only connections that WAL lets run
+        # alongside it
+        self._write_lock = threading.Lock()
+        self._write_conn = self._connect()
         self.init_database()
+        # Every reader is also kept here so close() reaches the ones checked out of the pool
+        self._readers = [self._connect(read_only=True) for _ in range(READ_POOL_SIZE)]
+        self._read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for conn in self._readers:
+            self._read_pool.put(conn)
         self._initialized = True
 
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a tuned connection that returns rows as sqlite3.Row"""
+        if read_only:
+            # as_uri() percent-encodes the path, so '?', '#' and '%' in it stay literal
+            conn = sqlite3.connect(
+                Path(self.db_path).resolve().as_uri() + "?mode=ro", uri=True,
+                check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+            )
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+            for pragma in _WRITER_PRAGMAS:
+                conn.execute(pragma)
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _with_read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection from the pool"""
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
+    @contextmanager
+    def _with_write(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer for one transaction, rolled back if the block raises"""
+        with self._write_lock, self._write_conn as conn:
+            yield conn
+
+    def close(self) -> None:
+        """Close all database connections"""
+        with self._write_lock:
+            self._write_conn.close()
+        for conn in self._readers:
+            conn.close()
+
     def init_database(self):
         """Initialize SQLite database with tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Enable foreign key constraints
-        cursor.execute("PRAGMA foreign_keys = ON")
-
-        # Filters table
-        cursor.execute(
+        with self._with_write() as conn:
+            # Filters table
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS filters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    filter_name TEXT NOT NULL UNIQUE,
+                    field TEXT NOT NULL,
+                    operator INTEGER NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
             """
-            CREATE TABLE IF NOT EXISTS filters (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filter_name TEXT NOT NULL UNIQUE,
-                field TEXT NOT NULL,
-                operator INTEGER NOT NULL,
-                value TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """
-        )
 
-        # Rules table
-        cursor.execute(
+            # Rules table
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rules (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    rule_name TEXT NOT NULL UNIQUE,
+                    filter_id INTEGER NOT NULL,
+                    action INTEGER NOT NULL,
+                    target_key TEXT NOT NULL,
+                    target_value TEXT NOT NULL,
+                    enabled BOOLEAN DEFAULT TRUE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (filter_id) REFERENCES filters (id) ON DELETE CASCADE
+                )
             """
-            CREATE TABLE IF NOT EXISTS rules (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                rule_name TEXT NOT NULL UNIQUE,
-                filter_id INTEGER NOT NULL,
-                action INTEGER NOT NULL,
-                target_key TEXT NOT NULL,
-                target_value TEXT NOT NULL,
-                enabled BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (filter_id) REFERENCES filters (id) ON DELETE CASCADE
             )
-        """
-        )
 
-        conn.commit()
-        conn.close()
+    def _fetchall(self, stmt: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._with_read() as conn:
+            return conn.execute(_STMTS[stmt], params).fetchall()
 
-    def get_filters(self) -> List[FilterModel]:
-        """Get all filters from database"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def _fetchone(self, stmt: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        with self._with_read() as conn:
+            return conn.execute(_STMTS[stmt], params).fetchone()
 
-        cursor.execute("SELECT * FROM filters ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        conn.close()
+    def _write(self, stmt: str, params: tuple) -> sqlite3.Cursor:
+        """Run one statement in its own transaction"""
+        with self._with_write() as conn:
+            return conn.execute(_STMTS[stmt], params)
 
-        filters = []
-        for row in rows:
-            row_dict = dict(row)
-            # Convert operator integer back to enum
-            row_dict['operator'] = Operator.from_int(row_dict['operator'])
-            filters.append(FilterModel(**row_dict))
-        
-        return filters
+    def get_filters(self) -> List[FilterModel]:
+        """Get all filters from database"""
+        return [_row_to_filter(row) for row in self._fetchall("get_filters")]
 
     def create_filter(self, filter_data: FilterModel) -> FilterModel:
         """Create a new filter"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """
-                INSERT INTO filters (filter_name, field, operator, value)
-                VALUES (?, ?, ?, ?)
-            """,
-                (
-                    filter_data.filter_name,
-                    filter_data.field,
-                    filter_data.operator.to_int(),  # Convert enum to integer
-                    filter_data.value,
-                ),
-            )
-
-            filter_id = cursor.lastrowid
-            conn.commit()
-            filter_data.id = filter_id
-            return filter_data
+            cursor = self._write("create_filter", _filter_params(filter_data))
         except sqlite3.IntegrityError as e:
-            conn.rollback()
             if "UNIQUE constraint failed: filters.filter_name" in str(e):
                 raise ValueError(f"Filter with name '{filter_data.filter_name}' already exists")
             raise e
-        finally:
-            conn.close()
+
+        filter_data.id = cursor.lastrowid
+        return filter_data
 
     def update_filter(self, filter_id: int, filter_data: FilterModel) -> FilterModel:
         """Update an existing filter"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """
-                UPDATE filters 
-                SET filter_name=?, field=?, operator=?, value=?
-                WHERE id=?
-            """,
-                (
-                    filter_data.filter_name,
-                    filter_data.field,
-                    filter_data.operator.to_int(),  # Convert enum to integer
-                    filter_data.value,
-                    filter_id,
-                ),
-            )
-
-            # Check if any row was actually updated
-            if cursor.rowcount == 0:
-                raise ValueError(f"Filter with ID {filter_id} not found")
-
-            conn.commit()
-            filter_data.id = filter_id
-            return filter_data
+            cursor = self._write("update_filter", _filter_params(filter_data) + (filter_id,))
         except sqlite3.IntegrityError as e:
-            conn.rollback()
             if "UNIQUE constraint failed: filters.filter_name" in str(e):
                 raise ValueError(f"Filter with name '{filter_data.filter_name}' already exists")
             raise e
-        finally:
-            conn.close()
+
+        # Check if any row was actually updated
+        if cursor.rowcount == 0:
+            raise ValueError(f"Filter with ID {filter_id} not found")
+
+        filter_data.id = filter_id
+        return filter_data
 
     def delete_filter(self, filter_id: int) -> bool:
         """Delete a filter and its associated rules"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-
         # Delete the filter (CASCADE will handle associated rules)
-        cursor.execute("DELETE FROM filters WHERE id=?", (filter_id,))
-
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
-
-        return deleted
+        return self._write("delete_filter", (filter_id,)).rowcount > 0
 
     def filter_name_exists(self, filter_name: str, exclude_id: Optional[int] = None) -> bool:
         """Check if a filter name already exists (optionally excluding a specific ID)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-
         if exclude_id:
-            cursor.execute("SELECT 1 FROM filters WHERE filter_name = ? AND id != ?", (filter_name, exclude_id))
+            row = self._fetchone("filter_name_exists_excluding", (filter_name, exclude_id))
         else:
-            cursor.execute("SELECT 1 FROM filters WHERE filter_name = ?", (filter_name,))
-        
-        exists = cursor.fetchone() is not None
-        conn.close()
-        return exists
+            row = self._fetchone("filter_name_exists", (filter_name,))
+        return row is not None
 
     def get_rules(self) -> List[RuleModel]:
         """Get all rules from database"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM rules ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        conn.close()
-
-        rules = []
-        for row in rows:
-            row_dict = dict(row)
-            # Convert action integer back to enum
-            row_dict['action'] = RuleAction.from_int(row_dict['action'])
-            rules.append(RuleModel(**row_dict))
-        
-        return rules
+        return [_row_to_rule(row) for row in self._fetchall("get_rules")]
 
     def create_rule(self, rule_data: RuleModel) -> RuleModel:
         """Create a new rule"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """
-                INSERT INTO rules (rule_name, filter_id, action, target_key, target_value, enabled)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    rule_data.rule_name,
-                    rule_data.filter_id,
-                    rule_data.action.to_int(),  # Convert enum to integer
-                    rule_data.target_key,
-                    rule_data.target_value,
-                    rule_data.enabled,
-                ),
-            )
-
-            rule_id = cursor.lastrowid
-            conn.commit()
-            rule_data.id = rule_id
-            return rule_data
+            cursor = self._write("create_rule", _rule_params(rule_data))
         except sqlite3.IntegrityError as e:
-            conn.rollback()
             if "UNIQUE constraint failed: rules.rule_name" in str(e):
                 raise ValueError(f"Rule with name '{rule_data.rule_name}' already exists")
             elif "FOREIGN KEY constraint failed" in str(e):
                 raise ValueError(f"Filter with ID {rule_data.filter_id} does not exist")
             raise e
-        finally:
-            conn.close()
+
+        rule_data.id = cursor.lastrowid
+        return rule_data
 
     def update_rule(self, rule_id: int, rule_data: RuleModel) -> RuleModel:
         """Update an existing rule"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """
-                UPDATE rules 
-                SET rule_name=?, filter_id=?, action=?, target_key=?, target_value=?, enabled=?
-                WHERE id=?
-            """,
-                (
-                    rule_data.rule_name,
-                    rule_data.filter_id,
-                    rule_data.action.to_int(),  # Convert enum to integer
-                    rule_data.target_key,
-                    rule_data.target_value,
-                    rule_data.enabled,
-                    rule_id,
-                ),
-            )
-
-            # Check if any row was actually updated
-            if cursor.rowcount == 0:
-                raise ValueError(f"Rule with ID {rule_id} not found")
-
-            conn.commit()
-            rule_data.id = rule_id
-            return rule_data
+            cursor = self._write("update_rule", _rule_params(rule_data) + (rule_id,))
         except sqlite3.IntegrityError as e:
-            conn.rollback()
             if "UNIQUE constraint failed: rules.rule_name" in str(e):
                 raise ValueError(f"Rule with name '{rule_data.rule_name}' already exists")
             elif "FOREIGN KEY constraint failed" in str(e):
                 raise ValueError(f"Filter with ID {rule_data.filter_id} does not exist")
             raise e
-        finally:
-            conn.close()
 
-    def delete_rule(self, rule_id: int) -> bool:
-        """Delete a rule"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
+        # Check if any row was actually updated
+        if cursor.rowcount == 0:
+            raise ValueError(f"Rule with ID {rule_id} not found")
 
-        cursor.execute("DELETE FROM rules WHERE id=?", (rule_id,))
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        rule_data.id = rule_id
+        return rule_data
 
-        return deleted
+    def delete_rule(self, rule_id: int) -> bool:
+        """Delete a rule"""
+        return self._write("delete_rule", (rule_id,)).rowcount > 0
 
     def rule_name_exists(self, rule_name: str, exclude_id: Optional[int] = None) -> bool:
         """Check if a rule name already exists (optionally excluding a specific ID)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-
         if exclude_id:
-            cursor.execute("SELECT 1 FROM rules WHERE rule_name = ? AND id != ?", (rule_name, exclude_id))
+            row = self._fetchone("rule_name_exists_excluding", (rule_name, exclude_id))
         else:
-            cursor.execute("SELECT 1 FROM rules WHERE rule_name = ?", (rule_name,))
-        
-        exists = cursor.fetchone() is not None
-        conn.close()
-        return exists
+            row = self._fetchone("rule_name_exists", (rule_name,))
+        return row is not None
 
     def get_rule_by_id(self, rule_id: int) -> Optional[RuleModel]:
         """Get a rule by its ID"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM rules WHERE id = ?", (rule_id,))
-        row = cursor.fetchone()
-        conn.close()
-
-        if row:
-            row_dict = dict(row)
-            # Convert action integer back to enum
-            row_dict['action'] = RuleAction.from_int(row_dict['action'])
-            return RuleModel(**row_dict)
-        
-        return None
+        row = self._fetchone("get_rule_by_id", (rule_id,))
+        return _row_to_rule(row) if row else None
 
     def get_filter_by_id(self, filter_id: int) -> Optional[FilterModel]:
         """Get a filter by its ID"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM filters WHERE id = ?", (filter_id,))
-        row = cursor.fetchone()
-        conn.close()
-
-        if row:
-            row_dict = dict(row)
-            # Convert operator integer back to enum
-            row_dict['operator'] = Operator.from_int(row_dict['operator'])
-            return FilterModel(**row_dict)
-        
+        row = self._fetchone("get_filter_by_id", (filter_id,))
+        return _row_to_filter(row) if row else None
+
+
+def _field_bucket(field: str) -> str:
+    """Index key for a filter field; header names are case-insensitive, like mitmproxy's lookup"""
+    if field.startswith("header:"):
+        return "header:" + field[7:].lower()
+    return field
+
+
+def _in_url_automaton(filter_obj: FilterModel) -> bool:
+    """Whether the filter is matched by the url automaton rather than its own matcher"""
+    return filter_obj.field == "url" and filter_obj.operator in (Operator.CONTAINS, Operator.STARTS_WITH)
+
+
+def _request_candidates(by_field: Dict[str, Tuple[FilterModel, ...]], mitm_flow: http.HTTPFlow) -> List[FilterModel]:
+    """The url, method and body buckets plus one bucket per header the request carries"""
+    candidates = [*by_field.get("url", ()), *by_field.get("method", ()), *by_field.get("body", ())]
+    for header_name in mitm_flow.request.headers.keys():
+        candidates.extend(by_field.get("header:" + header_name.lower(), ()))
+    return candidates
+
+
+def _url_entries(filters: Dict[int, FilterModel]) -> Dict[str, Tuple[Tuple[int, bool], ...]]:
+    """
+    Automaton keys for every CONTAINS / STARTS_WITH url filter: each value maps to
+    ((filter_id, prefix_only), ...) so filters sharing a value share a key.
+    """
+    entries: Dict[str, List[Tuple[int, bool]]] = {}
+    for filter_obj in filters.values():
+        if _in_url_automaton(filter_obj):
+            entries.setdefault(filter_obj.value, []).append(
+                (filter_obj.id, filter_obj.operator is Operator.STARTS_WITH)
+            )
+    return {value: tuple(matches) for value, matches in entries.items()}
+
+
+def _build_url_automaton(entries: Dict[str, Tuple[Tuple[int, bool], ...]]) -> Optional[ahocorasick.Automaton]:
+    """
+    Build one Aho-Corasick automaton over the url filter entries. Each key maps to
+    (value length, matches). Returns None when there are no entries.
+    """
+    if not entries:
         return None
+    automaton = ahocorasick.Automaton()
+    for value, matches in entries.items():
+        automaton.add_word(value, (len(value), matches))
+    automaton.make_automaton()
+    return automaton
+
+
+class _FilterIndex(NamedTuple):
+    """
+    One immutable generation of the filter cache and every index derived from it.
+    Swapped in with a single attribute store, so a reader that loads it once sees
+    the filters and their indexes from the same update.
+    """
+    filters: Dict[int, FilterModel]
+    # The CONTAINS / STARTS_WITH url filters the automaton was built from
+    url_entries: Dict[str, Tuple[Tuple[int, bool], ...]]
+    # All CONTAINS / STARTS_WITH url filters matched in a single pass over the URL
+    url_automaton: Optional[ahocorasick.Automaton]
+    # Every other filter, bucketed by the request field it reads
+    residual_by_field: Dict[str, Tuple[FilterModel, ...]]
+
+
+def _build_filter_index(filters: Dict[int, FilterModel], previous: Optional[_FilterIndex] = None) -> _FilterIndex:
+    """
+    Bucket the filters by field and build the url automaton over them. The automaton of
+    previous is reused when the update left the url filters it covers unchanged, so
+    writes to method, header or body filters do not rebuild it.
+    """
+    residual: Dict[str, List[FilterModel]] = {}
+    for filter_obj in filters.values():
+        if not _in_url_automaton(filter_obj):
+            residual.setdefault(_field_bucket(filter_obj.field), []).append(filter_obj)
+    url_entries = _url_entries(filters)
+    if previous is not None and previous.url_entries == url_entries:
+        url_automaton = previous.url_automaton
+    else:
+        url_automaton = _build_url_automaton(url_entries)
+    return _FilterIndex(
+        filters=filters,
+        url_entries=url_entries,
+        url_automaton=url_automaton,
+        residual_by_field={key: tuple(bucket) for key, bucket in residual.items()},
+    )
+
+
+def _match_url(index: _FilterIndex, url: str) -> Set[int]:
+    """
+    IDs of the CONTAINS / STARTS_WITH url filters in index matching url, found in one
+    O(len(url)) scan. EQUALS and REGEX url filters are left to their matchers.
+    """
+    automaton = index.url_automaton
+    if automaton is None:
+        return set()
+    matched = set()
+    for end, (length, matches) in automaton.iter(url):
+        at_start = end + 1 == length
+        for filter_id, prefix_only in matches:
+            if at_start or not prefix_only:
+                matched.add(filter_id)
+    return matched
 
 
 class CacheStore:
     """
     Ultra-fast singleton cache store for rules and filters
     Thread-safe, optimized for high-frequency access
+
+    The rules dict and the filter index are copy-on-write: writers build a new one
+    under a lock and swap it in with one attribute store, so readers never lock and
+    always see a complete old or new generation. Never mutate them in place.
     """
 
     _instance = None
@@ -371,107 +447,144 @@ class CacheStore:
         if hasattr(self, '_initialized') and self._initialized:
             return
 
-        self._rules_lock = threading.RLock()
-        self._filters_lock = threading.RLock()
+        # Serialize writers only; readers load the current dict without locking
+        self._rules_lock = threading.Lock()
+        self._filters_lock = threading.Lock()
 
         # High-performance in-memory storage
         self._rules: Dict[int, RuleModel] = {}
-        self._filters: Dict[int, FilterModel] = {}
+        # Filters plus their field buckets and url automaton, replaced as a whole
+        self._filter_index: _FilterIndex = _build_filter_index({})
+
+        # Enabled rules compiled at publish time, handed out as-is to the hot path
+        self._compiled_rules: Tuple[CompiledRule, ...] = ()
 
         self._initialized = True
         logger.info("CacheStore initialized - waiting for sync messages from queue")
 
+    def _set_rules(self, rules: Dict[int, RuleModel]) -> None:
+        """Swap in a new rules dict and recompile - must be called with _rules_lock held"""
+        self._rules = rules
+        self._publish_rules()
+
+    @property
+    def _filters(self) -> Dict[int, FilterModel]:
+        """The current filters dict; read-only, replace it through _set_filters"""
+        return self._filter_index.filters
+
+    def _set_filters(self, filters: Dict[int, FilterModel]) -> None:
+        """Swap in a new filters dict with its indexes - must be called with _filters_lock held"""
+        self._filter_index = _build_filter_index(filters, self._filter_index)
+
     def update_rules(self, rules: List[RuleModel], clear_all: bool = False) -> None:
         """Update rules cache - optimized O(n) operation"""
         with self._rules_lock:
-            if clear_all:
-                self._rules.clear()
-
+            new_rules = {} if clear_all else dict(self._rules)
             for rule in rules:
                 if rule.id is not None:
-                    self._rules[rule.id] = rule
+                    new_rules[rule.id] = rule
+            self._set_rules(new_rules)
 
     def update_filters(self, filters: List[FilterModel], clear_all: bool = False) -> None:
         """Update filters cache - optimized O(n) operation"""
         with self._filters_lock:
-            if clear_all:
-                self._filters.clear()
-
+            new_filters = {} if clear_all else dict(self._filters)
             for filter_obj in filters:
                 if filter_obj.id is not None:
-                    self._filters[filter_obj.id] = filter_obj
+                    new_filters[filter_obj.id] = filter_obj
+            self._set_filters(new_filters)
 
-    def get_active_rules(self) -> List[RuleModel]:
-        """Get all enabled rules - returns proper List[RuleModel]"""
-        with self._rules_lock:
-            return [rule for rule in self._rules.values() if rule.enabled]
+    def _publish_rules(self) -> None:
+        """Recompile enabled rules - must be called with _rules_lock held"""
+        self._compiled_rules = tuple(
+            CompiledRule.from_rule(rule) for rule in self._rules.values() if rule.enabled
+        )
+
+    def get_active_rules(self) -> Tuple[CompiledRule, ...]:
+        """Get all enabled rules - returns the pre-compiled tuple, no per-call filtering"""
+        return self._compiled_rules
 
     def get_active_filters(self) -> List[FilterModel]:
         """Get all filters - returns proper List[FilterModel]"""
-        with self._filters_lock:
-            return list(self._filters.values())
+        return list(self._filters.values())
+
+    def match_all(self, mitm_flow: http.HTTPFlow) -> Set[int]:
+        """
+        IDs of every cached filter matching this flow. CONTAINS / STARTS_WITH url filters
+        come from one automaton scan; the rest are limited to the url, method and body
+        buckets plus one bucket per header the request carries, and run their pre-built
+        matchers. Filters on headers the request lacks are never evaluated. The index is loaded once, so the result
+        never mixes two filter generations.
+        """
+        index = self._filter_index
+        matched = _match_url(index, mitm_flow.request.pretty_url)
+        for filter_obj in _request_candidates(index.residual_by_field, mitm_flow):
+            if filter_obj.matcher(mitm_flow):
+                matched.add(filter_obj.id)
+        return matched
+
+    def match_rule(self, mitm_flow: http.HTTPFlow) -> Optional[CompiledRule]:
+        """First enabled rule whose filter matches this flow, or None"""
+        rules = self._compiled_rules
+        if not rules:
+            return None
+        matched = self.match_all(mitm_flow)
+        return next((rule for rule in rules if rule.filter_id in matched), None)
 
     def get_filter_by_id(self, filter_id: int) -> Optional[FilterModel]:
         """Get filter by ID - O(1) hash lookup"""
-        with self._filters_lock:
-            return self._filters.get(filter_id)
+        return self._filters.get(filter_id)
 
     def get_rule_by_id(self, rule_id: int) -> Optional[RuleModel]:
         """Get rule by ID - O(1) hash lookup"""
-        with self._rules_lock:
-            return self._rules.get(rule_id)
+        return self._rules.get(rule_id)
 
     def delete_rules(self, rule_ids: List[int]) -> None:
         """Delete rules by ID list - O(n) operation"""
         with self._rules_lock:
+            new_rules = dict(self._rules)
             for rule_id in rule_ids:
-                if rule_id in self._rules:
-                    del self._rules[rule_id]
+                if new_rules.pop(rule_id, None) is not None:
                     logger.info(f"Deleted rule {rule_id} from cache")
+            self._set_rules(new_rules)
 
     def delete_filters(self, filter_ids: List[int]) -> None:
         """Delete filters by ID list - O(n) operation"""
         with self._filters_lock:
+            new_filters = dict(self._filters)
             for filter_id in filter_ids:
-                if filter_id in self._filters:
-                    del self._filters[filter_id]
+                if new_filters.pop(filter_id, None) is not None:
                     logger.info(f"Deleted filter {filter_id} from cache")
+            self._set_filters(new_filters)
 
     def add_single_rule(self, rule: RuleModel) -> None:
         """Add a single rule to cache"""
         if rule.id is not None:
             with self._rules_lock:
-                self._rules[rule.id] = rule
+                self._set_rules({**self._rules, rule.id: rule})
                 logger.info(f"Added rule {rule.id} to cache")
 
     def add_single_filter(self, filter_obj: FilterModel) -> None:
         """Add a single filter to cache"""
         if filter_obj.id is not None:
             with self._filters_lock:
-                self._filters[filter_obj.id] = filter_obj
+                self._set_filters({**self._filters, filter_obj.id: filter_obj})
                 logger.info(f"Added filter {filter_obj.id} to cache")
 
     def get_cache_stats(self) -> Dict[str, int]:
         """Get cache statistics"""
-        with self._rules_lock:
-            active_rules = len([r for r in self._rules.values() if r.enabled])
-            total_rules = len(self._rules)
-        
-        with self._filters_lock:
-            total_filters = len(self._filters)
-        
         return {
-            "total_rules": total_rules,
-            "active_rules": active_rules,
-            "total_filters": total_filters
+            "total_rules": len(self._rules),
+            "active_rules": len(self._compiled_rules),
+            "total_filters": len(self._filters)
         }
 
     def clear_cache(self) -> None:
         """Clear all cached data"""
         with self._rules_lock:
-            self._rules.clear()
+            self._set_rules({})
         with self._filters_lock:
-            self._filters.clear()
+            self._set_filters({})
         logger.info("Cache cleared")
 
     def handle_sync_msg(self, raw_msg: bytes) -> None:
@@ -484,7 +597,7 @@ class CacheStore:
             rules_list = sync_message.rules_list
             filters_list = sync_message.filters_data
 
-            logger.info(f"Processing sync message: operation={operation}, rules={len(rules_list)}, filters={len(filters_list)}")
+            logger.info(f"Processing sync message: operation={operation.name}, rules={len(rules_list)}, filters={len(filters_list)}")
 
             # Handle different operations
             if operation == OperationType.FULL_SYNC:
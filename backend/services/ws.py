@@ -1,7 +1,11 @@
-import json
-from typing import List
+import asyncio
+import orjson
+from typing import Set
 from fastapi import WebSocket
 
+# Constant reply to client pings, serialized once; sent as text since binary frames carry FlatBuffers
+_PONG_FRAME = orjson.dumps({'type': 'pong'}).decode()
+
 class ConnectionManager:
     _instance = None
 
@@ -14,28 +18,39 @@ class ConnectionManager:
     def __init__(self, logger):
         if self._initialized:
             return
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
         self.logger = logger
-        self.logger.info("WebSocket Connection Manager initialized.")
+        # Bound once; connect/disconnect/broadcast log on every call
+        self._log_info = logger.info
+        self._log_error = logger.error
+        self._log_info("WebSocket Connection Manager initialized.")
         self._initialized = True
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        self.logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        self.active_connections.add(websocket)
+        self._log_info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-            self.logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
+            self.active_connections.discard(websocket)
+            self._log_info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
     async def pong(self, websocket: WebSocket):
-        await websocket.send_json(json.dumps({'type': 'pong'}))
+        await websocket.send_text(_PONG_FRAME)
 
     async def broadcast(self, message: bytes):
-        for connection in self.active_connections[:]:  # Copy list to avoid modification during iteration
-            try:
-                await connection.send_bytes(message)
-            except Exception as e:
-                self.logger.error(f"Error sending message to WebSocket: {e}")
-                self.active_connections.remove(connection)
+        # Send to every client concurrently so one slow peer does not delay the rest;
+        # iterate a snapshot since connect/disconnect may run while the sends are awaited
+        connections = tuple(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_bytes(message) for connection in connections),
+            return_exceptions=True
+        )
+        failed = []
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self._log_error(f"Error sending message to WebSocket: {result}")
+                failed.append(connection)
+        if failed:
+            self.active_connections.difference_update(failed)
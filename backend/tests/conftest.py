@@ -1,8 +1,8 @@
 import pytest
-import asyncio
 import tempfile
 import os
 from unittest.mock import AsyncMock, Mock
+from mitmproxy import http
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
@@ -55,19 +55,12 @@ def mock_flow():
     mock_flow.id = "test-flow-123"
     mock_flow.request.method = "GET"
     mock_flow.request.pretty_url = "https://example.com/api/test"
-    mock_flow.request.headers = {"User-Agent": "test-agent"}
+    mock_flow.request.headers = http.Headers([(b"User-Agent", b"test-agent")])
     mock_flow.request.content = b""
     mock_flow.response = Mock()
     mock_flow.response.status_code = 200
-    mock_flow.response.headers = {"Content-Type": "application/json"}
+    mock_flow.response.headers = http.Headers([(b"Content-Type", b"application/json")])
     mock_flow.response.content = b'{"test": "data"}'
     
     return mock_flow
 
-
-@pytest.fixture
-def event_loop():
-    """Create an event loop for async tests"""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
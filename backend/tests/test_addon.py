@@ -1,23 +1,43 @@
 import pytest
-import json
-import asyncio
 import queue
 import threading
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
+from collections import deque
+from unittest.mock import Mock, PropertyMock, patch
 from mitmproxy import http
 from backend.services.addon import HTTPInterceptorAddon
-from backend.models.base_models import FlowData, FilterModel, RuleModel, Operator, RuleAction
+from backend.models.base_models import FlowData, FilterModel, RuleModel, CompiledRule, Operator, RuleAction
 
 
 @pytest.fixture
 def addon():
-    """Create HTTPInterceptorAddon instance for testing"""
+    """Create HTTPInterceptorAddon instance backed by a plain deque"""
+    mock_stop_event = Mock(spec=threading.Event)
+    mock_stop_event.is_set.return_value = False
+    return HTTPInterceptorAddon(deque(), mock_stop_event)
+
+
+@pytest.fixture
+def queue_addon():
+    """Create HTTPInterceptorAddon instance backed by a mocked queue"""
     mock_queue = Mock(spec=queue.Queue)
     mock_stop_event = Mock(spec=threading.Event)
     mock_stop_event.is_set.return_value = False
     return HTTPInterceptorAddon(mock_queue, mock_stop_event)
 
 
+@pytest.fixture(scope="module")
+def _dump_master():
+    """Single mock dump master shared by the tests in this module"""
+    return Mock()
+
+
+@pytest.fixture
+def dump_master(_dump_master):
+    """Shared mock dump master with its call history cleared"""
+    _dump_master.reset_mock()
+    return _dump_master
+
+
 @pytest.fixture
 def mock_flow():
     """Create mock HTTP flow for testing"""
@@ -26,14 +46,14 @@ def mock_flow():
     flow.request = Mock()
     flow.request.method = "GET"
     flow.request.pretty_url = "https://example.com/api/users"
-    flow.request.headers = {"User-Agent": "test-agent"}
+    flow.request.headers = http.Headers([(b"User-Agent", b"test-agent")])
     flow.request.content = b'{"request": "data"}'
     flow.request.text = '{"request": "data"}'
     flow.request.timestamp_start = 1234567890.123
     
     flow.response = Mock()
     flow.response.status_code = 200
-    flow.response.headers = {"Content-Type": "application/json"}
+    flow.response.headers = http.Headers([(b"Content-Type", b"application/json")])
     flow.response.content = b'{"response": "data"}'
     flow.response.text = '{"response": "data"}'
     flow.response.timestamp_end = 1234567891.456
@@ -80,10 +100,10 @@ class TestHTTPInterceptorAddon:
         assert flow_data.status == 200
         assert flow_data.start_timestamp == 1234567890.123
         assert flow_data.end_timestamp == 1234567891.456
-        assert flow_data.request_headers == {"User-Agent": "test-agent"}
-        assert flow_data.response_headers == {"Content-Type": "application/json"}
+        assert flow_data.request_headers == ((b"User-Agent", b"test-agent"),)
+        assert flow_data.response_headers == ((b"Content-Type", b"application/json"),)
         assert flow_data.request_body == '{"request": "data"}'
-        assert flow_data.response_body == '{"response": "data"}'
+        assert flow_data.response_body == b'{"response": "data"}'
         assert flow_data.is_intercepted is True
 
     def test_get_flow_data_no_response(self, addon):
@@ -93,88 +113,123 @@ class TestHTTPInterceptorAddon:
         flow.request = Mock()
         flow.request.method = "POST"
         flow.request.pretty_url = "https://example.com/api/post"
-        flow.request.headers = {}
+        flow.request.headers = http.Headers()
         flow.request.content = b'{"test": "data"}'
         flow.request.text = '{"test": "data"}'
         flow.request.timestamp_start = 1234567890.0
         flow.response = None
         
-        # Mock the get_flow_data method to handle None response properly
-        with patch.object(addon, 'get_flow_data') as mock_get_flow_data:
-            mock_flow_data = FlowData(
-                id="no-response-flow",
-                method="POST",
-                url="https://example.com/api/post",
-                status=0,  # Use 0 as default when no response
-                start_timestamp=1234567890.0,
-                end_timestamp=0.0,  # Use 0.0 as default when no response
-                request_size=len(b'{"test": "data"}'),
-                response_size=0,
-                request_headers={},
-                response_headers={},
-                request_body='{"test": "data"}',
-                response_body="",
-                is_intercepted=False
-            )
-            mock_get_flow_data.return_value = mock_flow_data
-            
-            flow_data = addon.get_flow_data(flow, is_intercepted=False)
-            
-            assert flow_data.id == "no-response-flow"
-            assert flow_data.method == "POST"
-            assert flow_data.status == 0
-            assert flow_data.end_timestamp == 0.0
-            assert flow_data.response_headers == {}
-            assert flow_data.response_body == ""
-            assert flow_data.is_intercepted is False
+        flow_data = addon.get_flow_data(flow, is_intercepted=False)
+
+        assert flow_data.id == "no-response-flow"
+        assert flow_data.method == "POST"
+        assert flow_data.status == 0
+        assert flow_data.end_timestamp == 0.0
+        assert flow_data.request_size == len(b'{"test": "data"}')
+        assert flow_data.response_size == 0
+        assert flow_data.response_headers == ()
+        assert flow_data.response_body == b""
+        assert flow_data.is_intercepted is False
 
     def test_get_flow_data_binary_content(self, addon):
-        """Test converting flow with binary content"""
+        """Test binary bodies are not decoded"""
         flow = Mock(spec=http.HTTPFlow)
         flow.id = "binary-flow"
         flow.request = Mock()
         flow.request.method = "POST"
         flow.request.pretty_url = "https://example.com/upload"
-        flow.request.headers = {}
+        flow.request.headers = http.Headers([(b"Content-Type", b"image/png")])
         flow.request.content = b'\x89PNG\r\n\x1a\n'  # Binary PNG header
-        flow.request.text = None  # Binary content has no text representation
+        request_text = PropertyMock(return_value=None)
+        type(flow.request).text = request_text
         flow.request.timestamp_start = 1234567890.0
         
         flow.response = Mock()
         flow.response.status_code = 200
-        flow.response.headers = {}
+        flow.response.headers = http.Headers([(b"content-type", b"image/png")])
         flow.response.content = b'\x89PNG\r\n\x1a\n'
-        flow.response.text = None
+        response_text = PropertyMock(return_value=None)
+        type(flow.response).text = response_text
         flow.response.timestamp_end = 1234567891.0
         
         flow_data = addon.get_flow_data(flow)
         
-        assert flow_data.request_body == ""
-        assert flow_data.response_body == ""
+        assert flow_data.request_body == b""
+        assert flow_data.response_body == b""
+        assert flow_data.request_size == 8
+        request_text.assert_not_called()
+        response_text.assert_not_called()
+
+    def test_get_flow_data_utf8_text_forwards_bytes(self, addon, mock_flow):
+        """Test UTF-8 textual bodies are forwarded as raw bytes without decoding"""
+        mock_flow.request.headers = http.Headers([(b"Content-Type", b"application/json; charset=utf-8")])
+        request_text = PropertyMock()
+        type(mock_flow.request).text = request_text
+
+        flow_data = addon.get_flow_data(mock_flow)
+
+        assert flow_data.request_body == b'{"request": "data"}'
+        assert flow_data.response_body == b'{"response": "data"}'
+        request_text.assert_not_called()
+
+    @pytest.mark.parametrize("content_type", [
+        "application/ld+json", "application/atom+xml", "image/svg+xml",
+        "application/graphql", "text/csv; charset=utf-8"
+    ])
+    def test_get_flow_data_structured_text_types(self, addon, mock_flow, content_type):
+        """Test text/*, +json/+xml suffixes and GraphQL bodies are kept"""
+        mock_flow.request.headers = http.Headers([(b"Content-Type", content_type.encode())])
+
+        flow_data = addon.get_flow_data(mock_flow)
+
+        assert flow_data.request_body == b'{"request": "data"}'
+
+    def test_get_flow_data_invalid_utf8_decoded_leniently(self, addon, mock_flow):
+        """Test bytes that are not valid UTF-8 fall back to lenient decoding"""
+        mock_flow.request.headers = http.Headers([(b"Content-Type", b"text/plain")])
+        mock_flow.request.content = b'caf\xe9'
+        mock_flow.request.get_text.return_value = 'caf\ufffd'
+
+        flow_data = addon.get_flow_data(mock_flow)
+
+        assert flow_data.request_body == 'caf\ufffd'
+        mock_flow.request.get_text.assert_called_once_with(strict=False)
+
+    def test_get_flow_data_other_charset_uses_text(self, addon, mock_flow):
+        """Test textual bodies in a non-UTF-8 charset are decoded"""
+        mock_flow.request.headers = http.Headers([(b"Content-Type", b"text/plain; charset=ISO-8859-1")])
+        mock_flow.request.content = b'caf\xe9'
+        mock_flow.request.text = 'café'
+
+        flow_data = addon.get_flow_data(mock_flow)
+
+        assert flow_data.request_body == 'café'
 
     def test_send_message(self, addon, mock_flow):
-        """Test sending message to queue"""
+        """Test the flow is queued as-is for the forwarder to encode"""
         flow_data = addon.get_flow_data(mock_flow)
-        
-        with patch('backend.flat_utils.MessageFactory.create_flow_data_message') as mock_factory:
-            mock_message = Mock()
-            mock_factory.return_value = mock_message
-            
-            addon._send_message(flow_data)
-            
-            mock_factory.assert_called_once_with(flow_data)
-            addon.flow_queue.put.assert_called_once_with(mock_message)
+
+        addon._send_message(flow_data)
+
+        assert list(addon.flow_queue) == [flow_data]
+
+    def test_send_message_queue(self, queue_addon, mock_flow):
+        """Test sending message through a queue-like flow_queue"""
+        flow_data = queue_addon.get_flow_data(mock_flow)
+
+        queue_addon._send_message(flow_data)
+
+        queue_addon.flow_queue.put.assert_called_once_with(flow_data)
 
     def test_send_message_error_handling(self, addon, mock_flow):
         """Test error handling in _send_message"""
         flow_data = addon.get_flow_data(mock_flow)
-        
-        with patch('backend.flat_utils.MessageFactory.create_flow_data_message', side_effect=Exception("Test error")):
-            # Should not raise exception
-            addon._send_message(flow_data)
-            
-            # Queue should not be called due to error
-            addon.flow_queue.put.assert_not_called()
+        addon._enqueue = Mock(side_effect=Exception("Test error"))
+
+        # Should not raise exception
+        addon._send_message(flow_data)
+
+        assert len(addon.flow_queue) == 0
 
     def test_request_handler_excluded_url(self, addon, mock_flow):
         """Test request handler with excluded URL"""
@@ -183,24 +238,54 @@ class TestHTTPInterceptorAddon:
         addon.request(mock_flow)
         
         # No queue message should be sent for excluded URLs
-        addon.flow_queue.put.assert_not_called()
+        assert len(addon.flow_queue) == 0
 
-    def test_request_handler_stop_event(self, addon, mock_flow):
+    def test_request_handler_stop_event(self, addon, mock_flow, dump_master):
         """Test request handler when stop event is set"""
         addon.stop_event.is_set.return_value = True
-        addon.dump_master = Mock()
+        addon.dump_master = dump_master
         
         addon.request(mock_flow)
         
         addon.dump_master.shutdown.assert_called_once()
 
+    def test_entry_status(self, addon, mock_flow, dump_master):
+        """Test entry status combines the stop signal and URL exclusion"""
+        addon.dump_master = dump_master
+        assert addon._entry_status(mock_flow) == 0
+
+        mock_flow.request.pretty_url = "http://localhost:8000/api/test"
+        assert addon._entry_status(mock_flow) == 1
+        addon.dump_master.shutdown.assert_not_called()
+
+        addon.stop_event.is_set.return_value = True
+        assert addon._entry_status(mock_flow) == 3
+        addon.dump_master.shutdown.assert_called_once()
+
     def test_request_handler_no_matching_rule(self, addon, mock_flow):
         """Test request handler with no matching rules"""
-        with patch.object(addon.cache_store, 'get_active_rules', return_value=[]):
+        with patch.object(addon.cache_store, 'match_rule', return_value=None):
             addon.request(mock_flow)
             
             assert mock_flow.intercepted_in_request is False
-            addon.flow_queue.put.assert_not_called()
+            assert len(addon.flow_queue) == 0
+
+    def test_request_handler_matching_rule(self, addon, mock_flow):
+        """Test request handler applies the rule the cache matched for the flow"""
+        rule = CompiledRule(
+            id=1,
+            rule_name="Add Header",
+            filter_id=1,
+            action=RuleAction.ADD_HEADER,
+            target_key="X-Custom",
+            target_value="custom-value",
+        )
+
+        with patch.object(addon.cache_store, 'match_rule', return_value=rule):
+            addon.request(mock_flow)
+
+        assert mock_flow.intercepted_in_request is True
+        assert mock_flow.request.headers["X-Custom"] == "custom-value"
 
     def test_response_handler_excluded_url(self, addon, mock_flow):
         """Test response handler with excluded URL"""
@@ -209,12 +294,12 @@ class TestHTTPInterceptorAddon:
         addon.response(mock_flow)
         
         # No queue message should be sent for excluded URLs
-        addon.flow_queue.put.assert_not_called()
+        assert len(addon.flow_queue) == 0
 
-    def test_response_handler_stop_event(self, addon, mock_flow):
+    def test_response_handler_stop_event(self, addon, mock_flow, dump_master):
         """Test response handler when stop event is set"""
         addon.stop_event.is_set.return_value = True
-        addon.dump_master = Mock()
+        addon.dump_master = dump_master
         
         addon.response(mock_flow)
         
@@ -222,25 +307,20 @@ class TestHTTPInterceptorAddon:
 
     def test_response_handler_normal_flow(self, addon, mock_flow):
         """Test response handler with normal flow"""
-        with patch.object(addon.cache_store, 'get_active_rules', return_value=[]), \
-             patch('backend.flat_utils.MessageFactory.create_flow_data_message') as mock_factory:
-            
-            mock_message = Mock()
-            mock_factory.return_value = mock_message
-            
+        with patch.object(addon.cache_store, 'match_rule', return_value=None):
             addon.response(mock_flow)
-            
-            addon.flow_queue.put.assert_called_once_with(mock_message)
+
+        assert [flow_data.id for flow_data in addon.flow_queue] == [mock_flow.id]
 
     def test_apply_request_rule_add_header(self, addon, mock_flow):
         """Test applying ADD_HEADER rule in request"""
-        rule = RuleModel(
+        rule = CompiledRule(
             id=1,
             rule_name="Add Header",
             filter_id=1,
             action=RuleAction.ADD_HEADER,
             target_key="X-Custom",
-            target_value="custom-value"
+            target_value="custom-value",
         )
         
         result = addon._apply_request_rule(mock_flow, rule)
@@ -251,13 +331,13 @@ class TestHTTPInterceptorAddon:
 
     def test_apply_request_rule_modify_header(self, addon, mock_flow):
         """Test applying MODIFY_HEADER rule in request"""
-        rule = RuleModel(
+        rule = CompiledRule(
             id=1,
             rule_name="Modify Header",
             filter_id=1,
             action=RuleAction.MODIFY_HEADER,
             target_key="User-Agent",
-            target_value="Modified-Agent"
+            target_value="Modified-Agent",
         )
         
         result = addon._apply_request_rule(mock_flow, rule)
@@ -267,13 +347,13 @@ class TestHTTPInterceptorAddon:
 
     def test_apply_request_rule_delete_header(self, addon, mock_flow):
         """Test applying DELETE_HEADER rule in request"""
-        rule = RuleModel(
+        rule = CompiledRule(
             id=1,
             rule_name="Delete Header",
             filter_id=1,
             action=RuleAction.DELETE_HEADER,
             target_key="User-Agent",
-            target_value="unused"  # Required by validation, but not used for DELETE_HEADER
+            target_value="unused",  # Required by validation, but not used for DELETE_HEADER
         )
         
         result = addon._apply_request_rule(mock_flow, rule)
@@ -283,13 +363,13 @@ class TestHTTPInterceptorAddon:
 
     def test_apply_request_rule_modify_body(self, addon, mock_flow):
         """Test applying MODIFY_BODY rule in request"""
-        rule = RuleModel(
+        rule = CompiledRule(
             id=1,
             rule_name="Modify Body",
             filter_id=1,
             action=RuleAction.MODIFY_BODY,
             target_key="unused",  # Required by validation, but not used for MODIFY_BODY
-            target_value='{"modified": "body"}'
+            target_value='{"modified": "body"}',
         )
         
         result = addon._apply_request_rule(mock_flow, rule)
@@ -302,13 +382,13 @@ class TestHTTPInterceptorAddon:
         # Remove existing response to test blocking
         mock_flow.response = None
         
-        rule = RuleModel(
+        rule = CompiledRule(
             id=1,
             rule_name="Block Request",
             filter_id=1,
             action=RuleAction.BLOCK_REQUEST,
             target_key="unused",  # Required by validation, but not used for BLOCK_REQUEST
-            target_value="unused"  # Required by validation, but not used for BLOCK_REQUEST
+            target_value="unused",  # Required by validation, but not used for BLOCK_REQUEST
         )
         
         result = addon._apply_request_rule(mock_flow, rule)
@@ -322,13 +402,13 @@ class TestHTTPInterceptorAddon:
         # Remove existing response to test auto response
         mock_flow.response = None
         
-        rule = RuleModel(
+        rule = CompiledRule(
             id=1,
             rule_name="Auto Respond",
             filter_id=1,
             action=RuleAction.AUTO_RESPOND,
             target_key="unused",  # Required by validation, but not used for AUTO_RESPOND
-            target_value='{"auto": "response"}'
+            target_value='{"auto": "response"}',
         )
         
         result = addon._apply_request_rule(mock_flow, rule)
@@ -339,13 +419,13 @@ class TestHTTPInterceptorAddon:
 
     def test_apply_response_rule_add_header(self, addon, mock_flow):
         """Test applying ADD_HEADER rule in response"""
-        rule = RuleModel(
+        rule = CompiledRule(
             id=1,
             rule_name="Add Response Header",
             filter_id=1,
             action=RuleAction.ADD_HEADER,
             target_key="X-Custom-Response",
-            target_value="custom-response-value"
+            target_value="custom-response-value",
         )
         
         result = addon._apply_response_rule(mock_flow, rule)
@@ -356,13 +436,13 @@ class TestHTTPInterceptorAddon:
 
     def test_apply_response_rule_modify_body(self, addon, mock_flow):
         """Test applying MODIFY_BODY rule in response"""
-        rule = RuleModel(
+        rule = CompiledRule(
             id=1,
             rule_name="Modify Response Body",
             filter_id=1,
             action=RuleAction.MODIFY_BODY,
             target_key="unused",  # Required by validation, but not used for MODIFY_BODY
-            target_value='{"modified": "response"}'
+            target_value='{"modified": "response"}',
         )
         
         result = addon._apply_response_rule(mock_flow, rule)
@@ -398,28 +478,24 @@ class TestHTTPInterceptorAddon:
             flow.request = Mock()
             flow.request.method = "GET"
             flow.request.pretty_url = f"https://example.com/api/test{i}"
-            flow.request.headers = {}
+            flow.request.headers = http.Headers()
             flow.request.content = b"{}"
             flow.request.text = "{}"
             flow.request.timestamp_start = 1234567890.0 + i
             flow.response = Mock()
             flow.response.status_code = 200
-            flow.response.headers = {}
+            flow.response.headers = http.Headers()
             flow.response.content = b"{}"
             flow.response.text = "{}"
             flow.response.timestamp_end = 1234567891.0 + i
             flow.intercepted_in_request = False
             flows.append(flow)
         
-        with patch.object(addon.cache_store, 'get_active_rules', return_value=[]), \
-             patch('backend.flat_utils.MessageFactory.create_flow_data_message') as mock_factory:
-            
-            mock_factory.return_value = Mock()
-            
+        with patch.object(addon.cache_store, 'match_rule', return_value=None):
             # Process all flows
             for flow in flows:
                 addon.request(flow)
                 addon.response(flow)
             
             # Each flow should result in one message
-            assert addon.flow_queue.put.call_count == len(flows)
+            assert len(addon.flow_queue) == len(flows)
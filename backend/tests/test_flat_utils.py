@@ -1,42 +1,131 @@
+import dataclasses
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import time
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+import flatbuffers
 from backend.models.flat_utils import (
     MessageFactory, 
     FlowDataBuilder, 
+    FlowDataBatchBuilder,
     FilterModelBuilder, 
     RuleModelBuilder,
-    HeaderPairBuilder,
     HeadersVectorBuilder,
+    ServerEventBuilder,
+    SyncMessageBuilder,
     create_flow_message,
     create_server_started_message,
-    create_server_stopped_message
+    create_server_stopped_message,
+    deserialize_flow_data,
+    estimate_flow_data_size,
+    _create_string,
+    _end_offset_vector,
+    _write_header_pair,
+    estimate_sync_message_size,
+    FlatBufferSerializer,
+    PYTHON_TO_FB_OPERATOR,
+    PYTHON_TO_FB_ACTION,
+    PYTHON_TO_FB_OPERATION
 )
-from backend.models.base_models import FlowData, FilterModel, RuleModel, Operator, RuleAction
+from backend.models.backend_generated import SyncMessage as FbSyncMessage
+from backend.models.events_generated import FlowDataBatch, WebSocketMessage, WebSocketMessageType
+from backend.models.events_generated import HeaderPairStart, HeaderPairAddKey, HeaderPairAddValue, HeaderPairEnd
+import backend.models.events_generated as events_generated
+from backend.models.base_models import FlowData, FilterModel, RuleModel, SyncMessage, Operator, RuleAction, OperationType
+
+
+# About a tenth of the ~10k ops/s measured on a workstation with builder reuse; the
+# default pytest run traces branch coverage, which alone costs roughly 5x
+MIN_FLOW_MESSAGES_PER_SEC = 1000
+
+
+def _make_perf_flow(i):
+    """Build the i-th flow used by the performance tests"""
+    return FlowData(
+        id=f"perf-test-{i}",
+        method=["GET", "POST", "PUT", "DELETE"][i % 4],
+        url=f"https://api.example.com/endpoint/{i}",
+        status=[200, 201, 204, 404][i % 4],
+        start_timestamp=1234567890.0 + i,
+        end_timestamp=1234567891.0 + i,
+        request_size=100 + i,
+        response_size=200 + i,
+        request_headers={f"Header-{i}": f"value-{i}"},
+        response_headers={f"Response-{i}": f"response-{i}"},
+        request_body=f'{{"request": {i}}}',
+        response_body=f'{{"response": {i}}}',
+        is_intercepted=i % 2 == 0
+    )
+
+
+# FlowData is frozen, so one instance of each can be shared by every test in the module
+@pytest.fixture(scope="module")
+def sample_flow():
+    """Typical JSON API flow"""
+    return FlowData(
+        id="test-flow-123",
+        method="GET",
+        url="https://example.com/api/users",
+        status=200,
+        start_timestamp=1234567890.123,
+        end_timestamp=1234567891.456,
+        request_size=512,
+        response_size=1024,
+        request_headers={"User-Agent": "test-agent", "Accept": "application/json"},
+        response_headers={"Content-Type": "application/json", "Cache-Control": "no-cache"},
+        request_body='{"query": "users"}',
+        response_body='{"users": [{"id": 1, "name": "John"}]}',
+        is_intercepted=False
+    )
+
+
+@pytest.fixture(scope="module")
+def minimal_flow():
+    """Flow with every optional field empty"""
+    return FlowData(
+        id="minimal",
+        method="GET",
+        url="https://minimal.com",
+        status=200,
+        start_timestamp=0.0,
+        end_timestamp=0.0,
+        request_size=0,
+        response_size=0,
+        request_headers={},
+        response_headers={},
+        request_body="",
+        response_body="",
+        is_intercepted=False
+    )
+
+
+@pytest.fixture(scope="module")
+def unicode_flow():
+    """Flow with non-ASCII URL and bodies"""
+    return FlowData(
+        id="unicode-test",
+        method="POST",
+        url="https://example.com/unicode/测试",
+        status=200,
+        start_timestamp=1234567890.0,
+        end_timestamp=1234567891.0,
+        request_size=100,
+        response_size=200,
+        request_headers={"Content-Type": "application/json; charset=utf-8"},
+        response_headers={"Content-Language": "zh-CN"},
+        request_body='{"message": "Hello 世界", "emoji": "🌍"}',
+        response_body='{"response": "成功", "status": "✅"}',
+        is_intercepted=False
+    )
 
 
 class TestMessageFactory:
     """Test MessageFactory class"""
     
-    def test_create_flow_data_message(self):
+    def test_create_flow_data_message(self, sample_flow):
         """Test creating flow data message"""
-        flow_data = FlowData(
-            id="test-flow-123",
-            method="GET",
-            url="https://example.com/api/users",
-            status=200,
-            start_timestamp=1234567890.123,
-            end_timestamp=1234567891.456,
-            request_size=512,
-            response_size=1024,
-            request_headers={"User-Agent": "test-agent", "Accept": "application/json"},
-            response_headers={"Content-Type": "application/json", "Cache-Control": "no-cache"},
-            request_body='{"query": "users"}',
-            response_body='{"users": [{"id": 1, "name": "John"}]}',
-            is_intercepted=False
-        )
-        
         # Create message using MessageFactory
-        buffer_data = MessageFactory.create_flow_data_message(flow_data)
+        buffer_data = MessageFactory.create_flow_data_message(sample_flow)
         
         assert isinstance(buffer_data, bytes)
         assert len(buffer_data) > 0
@@ -126,52 +215,86 @@ class TestMessageFactory:
         assert len(buffer_data) > 0
 
 
+    def test_create_sync_message_with_timestamp(self):
+        """Test sync messages sent together can share one explicit timestamp"""
+        rule = RuleModel(id=1, rule_name="Rule", filter_id=1, action=RuleAction.ADD_HEADER,
+                         target_key="X-Test", target_value="value")
+        filter_model = FilterModel(id=1, filter_name="Filter", field="url",
+                                   operator=Operator.CONTAINS, value="/api/")
+        timestamp = 1700000000.5
+
+        rules_msg = MessageFactory.create_sync_message(
+            SyncMessage(operation=OperationType.ADD, rules_list=[rule], filters_data=[]), timestamp)
+        filters_msg = MessageFactory.create_sync_message(
+            SyncMessage(operation=OperationType.ADD, rules_list=[], filters_data=[filter_model]), timestamp)
+
+        assert FbSyncMessage.GetRootAs(rules_msg, 0).Timestamp() == timestamp
+        assert FbSyncMessage.GetRootAs(filters_msg, 0).Timestamp() == timestamp
+
+    def test_create_flow_data_batch_message(self):
+        """Test a batch message carries every flow in order inside one WebSocketMessage"""
+        flows = [
+            dataclasses.replace(_make_perf_flow(i), request_headers={"Content-Type": "application/json"})
+            for i in range(4)
+        ]
+
+        message = WebSocketMessage.GetRootAs(MessageFactory.create_flow_data_batch_message(flows))
+        assert message.Type() == b"flow_batch_event"
+        assert message.DataType() == WebSocketMessageType.FlowDataBatch
+
+        batch = FlowDataBatch()
+        table = message.Data()
+        batch.Init(table.Bytes, table.Pos)
+        assert batch.ItemsLength() == len(flows)
+        for i, flow in enumerate(flows):
+            item = batch.Items(i)
+            assert item.Id().decode() == flow.id
+            assert item.Url().decode() == flow.url
+            assert item.RequestHeaders(0).Value() == b"application/json"
+
+    def test_flow_data_batch_shares_method_strings(self):
+        """Test flows in a batch with the same method reference a single method string"""
+        flows = [dataclasses.replace(_make_perf_flow(i), method="GET") for i in range(3)]
+        builder = flatbuffers.Builder(0)
+        builder.Finish(FlowDataBatchBuilder.write(builder, flows))
+
+        batch = FlowDataBatch.GetRootAs(builder.Output())
+        method_slot = 6  # vtable offset of FlowData.method
+        positions = {
+            item._tab.Indirect(item._tab.Pos + item._tab.Offset(method_slot))
+            for item in (batch.Items(i) for i in range(batch.ItemsLength()))
+        }
+        assert len(positions) == 1
+
+
+class TestEnumMappings:
+    """Test Python to FlatBuffer enum mappings"""
+
+    def test_mappings_cover_all_members(self):
+        """Test every enum member has a FlatBuffer value with the same integer"""
+        for py_enum, mapping in (
+            (Operator, PYTHON_TO_FB_OPERATOR),
+            (RuleAction, PYTHON_TO_FB_ACTION),
+            (OperationType, PYTHON_TO_FB_OPERATION),
+        ):
+            assert set(mapping) == set(py_enum)
+            assert all(mapping[member] == member.value for member in py_enum)
+
+
 class TestFlowDataBuilder:
     """Test FlowDataBuilder class"""
     
-    def test_build_flow_data(self):
+    def test_build_flow_data(self, sample_flow):
         """Test building flow data"""
-        flow_data = FlowData(
-            id="builder-test",
-            method="POST",
-            url="https://api.example.com/posts",
-            status=201,
-            start_timestamp=1234567890.0,
-            end_timestamp=1234567891.0,
-            request_size=256,
-            response_size=128,
-            request_headers={"Content-Type": "application/json"},
-            response_headers={"Location": "https://api.example.com/posts/123"},
-            request_body='{"title": "New Post"}',
-            response_body='{"id": 123, "title": "New Post"}',
-            is_intercepted=True
-        )
-        
-        builder = FlowDataBuilder(flow_data)
+        builder = FlowDataBuilder(sample_flow)
         buffer_offset = builder.build()
         
         # Builder returns an offset (integer), not bytes
         assert isinstance(buffer_offset, int)
         assert buffer_offset > 0
 
-    def test_build_minimal_flow_data(self):
+    def test_build_minimal_flow_data(self, minimal_flow):
         """Test building minimal flow data"""
-        minimal_flow = FlowData(
-            id="minimal",
-            method="GET",
-            url="https://minimal.com",
-            status=200,
-            start_timestamp=0.0,
-            end_timestamp=0.0,
-            request_size=0,
-            response_size=0,
-            request_headers={},
-            response_headers={},
-            request_body="",
-            response_body="",
-            is_intercepted=False
-        )
-        
         builder = FlowDataBuilder(minimal_flow)
         buffer_offset = builder.build()
         
@@ -179,24 +302,8 @@ class TestFlowDataBuilder:
         assert isinstance(buffer_offset, int)
         assert buffer_offset > 0
 
-    def test_build_unicode_flow_data(self):
+    def test_build_unicode_flow_data(self, unicode_flow):
         """Test building flow data with Unicode characters"""
-        unicode_flow = FlowData(
-            id="unicode-test",
-            method="POST",
-            url="https://example.com/unicode/测试",
-            status=200,
-            start_timestamp=1234567890.0,
-            end_timestamp=1234567891.0,
-            request_size=100,
-            response_size=200,
-            request_headers={"Content-Type": "application/json; charset=utf-8"},
-            response_headers={"Content-Language": "zh-CN"},
-            request_body='{"message": "Hello 世界", "emoji": "🌍"}',
-            response_body='{"response": "成功", "status": "✅"}',
-            is_intercepted=False
-        )
-        
         builder = FlowDataBuilder(unicode_flow)
         buffer_offset = builder.build()
         
@@ -205,6 +312,138 @@ class TestFlowDataBuilder:
         assert buffer_offset > 0
 
 
+    @pytest.mark.parametrize("value", ["", "GET", "https://example.com/api?q=1", "héllo 世界", b"\x00raw"])
+    def test_create_string_matches_builder(self, value):
+        """Test the string fast path writes exactly what Builder.CreateString writes"""
+        expected = flatbuffers.Builder(8)
+        actual = flatbuffers.Builder(8)
+        # Dirty the buffer first, as a pooled builder would be
+        actual.Bytes[:] = b"\xff" * len(actual.Bytes)
+
+        for _ in range(3):
+            assert _create_string(actual, value) == expected.CreateString(value)
+        assert actual.Bytes[actual.Head():] == expected.Bytes[expected.Head():]
+
+    @pytest.mark.parametrize("count", [0, 1, 7])
+    def test_end_offset_vector_matches_prepend_loop(self, count):
+        """Test the bulk offset vector writes exactly what the per-element prepend loop writes"""
+        expected = flatbuffers.Builder(8)
+        actual = flatbuffers.Builder(8)
+        values = [f"value-{i}" for i in range(count)]
+        expected_offsets = [expected.CreateString(v) for v in values]
+        actual_offsets = [actual.CreateString(v) for v in values]
+
+        expected.StartVector(4, count, 4)
+        for offset in reversed(expected_offsets):
+            expected.PrependUOffsetTRelative(offset)
+        expected_vector = expected.EndVector()
+        actual.StartVector(4, count, 4)
+
+        assert _end_offset_vector(actual, actual_offsets) == expected_vector
+        assert actual.Bytes[actual.Head():] == expected.Bytes[expected.Head():]
+
+    def test_write_header_pair_matches_generated_calls(self):
+        """Test the header pair fast path writes exactly what the generated table API writes"""
+        expected = flatbuffers.Builder(8)
+        actual = flatbuffers.Builder(8)
+        pairs = [("Host", "example.com"), ("Accept", ""), ("X-Odd", "abc")]
+
+        for key, value in pairs:
+            key_fb, value_fb = expected.CreateString(key), expected.CreateString(value)
+            HeaderPairStart(expected)
+            HeaderPairAddKey(expected, key_fb)
+            HeaderPairAddValue(expected, value_fb)
+            expected_offset = HeaderPairEnd(expected)
+
+            key_fb, value_fb = actual.CreateString(key), actual.CreateString(value)
+            assert _write_header_pair(actual, key_fb, value_fb) == expected_offset
+        assert actual.Bytes[actual.Head():] == expected.Bytes[expected.Head():]
+
+    @pytest.mark.parametrize("changes", [
+        {},
+        {"status": 0, "start_timestamp": 0.0, "end_timestamp": 0.0, "request_size": 0, "response_size": 0},
+        {"id": "odd", "method": "PATCH", "status": 204, "is_intercepted": True},
+        {"start_timestamp": 1.5, "end_timestamp": 0.0, "response_size": 7},
+    ])
+    def test_flow_data_slots_match_generated_calls(self, changes):
+        """Test the FlowData slot writers produce exactly what the generated FlowDataAdd* calls produce"""
+        flow = dataclasses.replace(_make_perf_flow(3), request_headers={}, response_headers={}, **changes)
+        expected = flatbuffers.Builder(8)
+        strings = [expected.CreateString(value) for value in (
+            flow.id, flow.method, flow.url, flow.request_body or "", flow.response_body or "")]
+        events_generated.FlowDataStart(expected)
+        events_generated.FlowDataAddId(expected, strings[0])
+        events_generated.FlowDataAddMethod(expected, strings[1])
+        events_generated.FlowDataAddUrl(expected, strings[2])
+        events_generated.FlowDataAddStatus(expected, flow.status)
+        events_generated.FlowDataAddStartTimestamp(expected, flow.start_timestamp)
+        events_generated.FlowDataAddEndTimestamp(expected, flow.end_timestamp)
+        events_generated.FlowDataAddRequestSize(expected, flow.request_size)
+        events_generated.FlowDataAddResponseSize(expected, flow.response_size)
+        events_generated.FlowDataAddRequestBody(expected, strings[3])
+        events_generated.FlowDataAddResponseBody(expected, strings[4])
+        events_generated.FlowDataAddIsIntercepted(expected, flow.is_intercepted)
+        expected.Finish(events_generated.FlowDataEnd(expected))
+
+        actual = flatbuffers.Builder(8)
+        actual.Finish(FlowDataBuilder.write(actual, flow))
+
+        assert actual.Output() == expected.Output()
+
+    def test_builders_have_no_instance_dict(self, sample_flow):
+        """Test per-message builders are slotted and carry no __dict__"""
+        builder = flatbuffers.Builder(0)
+        for obj in (FlowDataBuilder(sample_flow, builder), HeadersVectorBuilder({}, builder),
+                    ServerEventBuilder("started", 8888, builder)):
+            assert not hasattr(obj, "__dict__")
+
+    def test_get_bytes_round_trip(self):
+        """Test a standalone builder produces a decodable root buffer"""
+        flow_data = FlowData(
+            id="round-trip",
+            method="PUT",
+            url="https://example.com/items/1",
+            status=204,
+            start_timestamp=1234567890.5,
+            end_timestamp=1234567891.5,
+            request_size=2,
+            response_size=0,
+            request_headers={"Content-Type": "application/json"},
+            response_headers={},
+            request_body="{}",
+            response_body="",
+            is_intercepted=True
+        )
+
+        buffer_data = FlowDataBuilder(flow_data).get_bytes()
+
+        assert deserialize_flow_data(buffer_data) == flow_data
+
+
+    def test_timestamps_round_trip_as_float_seconds(self):
+        """Test timestamps keep the float64-seconds wire format the web client decodes"""
+        flow_data = FlowData(
+            id="timestamps",
+            method="GET",
+            url="https://example.com",
+            status=200,
+            start_timestamp=1234567890.1234567,
+            end_timestamp=1234567891.7654321,
+            request_size=0,
+            response_size=0,
+            request_headers={},
+            response_headers={},
+            request_body="",
+            response_body="",
+            is_intercepted=False
+        )
+
+        decoded = deserialize_flow_data(FlowDataBuilder(flow_data).get_bytes())
+
+        assert decoded.start_timestamp == flow_data.start_timestamp
+        assert decoded.end_timestamp == flow_data.end_timestamp
+
+
 class TestFilterModelBuilder:
     """Test FilterModelBuilder class"""
     
@@ -241,6 +480,8 @@ class TestFilterModelBuilder:
         # Builder returns an offset (integer), not bytes
         assert isinstance(buffer_offset, int)
         assert buffer_offset > 0
+        # The pattern was compiled when the model was validated
+        assert regex_filter.compiled_pattern.pattern == regex_filter.value
 
 
 class TestRuleModelBuilder:
@@ -290,8 +531,6 @@ class TestHeadersVectorBuilder:
     
     def test_build_headers_vector(self):
         """Test building headers vector"""
-        import flatbuffers
-        
         headers = {
             "Content-Type": "application/json",
             "User-Agent": "test-agent",
@@ -306,8 +545,6 @@ class TestHeadersVectorBuilder:
 
     def test_build_empty_headers_vector(self):
         """Test building empty headers vector"""
-        import flatbuffers
-        
         headers = {}
         
         builder = flatbuffers.Builder(1024)
@@ -319,8 +556,6 @@ class TestHeadersVectorBuilder:
 
     def test_build_large_headers_vector(self):
         """Test building large headers vector"""
-        import flatbuffers
-        
         # Create a large headers dictionary
         headers = {f"Header-{i}": f"Value-{i}" * 10 for i in range(50)}
         
@@ -331,28 +566,106 @@ class TestHeadersVectorBuilder:
         assert headers_vector is not None
 
 
-class TestConvenienceFunctions:
-    """Test convenience functions"""
-    
-    def test_create_flow_message(self):
-        """Test create_flow_message convenience function"""
+    def test_header_name_cache(self, monkeypatch):
+        """Test header names are cached up to the size limit"""
+        monkeypatch.setattr(HeadersVectorBuilder, "_NAME_CACHE", {})
+        monkeypatch.setattr(HeadersVectorBuilder, "_NAME_CACHE_MAX_SIZE", 2)
+
+        headers = {f"Header-{i}": "value" for i in range(3)}
+        HeadersVectorBuilder(headers, flatbuffers.Builder(1024)).build()
+
+        assert HeadersVectorBuilder._NAME_CACHE == {"Header-0": b"Header-0", "Header-1": b"Header-1"}
+
+    def test_build_pair_matches_separate_builds(self):
+        """Test building both header vectors together matches building them one at a time"""
+        request_headers = {"Host": "example.com", "Accept": "*/*"}
+        response_headers = {"Content-Type": "application/json"}
+
+        separate = flatbuffers.Builder(1024)
+        HeadersVectorBuilder(request_headers, separate).build()
+        HeadersVectorBuilder(response_headers, separate).build()
+
+        paired = flatbuffers.Builder(1024)
+        offsets = HeadersVectorBuilder.build_pair(request_headers, response_headers, paired)
+
+        assert all(offset is not None for offset in offsets)
+        assert paired.Bytes[paired.Head():] == separate.Bytes[separate.Head():]
+        assert HeadersVectorBuilder.build_pair({}, {}, flatbuffers.Builder(1024)) == (None, None)
+
+    def test_header_names_shared_across_vectors(self, sample_flow):
+        """Test a header name present on both sides is written into the message once"""
+        shared = dataclasses.replace(
+            sample_flow,
+            request_headers={"Content-Type": "application/json"},
+            response_headers={"Content-Type": "text/html"},
+        )
+        distinct = dataclasses.replace(shared, response_headers={"Content-Typf": "text/html"})
+
+        message = create_flow_message(shared)
+        assert len(message) < len(create_flow_message(distinct))
+        assert message.count(b"Content-Type") == 1
+        assert deserialize_flow_data(FlowDataBuilder(shared).get_bytes()) == shared
+
+    def test_bytes_bodies_match_str_bodies(self, unicode_flow):
+        """Test UTF-8 bytes bodies encode identically to the equivalent str bodies"""
+        bytes_flow = dataclasses.replace(
+            unicode_flow,
+            request_body=unicode_flow.request_body.encode('utf-8'),
+            response_body=unicode_flow.response_body.encode('utf-8'),
+        )
+
+        assert create_flow_message(bytes_flow) == create_flow_message(unicode_flow)
+
+    def test_raw_header_fields_match_dict_headers(self, unicode_flow):
+        """Test raw (bytes, bytes) header fields encode identically to the equivalent dicts"""
+        raw_flow = dataclasses.replace(
+            unicode_flow,
+            request_headers=tuple((k.encode('utf-8'), v.encode('utf-8'))
+                                  for k, v in unicode_flow.request_headers.items()),
+            response_headers=tuple((k.encode('utf-8'), v.encode('utf-8'))
+                                   for k, v in unicode_flow.response_headers.items()),
+        )
+
+        assert create_flow_message(raw_flow) == create_flow_message(unicode_flow)
+
+    def test_str_header_pairs_match_dict_headers(self, unicode_flow):
+        """Test lists of (str, str) header pairs encode identically to the equivalent dicts"""
+        pair_flow = dataclasses.replace(
+            unicode_flow,
+            request_headers=list(unicode_flow.request_headers.items()),
+            response_headers=list(unicode_flow.response_headers.items()),
+        )
+
+        assert create_flow_message(pair_flow) == create_flow_message(unicode_flow)
+
+    def test_unicode_headers_round_trip(self):
+        """Test non-ASCII header keys and values survive encoding"""
+        headers = {"Content-Language": "zh-CN", "X-Greeting": "héllo 世界"}
         flow_data = FlowData(
-            id="convenience-test",
+            id="unicode-headers",
             method="GET",
-            url="https://example.com/test",
+            url="https://example.com",
             status=200,
-            start_timestamp=1234567890.0,
-            end_timestamp=1234567891.0,
-            request_size=100,
-            response_size=200,
-            request_headers={"User-Agent": "test"},
-            response_headers={"Content-Type": "application/json"},
+            start_timestamp=0.0,
+            end_timestamp=0.0,
+            request_size=0,
+            response_size=0,
+            request_headers=headers,
+            response_headers={},
             request_body="",
-            response_body='{"result": "success"}',
+            response_body="",
             is_intercepted=False
         )
-        
-        buffer_data = create_flow_message(flow_data)
+
+        assert deserialize_flow_data(FlowDataBuilder(flow_data).get_bytes()).request_headers == headers
+
+
+class TestConvenienceFunctions:
+    """Test convenience functions"""
+    
+    def test_create_flow_message(self, sample_flow):
+        """Test create_flow_message convenience function"""
+        buffer_data = create_flow_message(sample_flow)
         
         assert isinstance(buffer_data, bytes)
         assert len(buffer_data) > 0
@@ -371,6 +684,12 @@ class TestConvenienceFunctions:
         assert isinstance(buffer_data, bytes)
         assert len(buffer_data) > 0
 
+    def test_server_event_messages_cached(self):
+        """Test repeated server events reuse the encoded bytes"""
+        assert create_server_started_message(8080) is create_server_started_message(8080)
+        assert create_server_started_message(8080) == MessageFactory.create_server_event_message("started", 8080)
+        assert create_server_started_message(8080) != create_server_stopped_message(8080)
+
 
 class TestErrorHandling:
     """Test error handling scenarios"""
@@ -445,45 +764,53 @@ class TestErrorHandling:
         assert len(buffer1) > 0
         assert len(buffer2) > 0
 
+        # A reused builder keeps its buffer, and stale bytes from the previous
+        # message never leak into the next one
+        serializer = FlatBufferSerializer()
+        serializer.create_flow_data_message(dataclasses.replace(flow_data1, request_body="x" * 4096))
+        buffer = serializer.builder.Bytes
+        assert serializer.create_flow_data_message(flow_data2) == FlatBufferSerializer().create_flow_data_message(flow_data2)
+        assert serializer.builder.Bytes is buffer
+
 
 class TestPerformance:
     """Test performance characteristics"""
     
-    def test_message_creation_performance(self):
-        """Test message creation performance with multiple objects"""
-        import time
-        
-        # Create a batch of flows
-        flows = [
-            FlowData(
-                id=f"perf-test-{i}",
-                method=["GET", "POST", "PUT", "DELETE"][i % 4],
-                url=f"https://api.example.com/endpoint/{i}",
-                status=[200, 201, 204, 404][i % 4],
-                start_timestamp=1234567890.0 + i,
-                end_timestamp=1234567891.0 + i,
-                request_size=100 + i,
-                response_size=200 + i,
-                request_headers={f"Header-{i}": f"value-{i}"},
-                response_headers={f"Response-{i}": f"response-{i}"},
-                request_body=f'{{"request": {i}}}',
-                response_body=f'{{"response": {i}}}',
-                is_intercepted=i % 2 == 0
-            )
-            for i in range(100)
-        ]
-        
-        # Measure message creation time
-        start_time = time.time()
-        buffers = [create_flow_message(flow) for flow in flows]
-        creation_time = time.time() - start_time
-        
-        # Verify all messages were created
-        assert len(buffers) == 100
-        assert all(isinstance(buffer, bytes) and len(buffer) > 0 for buffer in buffers)
-        
-        # Performance should be reasonable (less than 2 seconds for 100 objects)
-        assert creation_time < 2.0
+    @pytest.mark.parametrize("n", [10, 100, 1000])
+    def test_message_creation_performance(self, n):
+        """Test batch message creation with multiple objects at several scales"""
+        buffer = MessageFactory.create_flow_data_batch_message([_make_perf_flow(i) for i in range(n)])
+
+        # Verify every flow landed in the batch
+        table = WebSocketMessage.GetRootAs(buffer).Data()
+        batch = FlowDataBatch()
+        batch.Init(table.Bytes, table.Pos)
+        assert batch.ItemsLength() == n
+
+    @pytest.mark.perf
+    def test_message_creation_throughput(self):
+        """Test flow message encoding stays above the throughput baseline"""
+        n = 1000
+        flows = [_make_perf_flow(i) for i in range(n)]
+        MessageFactory.create_flow_data_batch_message(flows[:10])  # warm the serializer pool
+
+        start_ns = time.perf_counter_ns()
+        MessageFactory.create_flow_data_batch_message(flows)
+        elapsed_ns = time.perf_counter_ns() - start_ns
+
+        ops_per_sec = n / (elapsed_ns / 1e9)
+        print(f"flow messages: {ops_per_sec:,.0f} ops/s ({elapsed_ns / n:,.0f} ns/op)")
+        assert ops_per_sec > MIN_FLOW_MESSAGES_PER_SEC
+
+    def test_threaded_encode(self):
+        """Test concurrent encoders share the serializer pool without corrupting messages"""
+        flows = [_make_perf_flow(i) for i in range(1000)]
+        expected = [create_flow_message(flow) for flow in flows]
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(create_flow_message, flows))
+
+        assert results == expected
 
     def test_large_data_handling(self):
         """Test handling large data efficiently"""
@@ -506,13 +833,116 @@ class TestPerformance:
             is_intercepted=True
         )
         
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         buffer_data = create_flow_message(large_flow)
-        creation_time = time.time() - start_time
+        creation_time = time.perf_counter() - start_time
         
         assert isinstance(buffer_data, bytes)
         assert len(buffer_data) > 0
         # Should handle large data reasonably quickly
         assert creation_time < 1.0
 
+    def test_large_data_presized_builder(self):
+        """Test large flows are encoded without growing the builder buffer"""
+        large_body = "x" * 50000
+        large_headers = {f"Header-{i}": f"Value-{i}" * 100 for i in range(100)}
+
+        large_flow = FlowData(
+            id="presized-test",
+            method="POST",
+            url="https://example.com/large",
+            status=200,
+            start_timestamp=1234567890.0,
+            end_timestamp=1234567891.0,
+            request_size=len(large_body),
+            response_size=len(large_body),
+            request_headers=large_headers,
+            response_headers=large_headers.copy(),
+            request_body=large_body,
+            response_body=large_body,
+            is_intercepted=True
+        )
+
+        serializer = FlatBufferSerializer()
+        buffer_data = serializer.create_flow_data_message(large_flow)
+
+        # A regrowth would have doubled the buffer past the estimate
+        assert len(serializer.builder.Bytes) == estimate_flow_data_size(large_flow)
+        assert len(buffer_data) <= len(serializer.builder.Bytes)
+
+    def test_non_ascii_flow_presized_builder(self):
+        """Test the size estimate counts UTF-8 bytes, so non-ASCII flows do not regrow the buffer"""
+        text = "héllo 世界 🌍 " * 2000
+        flow = FlowData(
+            id="presized-unicode",
+            method="POST",
+            url="https://example.com/" + "世界" * 100,
+            status=200,
+            start_timestamp=0.0,
+            end_timestamp=0.0,
+            request_size=0,
+            response_size=0,
+            request_headers={f"X-{i}": "值" * 50 for i in range(50)},
+            response_headers={},
+            request_body=text,
+            response_body=text,
+        )
+
+        serializer = FlatBufferSerializer()
+        serializer.create_flow_data_message(flow)
+
+        assert len(serializer.builder.Bytes) == estimate_flow_data_size(flow)
+
+    def test_large_sync_message_presized_builder(self):
+        """Test large sync messages are encoded without growing the builder buffer"""
+        rules = [
+            RuleModel(id=i, rule_name=f"Rule {i}", filter_id=i, action=RuleAction.MODIFY_HEADER,
+                      target_key="X-Custom", target_value="value" * 20)
+            for i in range(200)
+        ]
+        filters = [
+            FilterModel(id=i, filter_name=f"Filter {i}", field="header:Authorization",
+                        operator=Operator.CONTAINS, value="token" * 8)
+            for i in range(200)
+        ]
+        sync_message = SyncMessage(operation=OperationType.FULL_SYNC, rules_list=rules, filters_data=filters)
+
+        serializer = FlatBufferSerializer()
+        buffer_data = serializer.serialize_sync_message(sync_message)
+
+        assert len(serializer.builder.Bytes) == estimate_sync_message_size(sync_message)
+        assert len(buffer_data) <= len(serializer.builder.Bytes)
+
+    def test_unicode_sync_message_presized_builder(self):
+        """Test non-ASCII names and values are sized in UTF-8 bytes, not characters"""
+        rules = [
+            RuleModel(id=i, rule_name=f"规则 {i}", filter_id=i, action=RuleAction.MODIFY_HEADER,
+                      target_key="X-Custom", target_value="值" * 100)
+            for i in range(50)
+        ]
+        filters = [
+            FilterModel(id=i, filter_name=f"过滤器 {i}", field="url",
+                        operator=Operator.CONTAINS, value="世界" * 50)
+            for i in range(50)
+        ]
+        sync_message = SyncMessage(operation=OperationType.FULL_SYNC, rules_list=rules, filters_data=filters)
+
+        serializer = FlatBufferSerializer()
+        serializer.serialize_sync_message(sync_message)
+
+        assert len(serializer.builder.Bytes) == estimate_sync_message_size(sync_message)
+
+    def test_sync_message_allocates_one_builder(self):
+        """Test nested rule and filter tables are written into the message's own builder"""
+        sync_message = SyncMessage(
+            operation=OperationType.FULL_SYNC,
+            rules_list=[RuleModel(id=i, rule_name=f"Rule {i}", filter_id=i, action=RuleAction.ADD_HEADER,
+                                  target_key="X-Test", target_value="1") for i in range(20)],
+            filters_data=[FilterModel(id=i, filter_name=f"Filter {i}", field="url",
+                                      operator=Operator.CONTAINS, value="/api") for i in range(20)],
+        )
+
+        with patch('flatbuffers.Builder', wraps=flatbuffers.Builder) as builder_cls:
+            SyncMessageBuilder(sync_message).get_bytes()
+
+        assert builder_cls.call_count == 1
@@ -1,90 +1,91 @@
 import pytest
+import dataclasses
 from unittest.mock import Mock, patch
 from mitmproxy import http
 from pydantic import ValidationError
 from backend.models.base_models import (
-    FlowData, FilterModel, RuleModel, 
+    FlowData, FilterModel, RuleModel, CompiledRule,
     Operator, RuleAction, OperationType, SyncMessage
 )
 
 
+_FLOW_DEFAULTS = dict(
+    id="test-123",
+    method="GET",
+    url="https://example.com/api/users",
+    status=200,
+    start_timestamp=1234567890.123,
+    end_timestamp=1234567891.456,
+    request_size=512,
+    response_size=1024,
+    request_headers={"User-Agent": "test"},
+    response_headers={"Content-Type": "application/json"},
+    request_body="",
+    response_body='{"users": []}',
+    is_intercepted=False
+)
+
+
 class TestFlowData:
     """Test FlowData model"""
     
-    def test_flow_data_creation(self):
-        """Test FlowData model creation"""
-        flow_data = FlowData(
-            id="test-123",
-            method="GET",
-            url="https://example.com/api/users",
-            status=200,
-            start_timestamp=1234567890.123,
-            end_timestamp=1234567891.456,
-            request_size=512,
-            response_size=1024,
-            request_headers={"User-Agent": "test"},
-            response_headers={"Content-Type": "application/json"},
-            request_body="",
-            response_body='{"users": []}',
-            is_intercepted=False
-        )
-        
-        assert flow_data.id == "test-123"
-        assert flow_data.method == "GET"
-        assert flow_data.url == "https://example.com/api/users"
-        assert flow_data.status == 200
-        assert flow_data.start_timestamp == 1234567890.123
-        assert flow_data.end_timestamp == 1234567891.456
-        assert flow_data.request_size == 512
-        assert flow_data.response_size == 1024
-        assert flow_data.request_headers == {"User-Agent": "test"}
-        assert flow_data.response_headers == {"Content-Type": "application/json"}
-        assert flow_data.request_body == ""
-        assert flow_data.response_body == '{"users": []}'
-        assert flow_data.is_intercepted is False
+    @pytest.mark.parametrize("overrides", [
+        {},
+        {"method": "POST", "status": 201, "is_intercepted": True},
+        {"request_headers": {}, "response_headers": {}, "response_body": ""},
+    ])
+    def test_flow_data_creation(self, overrides):
+        """Test FlowData creation keeps every field as given"""
+        expected = {**_FLOW_DEFAULTS, **overrides}
+        flow_data = FlowData(**expected)
+
+        for field, value in expected.items():
+            assert getattr(flow_data, field) == value
+
+    def test_flow_data_frozen_slots(self):
+        """Test FlowData is immutable and carries no instance dict"""
+        kwargs = dict(_FLOW_DEFAULTS)
+        del kwargs["is_intercepted"]
+        flow_data = FlowData(**kwargs)
 
-    def test_flow_data_validation(self):
-        """Test FlowData validation"""
-        # Test with minimal valid data
-        flow_data = FlowData(
-            id="test",
-            method="POST",
-            url="https://api.test.com",
-            status=201,
-            start_timestamp=1234567890.0,
-            end_timestamp=1234567891.0,
-            request_size=0,
-            response_size=0,
-            request_headers={},
-            response_headers={},
-            request_body="",
-            response_body="",
-            is_intercepted=True
-        )
-        
-        assert flow_data.method == "POST"
-        assert flow_data.status == 201
-        assert flow_data.is_intercepted is True
+        assert flow_data.is_intercepted is False
+        assert not hasattr(flow_data, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            flow_data.status = 500
 
 
 class TestOperator:
     """Test Operator enum"""
     
-    def test_operator_values(self):
-        """Test Operator enum values"""
-        assert Operator.CONTAINS.value == 0
-        assert Operator.EQUALS.value == 1
-        assert Operator.STARTS_WITH.value == 2
-        assert Operator.ENDS_WITH.value == 3
-        assert Operator.REGEX.value == 4
-
-    def test_operator_from_int(self):
-        """Test Operator from_int method"""
-        assert Operator.from_int(0) == Operator.CONTAINS
-        assert Operator.from_int(1) == Operator.EQUALS
-        assert Operator.from_int(2) == Operator.STARTS_WITH
-        assert Operator.from_int(3) == Operator.ENDS_WITH
-        assert Operator.from_int(4) == Operator.REGEX
+    @pytest.mark.parametrize("value, member", [
+        (0, Operator.CONTAINS),
+        (1, Operator.EQUALS),
+        (2, Operator.STARTS_WITH),
+        (3, Operator.ENDS_WITH),
+        (4, Operator.REGEX),
+    ])
+    def test_operator_roundtrip(self, value, member):
+        """Test Operator enum values and from_int method"""
+        assert member.value == value
+        assert Operator.from_int(value) == member
+
+    @pytest.mark.parametrize("enum_cls", [Operator, RuleAction, OperationType])
+    def test_from_string(self, enum_cls):
+        """Test from_string resolves every member name case-insensitively"""
+        for member in enum_cls:
+            assert enum_cls.from_string(member.name.lower()) is member
+            assert member.to_int() == member
+        with pytest.raises(KeyError):
+            enum_cls.from_string("not_a_member")
+
+    def test_operator_apply_regex(self):
+        """Test Operator.apply with REGEX reuses the compiled pattern"""
+        from backend.models.base_models import _compile
+        _compile.cache_clear()
+
+        assert Operator.REGEX.apply(r"^/api/v\d+", "/api/v2/users") is True
+        assert Operator.REGEX.apply(r"^/api/v\d+", "/web/users") is False
+        assert _compile.cache_info().misses == 1
 
     def test_operator_from_int_invalid(self):
         """Test Operator from_int with invalid value"""
@@ -92,6 +93,21 @@ class TestOperator:
             Operator.from_int(999)
 
 
+@pytest.fixture(scope="module")
+def flow_factory():
+    """
+    Factory for a mock HTTPFlow. The spec'd flow is built once per module; each call
+    gives it a fresh request carrying only the attributes passed in.
+    """
+    base = Mock(spec=http.HTTPFlow)
+
+    def make(**request_attrs):
+        base.request = Mock(**request_attrs)
+        return base
+
+    return make
+
+
 class TestFilterModel:
     """Test FilterModel"""
     
@@ -122,37 +138,25 @@ class TestFilterModel:
         
         assert filter_model.id == 123
 
-    def test_filter_validation_empty_name(self):
-        """Test FilterModel validation with empty name"""
+    @pytest.mark.parametrize("blank_field", ["filter_name", "field", "value"])
+    def test_filter_validation_empty(self, blank_field):
+        """Test FilterModel validation with an empty required field"""
+        kwargs = dict(filter_name="Test", field="url", operator=Operator.CONTAINS, value="test")
+        kwargs[blank_field] = ""
         with pytest.raises(ValidationError, match="This field is required and cannot be empty"):
-            FilterModel(
-                filter_name="",
-                field="url",
-                operator=Operator.CONTAINS,
-                value="test"
-            )
+            FilterModel(**kwargs)
 
-    def test_filter_validation_empty_field(self):
-        """Test FilterModel validation with empty field"""
-        with pytest.raises(ValidationError, match="This field is required and cannot be empty"):
-            FilterModel(
-                filter_name="Test",
-                field="",
-                operator=Operator.CONTAINS,
-                value="test"
-            )
-
-    def test_filter_validation_empty_value(self):
-        """Test FilterModel validation with empty value"""
-        with pytest.raises(ValidationError, match="This field is required and cannot be empty"):
+    def test_filter_validation_invalid_regex(self):
+        """Test FilterModel validation rejects malformed REGEX patterns"""
+        with pytest.raises(ValidationError, match="Invalid regular expression"):
             FilterModel(
                 filter_name="Test",
                 field="url",
-                operator=Operator.CONTAINS,
-                value=""
+                operator=Operator.REGEX,
+                value="api/(v1"
             )
 
-    def test_filter_evaluate_contains(self):
+    def test_filter_evaluate_contains(self, flow_factory):
         """Test FilterModel evaluate with CONTAINS operator"""
         filter_model = FilterModel(
             filter_name="URL Filter",
@@ -161,20 +165,17 @@ class TestFilterModel:
             value="api"
         )
         
-        # Create mock flow
-        mock_flow = Mock(spec=http.HTTPFlow)
-        mock_flow.request = Mock()
-        mock_flow.request.pretty_url = "https://example.com/api/users"
+        mock_flow = flow_factory(pretty_url="https://example.com/api/users")
         
         result = filter_model.evaluate(mock_flow)
         assert result is True
         
         # Test negative case
-        mock_flow.request.pretty_url = "https://example.com/web/users"
+        mock_flow = flow_factory(pretty_url="https://example.com/web/users")
         result = filter_model.evaluate(mock_flow)
         assert result is False
 
-    def test_filter_evaluate_equals(self):
+    def test_filter_evaluate_equals(self, flow_factory):
         """Test FilterModel evaluate with EQUALS operator"""
         filter_model = FilterModel(
             filter_name="Method Filter",
@@ -183,19 +184,17 @@ class TestFilterModel:
             value="GET"
         )
         
-        mock_flow = Mock(spec=http.HTTPFlow)
-        mock_flow.request = Mock()
-        mock_flow.request.method = "GET"
+        mock_flow = flow_factory(method="GET")
         
         result = filter_model.evaluate(mock_flow)
         assert result is True
         
         # Test negative case
-        mock_flow.request.method = "POST"
+        mock_flow = flow_factory(method="POST")
         result = filter_model.evaluate(mock_flow)
         assert result is False
 
-    def test_filter_evaluate_starts_with(self):
+    def test_filter_evaluate_starts_with(self, flow_factory):
         """Test FilterModel evaluate with STARTS_WITH operator"""
         filter_model = FilterModel(
             filter_name="URL Starts Filter",
@@ -204,14 +203,12 @@ class TestFilterModel:
             value="https://api"
         )
         
-        mock_flow = Mock(spec=http.HTTPFlow)
-        mock_flow.request = Mock()
-        mock_flow.request.pretty_url = "https://api.example.com/users"
+        mock_flow = flow_factory(pretty_url="https://api.example.com/users")
         
         result = filter_model.evaluate(mock_flow)
         assert result is True
 
-    def test_filter_evaluate_ends_with(self):
+    def test_filter_evaluate_ends_with(self, flow_factory):
         """Test FilterModel evaluate with ENDS_WITH operator"""
         filter_model = FilterModel(
             filter_name="URL Ends Filter",
@@ -220,14 +217,12 @@ class TestFilterModel:
             value="/users"
         )
         
-        mock_flow = Mock(spec=http.HTTPFlow)
-        mock_flow.request = Mock()
-        mock_flow.request.pretty_url = "https://example.com/api/users"
+        mock_flow = flow_factory(pretty_url="https://example.com/api/users")
         
         result = filter_model.evaluate(mock_flow)
         assert result is True
 
-    def test_filter_evaluate_regex(self):
+    def test_filter_evaluate_regex(self, flow_factory):
         """Test FilterModel evaluate with REGEX operator"""
         filter_model = FilterModel(
             filter_name="Regex Filter",
@@ -236,14 +231,12 @@ class TestFilterModel:
             value=r"https://\w+\.com"
         )
         
-        mock_flow = Mock(spec=http.HTTPFlow)
-        mock_flow.request = Mock()
-        mock_flow.request.pretty_url = "https://example.com/api"
+        mock_flow = flow_factory(pretty_url="https://example.com/api")
         
         result = filter_model.evaluate(mock_flow)
         assert result is True
 
-    def test_filter_evaluate_header_field(self):
+    def test_filter_evaluate_header_field(self, flow_factory):
         """Test FilterModel evaluate with header field"""
         filter_model = FilterModel(
             filter_name="Header Filter",
@@ -252,14 +245,55 @@ class TestFilterModel:
             value="Mozilla"
         )
         
-        mock_flow = Mock(spec=http.HTTPFlow)
-        mock_flow.request = Mock()
-        mock_flow.request.headers = {"User-Agent": "Mozilla/5.0"}
+        mock_flow = flow_factory(headers={"User-Agent": "Mozilla/5.0"})
         
         result = filter_model.evaluate(mock_flow)
         assert result is True
 
-    def test_filter_evaluate_invalid_field(self):
+    def test_filter_evaluate_missing_header(self, flow_factory):
+        """Test FilterModel evaluate with a header the request does not carry"""
+        filter_model = FilterModel(
+            filter_name="Header Filter",
+            field="header:X-Missing",
+            operator=Operator.CONTAINS,
+            value="anything"
+        )
+
+        assert filter_model.evaluate(flow_factory(headers={})) is False
+
+    def test_filter_evaluate_body(self, flow_factory):
+        """Test FilterModel evaluate with body field"""
+        filter_model = FilterModel(
+            filter_name="Body Filter",
+            field="body",
+            operator=Operator.REGEX,
+            value=r'"id":\s*\d+'
+        )
+
+        assert filter_model.evaluate(flow_factory(content=b'{"id": 42}')) is True
+        assert filter_model.evaluate(flow_factory(content=None)) is False
+
+    def test_filter_matcher_built_once(self):
+        """Test the flow predicate is built at validation and reused"""
+        filter_model = FilterModel(filter_name="URL Filter", field="url", operator=Operator.EQUALS, value="x")
+
+        assert "matcher" in filter_model.__dict__
+        assert filter_model.matcher is filter_model.matcher
+
+    def test_filter_matcher_follows_changes(self, flow_factory):
+        """Test assignment and model_copy rebuild the predicate from the new value"""
+        filter_model = FilterModel(filter_name="URL Filter", field="url", operator=Operator.CONTAINS, value="api")
+        flow = flow_factory(pretty_url="https://example.com/api/users")
+        assert filter_model.evaluate(flow) is True
+
+        copied = filter_model.model_copy(update={"value": "zzz"})
+        assert copied.evaluate(flow) is False
+        assert filter_model.evaluate(flow) is True
+
+        filter_model.value = "zzz"
+        assert filter_model.evaluate(flow) is False
+
+    def test_filter_evaluate_invalid_field(self, flow_factory):
         """Test FilterModel evaluate with invalid field"""
         filter_model = FilterModel(
             filter_name="Invalid Filter",
@@ -268,7 +302,7 @@ class TestFilterModel:
             value="test"
         )
         
-        mock_flow = Mock(spec=http.HTTPFlow)
+        mock_flow = flow_factory()
         
         result = filter_model.evaluate(mock_flow)
         assert result is False
@@ -277,23 +311,18 @@ class TestFilterModel:
 class TestRuleAction:
     """Test RuleAction enum"""
     
-    def test_rule_action_values(self):
-        """Test RuleAction enum values"""
-        assert RuleAction.ADD_HEADER.value == 0
-        assert RuleAction.MODIFY_HEADER.value == 1
-        assert RuleAction.DELETE_HEADER.value == 2
-        assert RuleAction.MODIFY_BODY.value == 3
-        assert RuleAction.BLOCK_REQUEST.value == 4
-        assert RuleAction.AUTO_RESPOND.value == 5
-
-    def test_rule_action_from_int(self):
-        """Test RuleAction from_int method"""
-        assert RuleAction.from_int(0) == RuleAction.ADD_HEADER
-        assert RuleAction.from_int(1) == RuleAction.MODIFY_HEADER
-        assert RuleAction.from_int(2) == RuleAction.DELETE_HEADER
-        assert RuleAction.from_int(3) == RuleAction.MODIFY_BODY
-        assert RuleAction.from_int(4) == RuleAction.BLOCK_REQUEST
-        assert RuleAction.from_int(5) == RuleAction.AUTO_RESPOND
+    @pytest.mark.parametrize("value, member", [
+        (0, RuleAction.ADD_HEADER),
+        (1, RuleAction.MODIFY_HEADER),
+        (2, RuleAction.DELETE_HEADER),
+        (3, RuleAction.MODIFY_BODY),
+        (4, RuleAction.BLOCK_REQUEST),
+        (5, RuleAction.AUTO_RESPOND),
+    ])
+    def test_rule_action_roundtrip(self, value, member):
+        """Test RuleAction enum values and from_int method"""
+        assert member.value == value
+        assert RuleAction.from_int(value) == member
 
     def test_rule_action_from_int_invalid(self):
         """Test RuleAction from_int with invalid value"""
@@ -338,50 +367,50 @@ class TestRuleModel:
         assert rule.id == 456
         assert rule.enabled is False
 
-    def test_rule_validation_empty_name(self):
-        """Test RuleModel validation with empty name"""
-        with pytest.raises(ValidationError, match="This field is required and cannot be empty"):
-            RuleModel(
-                rule_name="",
-                filter_id=1,
-                action=RuleAction.ADD_HEADER,
-                target_key="X-Test",
-                target_value="test"
-            )
-
-    def test_rule_validation_empty_target_key(self):
-        """Test RuleModel validation with empty target key"""
+    @pytest.mark.parametrize("blank_field", ["rule_name", "target_key", "target_value"])
+    def test_rule_validation_empty(self, blank_field):
+        """Test RuleModel validation with an empty required field"""
+        kwargs = dict(
+            rule_name="Test Rule",
+            filter_id=1,
+            action=RuleAction.ADD_HEADER,
+            target_key="X-Test",
+            target_value="test"
+        )
+        kwargs[blank_field] = ""
         with pytest.raises(ValidationError, match="This field is required and cannot be empty"):
-            RuleModel(
-                rule_name="Test Rule", 
-                filter_id=1,
-                action=RuleAction.ADD_HEADER,
-                target_key="",
-                target_value="test"
-            )
+            RuleModel(**kwargs)
 
-    def test_rule_validation_empty_target_value(self):
-        """Test RuleModel validation with empty target value"""
-        with pytest.raises(ValidationError, match="This field is required and cannot be empty"):
-            RuleModel(
-                rule_name="Test Rule",
-                filter_id=1,
-                action=RuleAction.ADD_HEADER,
-                target_key="X-Test",
-                target_value=""
-            )
+    def test_compiled_rule_frozen_slots(self):
+        """Test CompiledRule copies the rule and is immutable without an instance dict"""
+        rule = RuleModel(
+            id=7,
+            rule_name="Test Rule",
+            filter_id=3,
+            action=RuleAction.ADD_HEADER,
+            target_key="X-Test",
+            target_value="test"
+        )
+        compiled = CompiledRule.from_rule(rule)
 
+        assert (compiled.id, compiled.filter_id, compiled.target_key) == (7, 3, "X-Test")
+        assert not hasattr(compiled, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            compiled.target_value = "changed"
 
 class TestOperationType:
     """Test OperationType enum"""
     
-    def test_operation_type_values(self):
-        """Test OperationType enum values"""
-        assert OperationType.FULL_SYNC.value == 0
-        assert OperationType.ADD.value == 1
-        assert OperationType.UPDATE.value == 2
-        assert OperationType.DELETE.value == 3
-
+    @pytest.mark.parametrize("value, member", [
+        (0, OperationType.FULL_SYNC),
+        (1, OperationType.ADD),
+        (2, OperationType.UPDATE),
+        (3, OperationType.DELETE),
+    ])
+    def test_operation_type_roundtrip(self, value, member):
+        """Test OperationType enum values and from_int method"""
+        assert member.value == value
+        assert OperationType.from_int(value) == member
 
 class TestSyncMessage:
     """Test SyncMessage model"""
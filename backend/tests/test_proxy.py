@@ -1,5 +1,4 @@
 import pytest
-import socket
 from unittest.mock import Mock, patch, MagicMock
 from multiprocessing import SimpleQueue, Process
 from backend.services.proxy import ProxyManager, run_mitmproxy_process
@@ -7,19 +6,35 @@ from backend.models.base_models import FilterModel as PyFilterModel, RuleModel a
 from backend.services.ws import ConnectionManager
 
 
-@pytest.fixture
-def mock_connection_manager():
-    """Create mock ConnectionManager for testing"""
+@pytest.fixture(scope="module")
+def _mock_connection_manager():
+    """Single spec'd ConnectionManager mock shared by the tests in this module"""
     return Mock(spec=ConnectionManager)
 
 
 @pytest.fixture
-def proxy_manager(mock_connection_manager):
-    """Create ProxyManager instance for testing"""
-    return ProxyManager(mock_connection_manager)
+def mock_connection_manager(_mock_connection_manager):
+    """Shared ConnectionManager mock with its call history and side effects cleared"""
+    _mock_connection_manager.reset_mock(side_effect=True)
+    return _mock_connection_manager
+
+
+@pytest.fixture(scope="module")
+def _proxy_manager(_mock_connection_manager):
+    """Single ProxyManager shared by the tests in this module"""
+    return ProxyManager(_mock_connection_manager)
 
 
 @pytest.fixture
+def proxy_manager(_proxy_manager, mock_connection_manager):
+    """Shared ProxyManager, restored to its initial state after each test"""
+    state = dict(vars(_proxy_manager))
+    yield _proxy_manager
+    vars(_proxy_manager).clear()
+    vars(_proxy_manager).update(state)
+
+
+@pytest.fixture(scope="module")
 def mock_filter():
     """Create mock PyFilterModel for testing"""
     mock_filter = Mock(spec=PyFilterModel)
@@ -28,7 +43,7 @@ def mock_filter():
     return mock_filter
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_rule():
     """Create mock PyRuleModel for testing"""
     mock_rule = Mock(spec=PyRuleModel)
@@ -53,36 +68,37 @@ class TestProxyManager:
         proxy_manager = ProxyManager(mock_connection_manager, proxy_port=9090)
         assert proxy_manager.proxy_port == 9090
 
-    def test_check_port_available_free_port(self, proxy_manager):
-        """Test checking if port is available when free"""
-        # Use a high port number that's likely to be free
-        result = proxy_manager._check_port_available(65432)
-        assert result is True
-
-    def test_check_port_available_occupied_port(self, proxy_manager):
-        """Test checking if port is available when occupied"""
-        # Create a socket to occupy a port
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.bind(('localhost', 0))  # Bind to any available port
-        port = sock.getsockname()[1]
-        
-        try:
-            result = proxy_manager._check_port_available(port)
-            assert result is False
-        finally:
-            sock.close()
-
-    def test_find_available_port_default(self, proxy_manager):
-        """Test finding available port starting from default"""
-        port = proxy_manager._find_available_port()
-        assert port >= 8888
-        assert proxy_manager._check_port_available(port) is True
-
-    def test_find_available_port_custom_start(self, proxy_manager):
-        """Test finding available port with custom start port"""
-        port = proxy_manager._find_available_port(start_port=9000)
-        assert port >= 9000
-        assert proxy_manager._check_port_available(port) is True
+    @pytest.mark.parametrize("connect_result, bind_side_effect, expected", [
+        (111, None, True),                      # nothing listening, bind succeeds
+        (0, None, False),                       # something accepted the connection
+        (111, OSError(98, "in use"), False),    # bind refused
+    ])
+    def test_check_port_available(self, proxy_manager, connect_result, bind_side_effect, expected):
+        """Test port availability from mocked connect and bind results"""
+        with patch('backend.services.proxy.socket.socket') as mock_socket:
+            sock = mock_socket.return_value.__enter__.return_value
+            sock.connect_ex.return_value = connect_result
+            sock.bind.side_effect = bind_side_effect
+
+            assert proxy_manager._check_port_available(65432) is expected
+
+    @pytest.mark.parametrize("start_port", [8888, 9000])
+    def test_find_available_port_skips_occupied(self, proxy_manager, start_port):
+        """Test the port scan advances past ports that fail to bind"""
+        with patch('backend.services.proxy.socket.socket') as mock_socket:
+            sock = mock_socket.return_value.__enter__.return_value
+            sock.connect_ex.return_value = 111
+            sock.bind.side_effect = [OSError(98, "in use"), OSError(98, "in use"), None]
+
+            assert proxy_manager._find_available_port(start_port=start_port) == start_port + 2
+
+    def test_find_available_port_exhausted(self, proxy_manager):
+        """Test the port scan gives up after max_attempts occupied ports"""
+        with patch('backend.services.proxy.socket.socket') as mock_socket:
+            mock_socket.return_value.__enter__.return_value.connect_ex.return_value = 0
+
+            with pytest.raises(RuntimeError, match="after 3 attempts"):
+                proxy_manager._find_available_port(max_attempts=3)
 
     def test_get_status_default(self, proxy_manager):
         """Test getting status with default values"""
@@ -94,6 +110,23 @@ class TestProxyManager:
         assert status["port"] == 8888  # Changed from "proxy_port" to "port"
         assert status["is_running"] is False
 
+    async def test_handle_messages_broadcasts_batch(self, proxy_manager, mock_connection_manager):
+        """Test each forwarded batch message is broadcast once, in order"""
+        proxy_manager.flow_queue = SimpleQueue()
+        proxy_manager.flow_queue.put(b'flow-1')
+        proxy_manager.flow_queue.put(b'flow-2')
+        proxy_manager.is_running = True
+
+        async def broadcast(message):
+            if message == b'flow-2':
+                proxy_manager.is_running = False
+
+        mock_connection_manager.broadcast.side_effect = broadcast
+
+        await proxy_manager._handle_messages()
+
+        assert [c.args[0] for c in mock_connection_manager.broadcast.call_args_list] == [b'flow-1', b'flow-2']
+
     def test_sync_filter_add(self, proxy_manager, mock_filter):
         """Test syncing filter with ADD operation when proxy is not running"""
         result = proxy_manager.sync_filter(mock_filter, OperationType.ADD)
@@ -140,17 +173,17 @@ class TestProxyManager:
         
         assert result is False
 
-    @patch('backend.proxy.Process')
-    @patch('backend.proxy.MessageFactory')
-    def test_sync_filter_when_running(self, mock_message_factory, mock_process, proxy_manager, mock_filter):
+    @patch('backend.services.proxy.Process')
+    @patch('backend.services.proxy.serialize_sync_message')
+    def test_sync_filter_when_running(self, mock_serialize, mock_process, proxy_manager, mock_filter):
         """Test syncing filter when proxy process is running"""
         # Mock the process to appear running
         mock_process_instance = Mock()
         mock_process_instance.is_alive.return_value = True
         mock_process.return_value = mock_process_instance
         
-        # Mock the message factory
-        mock_message_factory.create_sync_message.return_value = b'mocked_message'
+        # Mock the serializer
+        mock_serialize.return_value = b'mocked_message'
         
         # Set up proxy manager to appear running with proper queue initialization
         proxy_manager.proxy_process = mock_process_instance
@@ -160,69 +193,41 @@ class TestProxyManager:
         proxy_manager.flow_queue = SimpleQueue()
         
         # Mock the PySyncMessage creation to avoid validation errors
-        with patch('backend.proxy.PySyncMessage') as mock_sync_message:
+        with patch('backend.services.proxy.PySyncMessage') as mock_sync_message:
             mock_sync_message.return_value = Mock()
             
             result = proxy_manager.sync_filter(mock_filter, OperationType.ADD)
             
             # Should return True when proxy is running
             assert result is True
-            # Verify message was sent to rule queue
-            assert not proxy_manager.rule_queue.empty()
-            # Verify message factory was called
-            mock_message_factory.create_sync_message.assert_called_once()
+            # Verify the serialized message was sent to rule queue
+            assert proxy_manager.rule_queue.get() == b'mocked_message'
+            # Verify the serializer was called
+            mock_serialize.assert_called_once()
 
 
 class TestRunMitmproxyProcess:
     """Test the run_mitmproxy_process function"""
     
-    @patch('backend.proxy.asyncio.run')
-    def test_run_mitmproxy_process_setup(self, mock_asyncio_run):
-        """Test mitmproxy process setup"""
-        # Mock dependencies
-        mock_flow_queue = Mock(spec=SimpleQueue)
-        mock_rule_queue = Mock(spec=SimpleQueue)
-        mock_stop_event = Mock()
-        mock_stop_event.is_set.return_value = False
-        
-        # Mock asyncio.run to prevent actual execution
-        mock_asyncio_run.side_effect = KeyboardInterrupt("Test interrupt")
-        
-        # This should complete without raising an exception (other than the mocked KeyboardInterrupt)
-        try:
-            run_mitmproxy_process(8888, mock_flow_queue, mock_rule_queue, mock_stop_event)
-        except KeyboardInterrupt:
-            pass  # Expected when mocking
-        
-        # Verify asyncio.run was called with some coroutine
-        mock_asyncio_run.assert_called_once()
-        # Verify the coroutine that was passed is callable
-        called_args = mock_asyncio_run.call_args[0]
-        assert len(called_args) == 1  # Should have one argument (the coroutine)
-
-    @patch('backend.proxy.asyncio.run')
-    def test_run_mitmproxy_process_port_config(self, mock_asyncio_run):
-        """Test mitmproxy process with custom port configuration"""
-        # Mock dependencies
-        mock_flow_queue = Mock(spec=SimpleQueue)
-        mock_rule_queue = Mock(spec=SimpleQueue)
-        mock_stop_event = Mock()
+    @pytest.mark.serial
+    @pytest.mark.parametrize("port", [8888, 9090])
+    @patch('backend.services.proxy.asyncio.run')
+    def test_run_mitmproxy_process(self, mock_asyncio_run, port):
+        """Test mitmproxy process setup hands one coroutine to asyncio.run"""
+        mock_stop_event = MagicMock()
         mock_stop_event.is_set.return_value = False
 
-        # Test with custom port
-        custom_port = 9090
-
         # Mock asyncio.run to prevent actual execution
         mock_asyncio_run.side_effect = KeyboardInterrupt("Test interrupt")
 
         # This should complete without raising an exception (other than the mocked KeyboardInterrupt)
         try:
-            run_mitmproxy_process(custom_port, mock_flow_queue, mock_rule_queue, mock_stop_event)
+            run_mitmproxy_process(port, MagicMock(), MagicMock(), mock_stop_event)
         except KeyboardInterrupt:
             pass  # Expected when mocking
 
-        # Verify asyncio.run was called with some coroutine
+        # Verify asyncio.run was called with a single coroutine
         mock_asyncio_run.assert_called_once()
-        # Verify the coroutine that was passed is callable
         called_args = mock_asyncio_run.call_args[0]
-        assert len(called_args) == 1  # Should have one argument (the coroutine)
\ No newline at end of file
+        assert len(called_args) == 1
+        called_args[0].close()
@@ -4,9 +4,10 @@ import os
 import sqlite3
 from unittest.mock import Mock
 import threading
+from mitmproxy import http
 
 from backend.services.storage import DatabaseManager, CacheStore
-from backend.models.base_models import FilterModel, RuleModel, OperationType
+from backend.models.base_models import FilterModel, RuleModel, CompiledRule, Operator, RuleAction, OperationType
 from backend.models.flat_utils import serialize_sync_message
 from backend.models.base_models import SyncMessage
 
@@ -17,10 +18,11 @@ def temp_db():
     fd, path = tempfile.mkstemp(suffix='.db')
     os.close(fd)
     yield path
-    # Force close any open connections and cleanup
+    # Connections are closed explicitly by db_manager, so the files can go straight away
     try:
-        import gc
-        gc.collect()  # Force garbage collection to close connections
+        for leftover in (path + '-wal', path + '-shm'):  # WAL-mode side files
+            if os.path.exists(leftover):
+                os.unlink(leftover)
         if os.path.exists(path):
             os.unlink(path)
     except PermissionError:
@@ -43,11 +45,9 @@ def db_manager(temp_db):
     DatabaseManager._instance = None
     manager = DatabaseManager(temp_db)
     yield manager
-    # Clean up singleton and force close connections
+    # Clean up singleton and close its connection
+    manager.close()
     DatabaseManager._instance = None
-    # Force garbage collection to ensure connections are closed
-    import gc
-    gc.collect()
 
 
 @pytest.fixture
@@ -74,6 +74,30 @@ def sample_filter():
     return filter_model
 
 
+def make_mock_filter(filter_id, filter_name="Test Filter"):
+    """Create a FilterModel mock carrying every field CacheStore indexes."""
+    filter_model = Mock(spec=FilterModel)
+    filter_model.id = filter_id
+    filter_model.filter_name = filter_name
+    filter_model.field = "url"
+    filter_model.operator = Operator.EQUALS
+    filter_model.value = "test-pattern"
+    return filter_model
+
+
+def make_mock_rule(rule_id, enabled=True, rule_name="Test Rule"):
+    """Create a RuleModel mock carrying every field CacheStore compiles."""
+    rule_model = Mock(spec=RuleModel)
+    rule_model.id = rule_id
+    rule_model.rule_name = rule_name
+    rule_model.enabled = enabled
+    rule_model.filter_id = 1
+    rule_model.action = Mock()
+    rule_model.target_key = "response"
+    rule_model.target_value = "modified"
+    return rule_model
+
+
 @pytest.fixture
 def sample_rule():
     """Create a sample RuleModel for testing."""
@@ -89,6 +113,16 @@ def sample_rule():
     return rule_model
 
 
+def _url_flow(url):
+    """Create a mock GET flow for url with no headers or body."""
+    flow = Mock()
+    flow.request.pretty_url = url
+    flow.request.method = "GET"
+    flow.request.headers = http.Headers([])
+    flow.request.content = b""
+    return flow
+
+
 class TestDatabaseManager:
     """Test cases for DatabaseManager."""
 
@@ -98,6 +132,27 @@ class TestDatabaseManager:
         manager1 = DatabaseManager(temp_db)
         manager2 = DatabaseManager(temp_db)
         assert manager1 is manager2
+        manager1.close()
+        DatabaseManager._instance = None
+
+    def test_path_with_uri_characters(self, tmp_path, sample_filter):
+        """Test read-only connections open the same file when the path has '?', '#' or '%'."""
+        DatabaseManager._instance = None
+        manager = DatabaseManager(str(tmp_path / "odd?name#50%.db"))
+        try:
+            manager.create_filter(sample_filter)
+            assert [f.filter_name for f in manager.get_filters()] == [sample_filter.filter_name]
+        finally:
+            manager.close()
+            DatabaseManager._instance = None
+
+    def test_close_with_reader_checked_out(self, db_manager):
+        """Test close() does not wait for a read connection that is still borrowed."""
+        with db_manager._with_read():
+            closer = threading.Thread(target=db_manager.close)
+            closer.start()
+            closer.join(timeout=5)
+            assert not closer.is_alive()
 
     def test_database_initialization(self, db_manager, temp_db):
         """Test database file creation and table initialization."""
@@ -117,6 +172,14 @@ class TestDatabaseManager:
         
         conn.close()
 
+    def test_connection_pragmas(self, db_manager):
+        """Test connections run in WAL mode with foreign keys enforced."""
+        conn = db_manager._write_conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
     def test_create_filter(self, db_manager, sample_filter):
         """Test creating a filter in the database."""
         result = db_manager.create_filter(sample_filter)
@@ -191,6 +254,26 @@ class TestDatabaseManager:
         assert retrieved_rule is not None
         assert retrieved_rule.id == created_rule.id
 
+    def test_rows_rebuild_typed_models(self, db_manager):
+        """Test that rows read back as fully typed models without re-validation."""
+        created_filter = db_manager.create_filter(
+            FilterModel(filter_name="api", field="url", operator=Operator.REGEX, value=r"/api/\d+")
+        )
+        created_rule = db_manager.create_rule(RuleModel(
+            rule_name="block", filter_id=created_filter.id, action=RuleAction.BLOCK_REQUEST,
+            target_key="status", target_value="403", enabled=False,
+        ))
+
+        retrieved_filter = db_manager.get_filter_by_id(created_filter.id)
+        assert retrieved_filter == created_filter
+        assert retrieved_filter.operator is Operator.REGEX
+        assert retrieved_filter.compiled_pattern.pattern == r"/api/\d+"
+
+        retrieved_rule = db_manager.get_rule_by_id(created_rule.id)
+        assert retrieved_rule == created_rule
+        assert retrieved_rule.action is RuleAction.BLOCK_REQUEST
+        assert retrieved_rule.enabled is False
+
     def test_get_rules(self, db_manager, sample_filter, sample_rule):
         """Test retrieving all rules from the database."""
         # First create a filter
@@ -240,6 +323,25 @@ class TestDatabaseManager:
         deleted_rule = db_manager.get_rule_by_id(rule_id)
         assert deleted_rule is None
 
+    def test_read_pool_is_read_only(self, db_manager, sample_filter):
+        """Test pooled readers see committed writes but cannot write themselves."""
+        created_filter = db_manager.create_filter(sample_filter)
+
+        with db_manager._with_read() as conn:
+            assert conn.execute("SELECT filter_name FROM filters WHERE id = ?", (created_filter.id,)).fetchone()[0] == sample_filter.filter_name
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                conn.execute("DELETE FROM filters")
+
+    def test_shared_connection_across_threads(self, db_manager, sample_filter):
+        """Test API threads can share the manager's long-lived connection."""
+        results = []
+        worker = threading.Thread(target=lambda: results.append(db_manager.create_filter(sample_filter)))
+        worker.start()
+        worker.join()
+
+        assert results and results[0].id is not None
+        assert db_manager.get_filter_by_id(results[0].id).filter_name == sample_filter.filter_name
+
     def test_get_rules_by_filter(self, db_manager, sample_filter, sample_rule):
         """Test retrieving rules by filter ID."""
         # First create a filter
@@ -309,7 +411,9 @@ class TestCacheStore:
         cache_store.add_single_rule(sample_rule)
         rules = cache_store.get_active_rules()
         assert len(rules) == 1
-        assert rules[0] == sample_rule
+        assert isinstance(rules[0], CompiledRule)
+        assert rules[0].id == sample_rule.id
+        assert rules[0].rule_name == sample_rule.rule_name
 
     def test_get_rule_by_id(self, cache_store, sample_rule):
         """Test retrieving a specific rule from cache."""
@@ -340,33 +444,136 @@ class TestCacheStore:
     def test_get_active_rules_only(self, cache_store):
         """Test that get_active_rules only returns enabled rules."""
         # Add enabled rule
-        enabled_rule = Mock(spec=RuleModel)
-        enabled_rule.id = 1
-        enabled_rule.enabled = True
+        enabled_rule = make_mock_rule(1, enabled=True)
         cache_store.add_single_rule(enabled_rule)
         
         # Add disabled rule
-        disabled_rule = Mock(spec=RuleModel)
-        disabled_rule.id = 2
-        disabled_rule.enabled = False
+        disabled_rule = make_mock_rule(2, enabled=False)
         cache_store.add_single_rule(disabled_rule)
         
         active_rules = cache_store.get_active_rules()
         assert len(active_rules) == 1
         assert active_rules[0].id == 1
 
+    def test_match_rule(self, cache_store):
+        """Test that match_rule returns the first enabled rule whose filter matches the flow."""
+        cache_store.update_filters([
+            FilterModel(id=1, filter_name="api", field="url", operator=Operator.CONTAINS, value="/api/"),
+            FilterModel(id=2, filter_name="post", field="method", operator=Operator.EQUALS, value="POST"),
+        ])
+        cache_store.update_rules([
+            RuleModel(id=1, rule_name="post", filter_id=2, action=RuleAction.ADD_HEADER,
+                      target_key="X-Post", target_value="1"),
+            RuleModel(id=2, rule_name="api", filter_id=1, action=RuleAction.ADD_HEADER,
+                      target_key="X-Api", target_value="1"),
+        ])
+        flow = Mock()
+        flow.request.pretty_url = "https://example.com/api/users"
+        flow.request.method = "GET"
+        flow.request.headers = http.Headers([])
+
+        assert cache_store.match_rule(flow).id == 2
+
+        # Removing the filter makes its rule stop matching without recompiling rules
+        cache_store.delete_filters([1])
+        assert cache_store.match_rule(flow) is None
+
+    def test_filter_index_is_swapped_whole(self, cache_store):
+        """Test that a filter update replaces the index without touching the one readers hold."""
+        cache_store.update_filters([
+            FilterModel(id=1, filter_name="api", field="url", operator=Operator.CONTAINS, value="/api/"),
+        ])
+        old_index = cache_store._filter_index
+
+        cache_store.update_filters([
+            FilterModel(id=2, filter_name="v2", field="url", operator=Operator.CONTAINS, value="/v2/"),
+        ])
+
+        assert set(old_index.filters) == {1}
+        assert set(cache_store._filter_index.filters) == {1, 2}
+        assert cache_store.match_all(_url_flow("https://example.com/api/v2/")) == {1, 2}
+
+    def test_match_all_skips_absent_header_buckets(self, cache_store):
+        """Test that filters on headers the request lacks are never evaluated."""
+        auth = make_mock_filter(1, "auth")
+        auth.field = "header:Authorization"
+        auth.matcher = Mock(return_value=True)
+        cookie = make_mock_filter(2, "cookie")
+        cookie.field = "header:Cookie"
+        cookie.matcher = Mock(return_value=True)
+        cache_store.update_filters([auth, cookie])
+        flow = Mock()
+        flow.request.pretty_url = "https://example.com/"
+        flow.request.headers = http.Headers([(b"authorization", b"x"), (b"Host", b"example.com")])
+
+        assert cache_store.match_all(flow) == {1}
+        cookie.matcher.assert_not_called()
+
+    def test_match_url_filters(self, cache_store):
+        """Test that CONTAINS / STARTS_WITH url filters are matched in one pass."""
+        cache_store.update_filters([
+            FilterModel(id=1, filter_name="api", field="url", operator=Operator.CONTAINS, value="/api/"),
+            FilterModel(id=2, filter_name="https", field="url", operator=Operator.STARTS_WITH, value="https://"),
+            FilterModel(id=3, filter_name="v1", field="url", operator=Operator.STARTS_WITH, value="/api/"),
+            FilterModel(id=4, filter_name="exact", field="url", operator=Operator.EQUALS, value="https://a/api/"),
+        ])
+
+        url = "https://example.com/api/users"
+        expected = {f.id for f in cache_store.get_active_filters() if f.operator.apply(f.value, url)}
+        assert cache_store.match_all(_url_flow(url)) == expected == {1, 2}
+        assert cache_store.match_all(_url_flow("/api/users")) == {1, 3}
+
+        cache_store.clear_cache()
+        assert cache_store.match_all(_url_flow(url)) == set()
+
+    def test_url_automaton_reused_for_other_filter_writes(self, cache_store):
+        """Test that the url automaton is rebuilt only when the url filters it covers change."""
+        cache_store.update_filters([
+            FilterModel(id=1, filter_name="api", field="url", operator=Operator.CONTAINS, value="/api/"),
+        ])
+        automaton = cache_store._filter_index.url_automaton
+
+        cache_store.update_filters([
+            FilterModel(id=2, filter_name="post", field="method", operator=Operator.EQUALS, value="POST"),
+        ])
+        assert cache_store._filter_index.url_automaton is automaton
+
+        cache_store.update_filters([
+            FilterModel(id=3, filter_name="v2", field="url", operator=Operator.STARTS_WITH, value="https://"),
+        ])
+        assert cache_store._filter_index.url_automaton is not automaton
+
+    def test_match_all_agrees_with_evaluate(self, cache_store):
+        """Test that match_all returns exactly the filters whose evaluate() is true."""
+        cache_store.update_filters([
+            FilterModel(id=1, filter_name="api", field="url", operator=Operator.CONTAINS, value="/api/"),
+            FilterModel(id=2, filter_name="https", field="url", operator=Operator.STARTS_WITH, value="https://"),
+            FilterModel(id=3, filter_name="json", field="url", operator=Operator.ENDS_WITH, value=".json"),
+            FilterModel(id=4, filter_name="num", field="url", operator=Operator.REGEX, value=r"/\d+"),
+            FilterModel(id=5, filter_name="post", field="method", operator=Operator.EQUALS, value="POST"),
+            FilterModel(id=6, filter_name="auth", field="header:Authorization", operator=Operator.STARTS_WITH, value="Bearer"),
+            FilterModel(id=7, filter_name="cookie", field="header:Cookie", operator=Operator.CONTAINS, value="x"),
+            FilterModel(id=8, filter_name="body", field="body", operator=Operator.CONTAINS, value="token"),
+        ])
+        flow = Mock()
+        flow.request.pretty_url = "https://example.com/api/users/42"
+        flow.request.method = "POST"
+        flow.request.headers = http.Headers([(b"Authorization", b"Bearer abc")])
+        flow.request.content = b'{"token": 1}'
+
+        expected = {f.id for f in cache_store.get_active_filters() if f.evaluate(flow)}
+        assert cache_store.match_all(flow) == expected == {1, 2, 4, 5, 6, 8}
+
     def test_thread_safety(self, cache_store):
         """Test thread safety of cache operations."""
-        def add_filters():
+        def add_filters(thread_index):
             for i in range(10):
-                filter_copy = Mock(spec=FilterModel)
-                filter_copy.id = i + threading.current_thread().ident  # Unique IDs
-                filter_copy.filter_name = f"Filter {i}"
+                filter_copy = make_mock_filter(thread_index * 10 + i, f"Filter {i}")  # Unique IDs
                 cache_store.add_single_filter(filter_copy)
         
         threads = []
-        for _ in range(5):
-            thread = threading.Thread(target=add_filters)
+        for thread_index in range(5):
+            thread = threading.Thread(target=add_filters, args=(thread_index,))
             threads.append(thread)
             thread.start()
         
@@ -383,9 +590,7 @@ class TestCacheStore:
         cache_store.add_single_filter(sample_filter)
         
         # Create new filter
-        new_filter = Mock(spec=FilterModel)
-        new_filter.id = 2
-        new_filter.filter_name = "New Filter"
+        new_filter = make_mock_filter(2, "New Filter")
         
         # Update with clear_all=True should replace all filters
         cache_store.update_filters([new_filter], clear_all=True)
@@ -400,10 +605,7 @@ class TestCacheStore:
         cache_store.add_single_rule(sample_rule)
         
         # Create new rule
-        new_rule = Mock(spec=RuleModel)
-        new_rule.id = 2
-        new_rule.rule_name = "New Rule"
-        new_rule.enabled = True
+        new_rule = make_mock_rule(2, rule_name="New Rule")
         
         # Update with clear_all=True should replace all rules
         cache_store.update_rules([new_rule], clear_all=True)
@@ -419,9 +621,7 @@ class TestCacheStore:
         cache_store.add_single_rule(sample_rule)
         
         # Add disabled rule
-        disabled_rule = Mock(spec=RuleModel)
-        disabled_rule.id = 2
-        disabled_rule.enabled = False
+        disabled_rule = make_mock_rule(2, enabled=False)
         cache_store.add_single_rule(disabled_rule)
         
         stats = cache_store.get_cache_stats()
@@ -34,7 +34,7 @@ class TestWebSocketManager:
     
     def test_ws_manager_init(self, ws_manager):
         """Test WebSocketManager initialization"""
-        assert ws_manager.active_connections == []
+        assert ws_manager.active_connections == set()
         assert hasattr(ws_manager, 'logger')
         assert ws_manager._initialized is True
 
@@ -53,7 +53,7 @@ class TestWebSocketManager:
         ws_manager.active_connections.clear()
         
         # Add connection first
-        ws_manager.active_connections.append(mock_websocket)
+        ws_manager.active_connections.add(mock_websocket)
         assert mock_websocket in ws_manager.active_connections
         
         # Disconnect
@@ -81,7 +81,7 @@ class TestWebSocketManager:
         mock_ws2 = AsyncMock()
         mock_ws3 = AsyncMock()
         
-        ws_manager.active_connections = [mock_ws1, mock_ws2, mock_ws3]
+        ws_manager.active_connections = {mock_ws1, mock_ws2, mock_ws3}
         
         test_message = b"test broadcast message"
         
@@ -92,6 +92,28 @@ class TestWebSocketManager:
         mock_ws2.send_bytes.assert_called_once_with(test_message)
         mock_ws3.send_bytes.assert_called_once_with(test_message)
 
+    @pytest.mark.asyncio
+    async def test_broadcast_sends_concurrently(self, ws_manager):
+        """Test a slow connection does not hold back sends to the others"""
+        ws_manager.active_connections.clear()
+        started = []
+        all_started = asyncio.Event()
+
+        async def send_bytes(message):
+            # Each send blocks until every send has started, so serial sends never finish
+            started.append(message)
+            if len(started) == 2:
+                all_started.set()
+            await all_started.wait()
+
+        ws1, ws2 = AsyncMock(), AsyncMock()
+        ws1.send_bytes.side_effect = send_bytes
+        ws2.send_bytes.side_effect = send_bytes
+        ws_manager.active_connections = {ws1, ws2}
+
+        await asyncio.wait_for(ws_manager.broadcast(b"concurrent"), timeout=1)
+        assert ws_manager.active_connections == {ws1, ws2}
+
     @pytest.mark.asyncio
     async def test_broadcast_message_no_connections(self, ws_manager):
         """Test broadcasting when no connections exist"""
@@ -112,7 +134,7 @@ class TestWebSocketManager:
         # Make one connection fail
         mock_ws1.send_bytes.side_effect = ConnectionError("Connection lost")
         
-        ws_manager.active_connections = [mock_ws1, mock_ws2]
+        ws_manager.active_connections = {mock_ws1, mock_ws2}
         
         test_message = b"error test message"
         
@@ -130,9 +152,9 @@ class TestWebSocketManager:
         """Test pong response to websocket"""
         await ws_manager.pong(mock_websocket)
         
-        # Verify pong response was sent
-        expected_pong = json.dumps({'type': 'pong'})
-        mock_websocket.send_json.assert_called_once_with(expected_pong)
+        # Verify pong response was sent as a single JSON text frame
+        mock_websocket.send_text.assert_called_once()
+        assert json.loads(mock_websocket.send_text.call_args[0][0]) == {'type': 'pong'}
 
     def test_singleton_pattern(self):
         """Test that ConnectionManager follows singleton pattern"""
@@ -158,8 +180,8 @@ class TestWebSocketManager:
         # Add some mock connections
         mock_ws1 = Mock()
         mock_ws2 = Mock()
-        ws_manager.active_connections.append(mock_ws1)
-        ws_manager.active_connections.append(mock_ws2)
+        ws_manager.active_connections.add(mock_ws1)
+        ws_manager.active_connections.add(mock_ws2)
         
         assert len(ws_manager.active_connections) == 2
 
@@ -173,7 +195,7 @@ class TestWebSocketManager:
         for i in range(5):
             mock_ws = AsyncMock()
             connections.append(mock_ws)
-            ws_manager.active_connections.append(mock_ws)
+            ws_manager.active_connections.add(mock_ws)
         
         assert len(ws_manager.active_connections) == 5
         
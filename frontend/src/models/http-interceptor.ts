@@ -3,6 +3,7 @@
 /* eslint-disable @typescript-eslint/no-unused-vars, @typescript-eslint/no-explicit-any, @typescript-eslint/no-non-null-assertion */
 
 export { FlowData, FlowDataT } from './http-interceptor/flow-data.js';
+export { FlowDataBatch, FlowDataBatchT } from './http-interceptor/flow-data-batch.js';
 export { HeaderPair, HeaderPairT } from './http-interceptor/header-pair.js';
 export { ServerEvent, ServerEventT } from './http-interceptor/server-event.js';
 export { WebSocketMessage, WebSocketMessageT } from './http-interceptor/web-socket-message.js';
@@ -0,0 +1,94 @@
+// automatically generated by the FlatBuffers compiler, do not modify
+
+/* eslint-disable @typescript-eslint/no-unused-vars, @typescript-eslint/no-explicit-any, @typescript-eslint/no-non-null-assertion */
+
+import * as flatbuffers from 'flatbuffers';
+
+import { FlowData, FlowDataT } from '../http-interceptor/flow-data.js';
+
+
+export class FlowDataBatch implements flatbuffers.IUnpackableObject<FlowDataBatchT> {
+  bb: flatbuffers.ByteBuffer|null = null;
+  bb_pos = 0;
+  __init(i:number, bb:flatbuffers.ByteBuffer):FlowDataBatch {
+  this.bb_pos = i;
+  this.bb = bb;
+  return this;
+}
+
+static getRootAsFlowDataBatch(bb:flatbuffers.ByteBuffer, obj?:FlowDataBatch):FlowDataBatch {
+  return (obj || new FlowDataBatch()).__init(bb.readInt32(bb.position()) + bb.position(), bb);
+}
+
+static getSizePrefixedRootAsFlowDataBatch(bb:flatbuffers.ByteBuffer, obj?:FlowDataBatch):FlowDataBatch {
+  bb.setPosition(bb.position() + flatbuffers.SIZE_PREFIX_LENGTH);
+  return (obj || new FlowDataBatch()).__init(bb.readInt32(bb.position()) + bb.position(), bb);
+}
+
+items(index: number, obj?:FlowData):FlowData|null {
+  const offset = this.bb!.__offset(this.bb_pos, 4);
+  return offset ? (obj || new FlowData()).__init(this.bb!.__indirect(this.bb!.__vector(this.bb_pos + offset) + index * 4), this.bb!) : null;
+}
+
+itemsLength():number {
+  const offset = this.bb!.__offset(this.bb_pos, 4);
+  return offset ? this.bb!.__vector_len(this.bb_pos + offset) : 0;
+}
+
+static startFlowDataBatch(builder:flatbuffers.Builder) {
+  builder.startObject(1);
+}
+
+static addItems(builder:flatbuffers.Builder, itemsOffset:flatbuffers.Offset) {
+  builder.addFieldOffset(0, itemsOffset, 0);
+}
+
+static createItemsVector(builder:flatbuffers.Builder, data:flatbuffers.Offset[]):flatbuffers.Offset {
+  builder.startVector(4, data.length, 4);
+  for (let i = data.length - 1; i >= 0; i--) {
+    builder.addOffset(data[i]!);
+  }
+  return builder.endVector();
+}
+
+static startItemsVector(builder:flatbuffers.Builder, numElems:number) {
+  builder.startVector(4, numElems, 4);
+}
+
+static endFlowDataBatch(builder:flatbuffers.Builder):flatbuffers.Offset {
+  const offset = builder.endObject();
+  return offset;
+}
+
+static createFlowDataBatch(builder:flatbuffers.Builder, itemsOffset:flatbuffers.Offset):flatbuffers.Offset {
+  FlowDataBatch.startFlowDataBatch(builder);
+  FlowDataBatch.addItems(builder, itemsOffset);
+  return FlowDataBatch.endFlowDataBatch(builder);
+}
+
+unpack(): FlowDataBatchT {
+  return new FlowDataBatchT(
+    this.bb!.createObjList<FlowData, FlowDataT>(this.items.bind(this), this.itemsLength())
+  );
+}
+
+
+unpackTo(_o: FlowDataBatchT): void {
+  _o.items = this.bb!.createObjList<FlowData, FlowDataT>(this.items.bind(this), this.itemsLength());
+}
+}
+
+export class FlowDataBatchT implements flatbuffers.IGeneratedObject {
+constructor(
+  public items: (FlowDataT)[] = []
+){}
+
+
+pack(builder:flatbuffers.Builder): flatbuffers.Offset {
+  const items = FlowDataBatch.createItemsVector(builder, builder.createObjectOffsetList(this.items));
+
+  return FlowDataBatch.createFlowDataBatch(builder,
+    items
+  );
+}
+}
@@ -3,36 +3,40 @@
 /* eslint-disable @typescript-eslint/no-unused-vars, @typescript-eslint/no-explicit-any, @typescript-eslint/no-non-null-assertion */
 
 import { FlowData, FlowDataT } from '../http-interceptor/flow-data.js';
+import { FlowDataBatch, FlowDataBatchT } from '../http-interceptor/flow-data-batch.js';
 import { ServerEvent, ServerEventT } from '../http-interceptor/server-event.js';
 
 
 export enum WebSocketMessageType {
   NONE = 0,
   ServerEvent = 1,
-  FlowData = 2
+  FlowData = 2,
+  FlowDataBatch = 3
 }
 
 export function unionToWebSocketMessageType(
   type: WebSocketMessageType,
-  accessor: (obj:FlowData|ServerEvent) => FlowData|ServerEvent|null
-): FlowData|ServerEvent|null {
+  accessor: (obj:FlowData|FlowDataBatch|ServerEvent) => FlowData|FlowDataBatch|ServerEvent|null
+): FlowData|FlowDataBatch|ServerEvent|null {
   switch(WebSocketMessageType[type]) {
     case 'NONE': return null; 
     case 'ServerEvent': return accessor(new ServerEvent())! as ServerEvent;
     case 'FlowData': return accessor(new FlowData())! as FlowData;
+    case 'FlowDataBatch': return accessor(new FlowDataBatch())! as FlowDataBatch;
     default: return null;
   }
 }
 
 export function unionListToWebSocketMessageType(
   type: WebSocketMessageType, 
-  accessor: (index: number, obj:FlowData|ServerEvent) => FlowData|ServerEvent|null, 
+  accessor: (index: number, obj:FlowData|FlowDataBatch|ServerEvent) => FlowData|FlowDataBatch|ServerEvent|null, 
   index: number
-): FlowData|ServerEvent|null {
+): FlowData|FlowDataBatch|ServerEvent|null {
   switch(WebSocketMessageType[type]) {
     case 'NONE': return null; 
     case 'ServerEvent': return accessor(index, new ServerEvent())! as ServerEvent;
     case 'FlowData': return accessor(index, new FlowData())! as FlowData;
+    case 'FlowDataBatch': return accessor(index, new FlowDataBatch())! as FlowDataBatch;
     default: return null;
   }
 }
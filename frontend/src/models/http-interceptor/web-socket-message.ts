@@ -5,6 +5,7 @@
 import * as flatbuffers from 'flatbuffers';
 
 import { FlowData, FlowDataT } from '../http-interceptor/flow-data.js';
+import { FlowDataBatch, FlowDataBatchT } from '../http-interceptor/flow-data-batch.js';
 import { ServerEvent, ServerEventT } from '../http-interceptor/server-event.js';
 import { WebSocketMessageType, unionToWebSocketMessageType, unionListToWebSocketMessageType } from '../http-interceptor/web-socket-message-type.js';
 
@@ -111,7 +112,7 @@ export class WebSocketMessageT implements flatbuffers.IGeneratedObject {
 constructor(
   public type: string|Uint8Array|null = null,
   public dataType: WebSocketMessageType = WebSocketMessageType.NONE,
-  public data: FlowDataT|ServerEventT|null = null
+  public data: FlowDataBatchT|FlowDataT|ServerEventT|null = null
 ){}
 
 
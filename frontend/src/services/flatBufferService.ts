@@ -5,66 +5,82 @@ import { HttpInterceptor } from '../models/events';
 class FlatBufferService {
     /**
      * Deserialize incoming HTTP flow data from WebSocket (FlatBuffers)
-     * This is the ONLY use case for FlatBuffers - high-frequency flow data
+     * This is the ONLY use case for FlatBuffers - high-frequency flow data.
+     * A message carries either one FlowData or a FlowDataBatch of several.
      */
-    parseFlowMessage(binaryData: Uint8Array): HttpFlow | null {
+    parseFlowMessages(binaryData: Uint8Array): HttpFlow[] {
         try {
-            console.log("I am here")
             const buf = new ByteBuffer(binaryData);
-            const message = HttpInterceptor.WebSocketMessage.getRootAsWebSocketMessage(buf);;
+            const message = HttpInterceptor.WebSocketMessage.getRootAsWebSocketMessage(buf);
             const messageType = message.dataType();
 
-            if (messageType !== HttpInterceptor.WebSocketMessageType.FlowData) {
-                console.warn('Expected FLOW message, got:', messageType);
-                return null;
+            if (messageType === HttpInterceptor.WebSocketMessageType.FlowData) {
+                const flowData = message.data(new HttpInterceptor.FlowData());
+                return flowData ? [this.toHttpFlow(flowData)] : [];
             }
 
-            const flowData = message.data(new HttpInterceptor.FlowData());
-            if (!flowData) return null;
+            if (messageType === HttpInterceptor.WebSocketMessageType.FlowDataBatch) {
+                const batch = message.data(new HttpInterceptor.FlowDataBatch());
+                if (!batch) return [];
 
-            // Extract headers
-            const requestHeaders: Record<string, string>[] = [];
-            for (let i = 0; i < flowData.requestHeadersLength(); i++) {
-                const header = flowData.requestHeaders(i);
-                const name = header?.key();
-                const value = header?.value();
-                if (name && value) {
-                    requestHeaders.push({ name, value });
-                }
-            }
-
-            const responseHeaders: Record<string, string>[] = [];
-            for (let i = 0; i < flowData.responseHeadersLength(); i++) {
-                const header = flowData.responseHeaders(i);
-                const name = header?.key();
-                const value = header?.value();
-                if (name && value) {
-                    responseHeaders.push({ name, value });
+                const flows: HttpFlow[] = [];
+                const flowData = new HttpInterceptor.FlowData();
+                for (let i = 0; i < batch.itemsLength(); i++) {
+                    if (batch.items(i, flowData)) {
+                        flows.push(this.toHttpFlow(flowData));
+                    }
                 }
+                return flows;
             }
 
-            const requestSize = flowData.requestSize() || 0;
-            const responseSize = flowData.responseSize() || 0;
-
-            return {
-                id: flowData.id() ?? '',
-                method: flowData.method() ?? '',
-                url: flowData.url() ?? '',
-                status: flowData.status(),
-                duration: this.getDuration(flowData.startTimestamp(), flowData.endTimestamp()),
-                requestSize: this.formatBytes(requestSize),
-                responseSize: this.formatBytes(responseSize),
-                requestHeaders,
-                responseHeaders,
-                requestBody: flowData.requestBody() ?? '',
-                responseBody: flowData.responseBody() ?? '',
-                cookies: this.getCookies(responseHeaders),
-                isIntercepted: flowData.isIntercepted() ?? false
-            };
+            console.warn('Expected FLOW message, got:', messageType);
+            return [];
         } catch (error) {
             console.error('Failed to parse FlatBuffer flow message:', error);
-            return null;
+            return [];
+        }
+    }
+
+    private toHttpFlow(flowData: HttpInterceptor.FlowData): HttpFlow {
+        // Extract headers
+        const requestHeaders: Record<string, string>[] = [];
+        for (let i = 0; i < flowData.requestHeadersLength(); i++) {
+            const header = flowData.requestHeaders(i);
+            const name = header?.key();
+            const value = header?.value();
+            if (name && value) {
+                requestHeaders.push({ name, value });
+            }
         }
+
+        const responseHeaders: Record<string, string>[] = [];
+        for (let i = 0; i < flowData.responseHeadersLength(); i++) {
+            const header = flowData.responseHeaders(i);
+            const name = header?.key();
+            const value = header?.value();
+            if (name && value) {
+                responseHeaders.push({ name, value });
+            }
+        }
+
+        const requestSize = flowData.requestSize() || 0;
+        const responseSize = flowData.responseSize() || 0;
+
+        return {
+            id: flowData.id() ?? '',
+            method: flowData.method() ?? '',
+            url: flowData.url() ?? '',
+            status: flowData.status(),
+            duration: this.getDuration(flowData.startTimestamp(), flowData.endTimestamp()),
+            requestSize: this.formatBytes(requestSize),
+            responseSize: this.formatBytes(responseSize),
+            requestHeaders,
+            responseHeaders,
+            requestBody: flowData.requestBody() ?? '',
+            responseBody: flowData.responseBody() ?? '',
+            cookies: this.getCookies(responseHeaders),
+            isIntercepted: flowData.isIntercepted() ?? false
+        };
     }
 
     private getDuration(startTime: number, endTime: number): string {
@@ -56,9 +56,9 @@ class WebSocketService implements AbstractWebSocketService {
           if (event.data instanceof Blob) {
             const arrayBuffer = await event.data.arrayBuffer();
             const uint8Array = new Uint8Array(arrayBuffer);
-            const flowData = flatBufferService.parseFlowMessage(uint8Array);
-            
-            if (flowData) {
+            const flows = flatBufferService.parseFlowMessages(uint8Array);
+
+            for (const flowData of flows) {
               console.log('🚀 FlatBuffer HTTP flow received:', flowData.id);
               this._notifyListeners('http_flow', flowData);
             }
@@ -35,7 +35,7 @@ def main():
         sys.exit(1)
     
     # Optional: Install development dependencies
-    if not run_command("pip install pytest pytest-asyncio pytest-cov flake8 black isort", "Installing Python dev dependencies"):
+    if not run_command("pip install pytest pytest-asyncio pytest-cov pytest-xdist flake8 black isort", "Installing Python dev dependencies"):
         print("⚠️  Warning: Could not install Python dev dependencies")
     
     print("\n🎉 Setup completed successfully!")